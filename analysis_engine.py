@@ -0,0 +1,162 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from datetime import datetime
+from report_writer import placeholder_analysis
+import config
+
+class AnalysisEngine:
+    """并发调用DeepSeekAnalyzer分析多个来源的项目"""
+
+    TIMEOUT_TEXT = "分析超时，未能在报告生成时间预算内完成。"
+
+    def __init__(self, analyzer, max_workers=None, batch_size=None, budget=None, enricher=None):
+        self.analyzer = analyzer
+        # 可选的Enricher，分析前补充README摘要
+        self.enricher = enricher
+        self.max_workers = max_workers or config.ANALYSIS_MAX_WORKERS
+        self.batch_size = batch_size or config.DEEPSEEK_BATCH_SIZE
+        # 分析阶段的总时间预算（秒），None表示不限制
+        self.budget = budget or config.REPORT_TIME_BUDGET
+
+    def _project_key(self, project):
+        """用于去重的项目标识，近似重复的项目使用所在分组在同一网站的代表项目，其次使用URL"""
+        return project.get("cluster") or project.get("url") or project.get("name", "")
+
+    def _analyze_one(self, project, source_name):
+        """分析单个项目，出错时返回错误分析记录"""
+        name = project.get('name', '未知项目')
+        try:
+            print(f"分析{source_name}项目: {name}")
+            return self.analyzer.analyze_project(project)
+        except Exception as e:
+            print(f"分析{source_name}项目 {name} 时出错: {e}")
+            # 添加一个错误分析记录，避免跳过
+            return {
+                "project": project,
+                "analysis": f"分析过程中出错: {str(e)}",
+                "timestamp": datetime.now().isoformat()
+            }
+
+    def _analyze_batch(self, projects, source_names):
+        """批量分析多个项目，整批出错时改为逐个分析"""
+        if len(projects) == 1:
+            return [self._analyze_one(projects[0], source_names[0])]
+        try:
+            print(f"批量分析{len(projects)}个项目: {', '.join(p.get('name', '未知项目') for p in projects)}")
+            return self.analyzer.analyze_batch(projects)
+        except Exception as e:
+            print(f"批量分析时出错: {e}，改为逐个分析")
+            return [self._analyze_one(project, source_name) for project, source_name in zip(projects, source_names)]
+
+    def analyze_sources(self, sources, on_result=None, completed=None):
+        """
+        并发分析多个来源的项目
+
+        sources: [(key, source_name, projects), ...]
+        on_result: 每完成一个项目就调用一次 on_result(key, index, analysis)，用于增量生成报告
+        completed: 中断前已完成的分析 {(key, index): analysis}，这些项目不再分析
+        返回: {key: [analysis, ...]}，每个列表的顺序与输入项目顺序一致
+        """
+        unique_projects, positions = self._collect(sources)
+        results = {}
+
+        def deliver(project_key, analysis):
+            results[project_key] = analysis
+            if on_result:
+                for key, index in positions[project_key]:
+                    on_result(key, index, analysis)
+
+        # 超过预算后分析器会中断正在接收的流式响应，不再发起新请求
+        start = time.monotonic()
+        self.analyzer.deadline = start + self.budget if self.budget else None
+
+        # 使用有界线程池并发分析，哪个批次先完成就先写入报告
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {}
+        pending_keys = []
+        batch = []
+
+        def submit(batch):
+            projects = [unique_projects[project_key][0] for project_key in batch]
+            source_names = [unique_projects[project_key][1] for project_key in batch]
+            futures[executor.submit(self._analyze_batch, projects, source_names)] = batch
+
+        # 排名靠前的项目先处理，预算紧张时降级的是排名靠后的项目
+        ordered = sorted(unique_projects, key=lambda project_key: unique_projects[project_key][0]["rank"])
+        keys_by_project = {id(unique_projects[project_key][0]): project_key for project_key in ordered}
+        # 中断前已完成的项目直接使用记录的结果，不再获取README和分析
+        for project_key in ordered:
+            for position in positions[project_key]:
+                if completed and position in completed:
+                    deliver(project_key, completed[position])
+                    break
+        ready = [unique_projects[project_key][0] for project_key in ordered if project_key not in results]
+        if self.enricher:
+            # 获取README与分析同时进行，已获取到的项目先开始分析
+            ready = self.enricher.iter_enriched(ready)
+
+        # 已有缓存的项目直接复用，其余项目凑满一批就提交分析
+        # 与上次抓取相比未变化的项目只要有缓存就复用，只有新增或变化的项目才需要重新分析
+        for project in ready:
+            project_key = keys_by_project[id(project)]
+            cached = self.analyzer.get_cached_analysis(project, check_drift=project.get("delta") != "unchanged")
+            if cached is not None:
+                deliver(project_key, cached)
+                continue
+            pending_keys.append(project_key)
+            batch.append(project_key)
+            if len(batch) >= self.batch_size:
+                submit(batch)
+                batch = []
+        if batch:
+            submit(batch)
+
+        try:
+            remaining = max(0, self.budget - (time.monotonic() - start)) if self.budget else None
+            for future in as_completed(futures, timeout=remaining):
+                for project_key, analysis in zip(futures[future], future.result()):
+                    deliver(project_key, analysis)
+        except TimeoutError:
+            unfinished = [project_key for project_key in pending_keys if project_key not in results]
+            print(f"分析超出时间预算（{self.budget}秒），{len(unfinished)}个项目使用占位内容")
+            for project_key in unfinished:
+                deliver(project_key, placeholder_analysis(unique_projects[project_key][0], self.TIMEOUT_TEXT))
+        finally:
+            # 不等待超时仍在进行的请求
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return self._assemble(sources, results)
+
+    def _collect(self, sources):
+        """
+        按首次出现的顺序去重，同一个项目只分析一次，并记录它在各来源中的位置
+
+        返回: ({项目标识: (project, 来源名称)}, {项目标识: [(来源键, 位置), ...]})
+        """
+        unique_projects = {}
+        positions = {}
+        for key, source_name, projects in sources:
+            if not projects:
+                print(f"警告：{source_name}项目列表为空，跳过分析")
+                continue
+            for index, project in enumerate(projects):
+                project_key = self._project_key(project)
+                if project_key not in unique_projects:
+                    unique_projects[project_key] = (project, source_name)
+                positions.setdefault(project_key, []).append((key, index))
+        
+        # 项目在各来源中的最高排名，决定输出token档位和预算紧张时是否降级
+        for project_key, (project, _) in unique_projects.items():
+            project["rank"] = min(index for _, index in positions[project_key]) + 1
+
+        duplicates = sum(len(projects or []) for _, _, projects in sources) - len(unique_projects)
+        if duplicates > 0:
+            print(f"共有{duplicates}个重复项目，将复用分析结果")
+        return unique_projects, positions
+
+    def _assemble(self, sources, results):
+        """按原始顺序组装每个来源的分析结果"""
+        analyses = {}
+        for key, _, projects in sources:
+            analyses[key] = [results[self._project_key(project)] for project in (projects or [])]
+        return analyses
@@ -0,0 +1,543 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import aiohttp
+
+from github_crawler import GitHubCrawler
+from github_graphql import get_github_graphql
+from http_client import get_retry_policy, prepare_conditional, store_conditional
+from huggingface_crawler import HuggingFaceCrawler
+from deepseek_analyzer import DeepSeekAnalyzer
+from analysis_engine import AnalysisEngine
+from enrichment import Enricher
+from email_sender import EmailSender
+from report_writer import REPORT_SOURCES, placeholder_analysis, save_report
+from cache_store import get_cache_store, prune_report_files
+from topic_index import get_topic_index
+from metrics import get_metrics
+from prompt_budget import BudgetExceededError, count_tokens
+from main import prepare_projects
+import config
+
+# 建立连接阶段的错误，这时请求还没有发到服务端，POST请求也可以安全重试
+_CONNECT_ERRORS = (aiohttp.ClientConnectorError,) + (
+    (aiohttp.ConnectionTimeoutError,) if hasattr(aiohttp, "ConnectionTimeoutError") else ()
+)
+
+def _client_timeout(read_timeout):
+    """与同步HTTP客户端一致的连接/读取超时"""
+    return aiohttp.ClientTimeout(sock_connect=config.HTTP_CONNECT_TIMEOUT, sock_read=read_timeout)
+
+async def _request(session, method, url, read_timeout=None, max_retries=None, retry_on_timeout=None,
+                   before_retry=None, **kwargs):
+    """
+    发送异步请求，按与同步HTTP客户端相同的RetryPolicy重试
+
+    重试耗尽或遇到不需要重试的错误状态码时抛出异常，不会把错误响应当作数据返回。
+    retry_on_timeout和before_retry与HttpClient.request相同，POST请求默认只在连接阶段出错时重试。
+    返回: (状态码, 响应头, 响应文本)
+    """
+    retry = get_retry_policy()
+    if max_retries is None:
+        max_retries = retry.max_retries
+    if retry_on_timeout is None:
+        retry_on_timeout = method.upper() != "POST"
+    timeout = _client_timeout(read_timeout or config.HTTP_READ_TIMEOUT)
+    host = urlparse(url).netloc
+    metrics = get_metrics()
+
+    for attempt in range(max_retries + 1):
+        wait = retry.rate_limit_wait(host)
+        if wait:
+            await asyncio.sleep(wait)
+        if attempt > 0:
+            if before_retry:
+                before_retry()
+            metrics.inc("http_retries_total", host=host)
+
+        try:
+            async with session.request(method, url, timeout=timeout, **kwargs) as response:
+                metrics.inc("http_requests_total", host=host, status=response.status)
+                retry.record_rate_limit(host, response.headers)
+                delay = None
+                if retry.should_retry(response.status, response.headers) and attempt < max_retries:
+                    delay = retry.retry_delay(response.headers, attempt)
+                if delay is None:
+                    response.raise_for_status()
+                    return response.status, response.headers, await response.text()
+                print(f"{host}返回{response.status}，{delay:.1f}秒后重试（第{attempt + 1}次）")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            metrics.inc("http_requests_total", host=host, status="error")
+            if attempt == max_retries or not (retry_on_timeout or isinstance(e, _CONNECT_ERRORS)):
+                raise
+            delay = retry.backoff(attempt)
+            print(f"请求{host}失败: {e}，{delay:.1f}秒后重试（第{attempt + 1}次）")
+        await asyncio.sleep(delay)
+
+async def _conditional_get(session, url, params=None, headers=None):
+    """异步版本的HttpClient.conditional_get，与同步客户端共用同一份ETag/Last-Modified缓存"""
+    cache_key, cached, headers = await asyncio.to_thread(prepare_conditional, url, params, headers)
+    status, response_headers, text = await _request(session, "GET", url, params=params, headers=headers)
+    if status == 304 and cached:
+        get_metrics().inc("http_not_modified_total", host=urlparse(url).netloc)
+        print(f"{urlparse(url).netloc}内容未变化，使用缓存")
+        return cached["body"]
+    await asyncio.to_thread(store_conditional, cache_key, response_headers, text)
+    return text
+
+# 正在进行的抓取: {缓存键: asyncio.Task}
+_fetches = {}
+
+async def _fetch_once(cache_key, fetch):
+    """同一个缓存键同时只有一个抓取任务，并发的报告等待同一个任务的结果"""
+    task = _fetches.get(cache_key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = _fetches[cache_key] = asyncio.ensure_future(fetch())
+
+        def forget(done):
+            if _fetches.get(cache_key) is done:
+                del _fetches[cache_key]
+
+        task.add_done_callback(forget)
+    # 某个报告等待超时被取消时，不取消其他报告也在等待的抓取
+    return await asyncio.shield(task)
+
+async def _cached_fetch(crawler, category, fetch):
+    """读取缓存，没有时抓取并写入缓存；SQLite读写放到线程中执行"""
+    async def load():
+        projects = await asyncio.to_thread(crawler._load_cache, category)
+        if projects is None:
+            projects = await fetch()
+            await asyncio.to_thread(crawler._save_cache, category, projects)
+        return projects
+
+    return await _fetch_once(crawler._get_cache_key(category), load)
+
+class AsyncGitHubCrawler(GitHubCrawler):
+    """GitHubCrawler的异步版本，共享同一个aiohttp会话"""
+
+    def __init__(self, session, num_projects=None):
+        super().__init__()
+        self.session = session
+        if num_projects:
+            self.num_projects = num_projects
+
+    async def _fetch_trending_async(self):
+        if config.TRENDING_FANOUT_ENABLED:
+            # 多页面抓取有自己的并发和请求额度控制，整体放到线程中执行
+            return await asyncio.to_thread(self._fetch_trending_projects)
+        html = await _conditional_get(self.session, self.TRENDING_URL, headers={"User-Agent": "Mozilla/5.0"})
+        # HTML解析、相关性评分和GraphQL补充都会阻塞，放到线程中执行
+        return await asyncio.to_thread(lambda: self._augment_trending(self._parse_trending_html(html)))
+
+    async def _fetch_newest_async(self):
+        if get_github_graphql():
+            # GraphQL查询使用同步客户端，放到线程中执行
+            return await asyncio.to_thread(self._fetch_newest_projects)
+        text = await _conditional_get(self.session, self.SEARCH_API_URL, params=self._newest_search_params(),
+                                      headers={"User-Agent": "Mozilla/5.0"})
+        return await asyncio.to_thread(self._parse_newest_items, json.loads(text))
+
+    async def iter_trending_projects(self):
+        """逐个产出GitHub热门项目（优先使用缓存）"""
+        projects = await _cached_fetch(self, "trending", self._fetch_trending_async)
+        for project in projects[:self.num_projects]:
+            yield project
+
+    async def iter_newest_projects(self):
+        """逐个产出GitHub最新项目（优先使用缓存）"""
+        projects = await _cached_fetch(self, "newest", self._fetch_newest_async)
+        for project in projects[:self.num_projects]:
+            yield project
+
+class AsyncHuggingFaceCrawler(HuggingFaceCrawler):
+    """HuggingFaceCrawler的异步版本，共享同一个aiohttp会话"""
+
+    def __init__(self, session, num_projects=None):
+        super().__init__()
+        self.session = session
+        if num_projects:
+            self.num_projects = num_projects
+
+    async def _fetch_async(self, sort):
+        if self._use_harvester():
+            # 分页流式抓取使用同步客户端，整体放到线程中执行
+            return await asyncio.to_thread(self._fetch_projects, sort)
+        params = self._build_params(sort, self.num_projects)
+        text = await _conditional_get(self.session, self.MODELS_API_URL, params=params, headers={"User-Agent": "Mozilla/5.0"})
+        return await asyncio.to_thread(self._parse_projects, json.loads(text), self.num_projects)
+
+    async def _iter_projects(self, category, sort):
+        projects = await _cached_fetch(self, category, lambda: self._fetch_async(sort))
+        for project in projects[:self.num_projects]:
+            yield project
+
+    def iter_trending_projects(self):
+        """逐个产出Hugging Face热门项目（优先使用缓存）"""
+        return self._iter_projects("trending", "trending")
+
+    def iter_newest_projects(self):
+        """逐个产出Hugging Face最新项目（优先使用缓存）"""
+        return self._iter_projects("newest", "created_at")
+
+class AsyncDeepSeekAnalyzer(DeepSeekAnalyzer):
+    """
+    DeepSeekAnalyzer的异步版本，用信号量限制同时进行的请求数
+
+    缓存、指纹和token用量与同步版本完全相同，SQLite读写放到线程中执行。
+    报告的截止时间用asyncio.wait_for控制，到期时直接取消请求，不需要流式输出。
+    """
+
+    def __init__(self, session, max_concurrency=None):
+        super().__init__()
+        self.session = session
+        self.semaphore = asyncio.Semaphore(max_concurrency or config.ANALYSIS_MAX_WORKERS)
+
+    async def _post_with_retry(self, payload, before_retry=None):
+        """发送请求，遇到限流(429)或服务端错误(5xx)时按共享的重试策略退避重试"""
+        request = _request(self.session, "POST", self.api_url, read_timeout=self.timeout, max_retries=self.max_retries,
+                           before_retry=before_retry, headers=self.headers, json=payload)
+        if self.deadline is not None:
+            request = asyncio.wait_for(request, max(0, self.deadline - time.monotonic()))
+        try:
+            _, _, text = await request
+        except asyncio.TimeoutError:
+            self._check_deadline()
+            raise
+        return json.loads(text)
+
+    async def _complete(self, payload):
+        """发送请求并返回回复文本，发送前预留token额度，收到响应后记录实际用量"""
+        self._check_deadline()
+        reservations = [self._reserve(payload)]
+        metrics = get_metrics()
+        try:
+            with metrics.span("deepseek_request", mode="async") as span:
+                result = await self._post_with_retry(payload, lambda: reservations.append(self._reserve(payload)))
+                content = self._extract_content(result)
+                usage = result.get("usage") or {
+                    "prompt_tokens": self._prompt_tokens(payload),
+                    "completion_tokens": count_tokens(content)
+                }
+                span["prompt_tokens"] = usage.get("prompt_tokens", 0)
+                span["completion_tokens"] = usage.get("completion_tokens", 0)
+            metrics.inc("deepseek_tokens_total", span["prompt_tokens"], type="prompt")
+            metrics.inc("deepseek_tokens_total", span["completion_tokens"], type="completion")
+        except BaseException:
+            # 请求失败或被取消时释放预留的额度
+            for reservation in reservations:
+                self.ledger.release(reservation)
+            raise
+        for reservation in reservations[1:]:
+            self.ledger.release(reservation)
+        # 保存用量要写SQLite，放到线程中执行
+        await asyncio.to_thread(self.ledger.record, span["prompt_tokens"], span["completion_tokens"], reservations[0])
+        return content
+
+    async def analyze_project(self, project):
+        """使用DeepSeek API异步分析项目"""
+        cached = await asyncio.to_thread(self.get_cached_analysis, project)
+        if cached is not None:
+            return cached
+
+        async with self.semaphore:
+            # 在获得并发名额后再检查预算，使用的是最新的累计用量
+            mode = await asyncio.to_thread(self.ledger.mode_for, project)
+            if mode == "skip":
+                get_metrics().inc("deepseek_skipped_total")
+                return self._error_analysis(project, "已达到今日token或费用上限，跳过分析")
+            if mode == "summary":
+                get_metrics().inc("deepseek_downgraded_total")
+
+            try:
+                content = await self._complete(self._build_payload(project, mode))
+                return await asyncio.to_thread(self._save_analysis, project, content, mode)
+            except BudgetExceededError as e:
+                get_metrics().inc("deepseek_skipped_total")
+                return self._error_analysis(project, e)
+            except Exception as e:
+                return self._error_analysis(project, e)
+
+    async def analyze_batch(self, projects):
+        """
+        把多个项目放进同一个请求中分析，按项目拆分返回的JSON结果
+
+        与同步版本相同，解析失败的项目会退回到单项目分析
+        返回: 与输入顺序一致的分析结果列表
+        """
+        def check():
+            return ([self.get_cached_analysis(project) for project in projects],
+                    [self.ledger.mode_for(project) for project in projects])
+
+        results, modes = await asyncio.to_thread(check)
+        # 只有完整分析的项目合并为一个请求，降级或跳过的项目单独处理
+        pending = [i for i, result in enumerate(results) if result is None and modes[i] == "full"]
+        single = [i for i, result in enumerate(results) if result is None and modes[i] != "full"]
+        if len(pending) == 1:
+            single, pending = single + pending, []
+
+        if pending:
+            pending_projects = [projects[i] for i in pending]
+            sections = {}
+            try:
+                async with self.semaphore:
+                    content = await self._complete(self._build_batch_payload(pending_projects))
+                sections = self._split_batch_response(content, len(pending_projects))
+            except Exception as e:
+                print(f"批量分析{len(pending_projects)}个项目时出错: {e}，改为逐个分析")
+
+            def save():
+                return {i: self._save_analysis(projects[i], sections[position])
+                        for position, i in enumerate(pending) if sections.get(position)}
+
+            for i, analysis in (await asyncio.to_thread(save)).items():
+                results[i] = analysis
+            single += [i for i in pending if results[i] is None]
+
+        for i, analysis in zip(single, await asyncio.gather(*[self.analyze_project(projects[i]) for i in single])):
+            results[i] = analysis
+        return results
+
+class AsyncAnalysisEngine(AnalysisEngine):
+    """
+    AnalysisEngine的异步版本
+
+    去重、README补充、缓存复用、批量分析和时间预算都与同步版本相同，用协程代替线程池并发分析，
+    两种模式计算出的缓存指纹一致，可以共用分析缓存。
+    """
+
+    async def _analyze_one(self, project, source_name):
+        """分析单个项目，出错时返回错误分析记录"""
+        name = project.get('name', '未知项目')
+        try:
+            print(f"分析{source_name}项目: {name}")
+            return await self.analyzer.analyze_project(project)
+        except Exception as e:
+            print(f"分析{source_name}项目 {name} 时出错: {e}")
+            return placeholder_analysis(project, f"分析过程中出错: {str(e)}")
+
+    async def _analyze_batch(self, projects, source_names):
+        """批量分析多个项目，整批出错时改为逐个分析"""
+        if len(projects) == 1:
+            return [await self._analyze_one(projects[0], source_names[0])]
+        try:
+            print(f"批量分析{len(projects)}个项目: {', '.join(p.get('name', '未知项目') for p in projects)}")
+            return await self.analyzer.analyze_batch(projects)
+        except Exception as e:
+            print(f"批量分析时出错: {e}，改为逐个分析")
+            return list(await asyncio.gather(*[self._analyze_one(project, source_name)
+                                               for project, source_name in zip(projects, source_names)]))
+
+    async def analyze_sources(self, sources):
+        """
+        并发分析多个来源的项目
+
+        sources: [(key, source_name, projects), ...]
+        返回: {key: [analysis, ...]}，每个列表的顺序与输入项目顺序一致
+        """
+        unique_projects, positions = self._collect(sources)
+        results = {}
+
+        start = time.monotonic()
+        self.analyzer.deadline = start + self.budget if self.budget else None
+
+        # 排名靠前的项目先处理，预算紧张时降级的是排名靠后的项目
+        ordered = sorted(unique_projects, key=lambda project_key: unique_projects[project_key][0]["rank"])
+        keys_by_project = {id(unique_projects[project_key][0]): project_key for project_key in ordered}
+        ready = [unique_projects[project_key][0] for project_key in ordered]
+        if self.enricher:
+            # README通过同步HTTP客户端的线程池并发获取，整体放到线程中执行
+            ready = await asyncio.to_thread(lambda: list(self.enricher.iter_enriched(ready)))
+
+        # 已有缓存的项目直接复用，与上次抓取相比未变化的项目只要有缓存就复用
+        cached = await asyncio.to_thread(lambda: [
+            self.analyzer.get_cached_analysis(project, check_drift=project.get("delta") != "unchanged")
+            for project in ready
+        ])
+        pending = []
+        for project, analysis in zip(ready, cached):
+            if analysis is not None:
+                results[keys_by_project[id(project)]] = analysis
+            else:
+                pending.append(keys_by_project[id(project)])
+
+        # 其余项目凑满一批就提交分析，同时进行的请求数由分析器的信号量限制
+        tasks = {}
+        for start_index in range(0, len(pending), self.batch_size):
+            batch = pending[start_index:start_index + self.batch_size]
+            task = asyncio.create_task(self._analyze_batch([unique_projects[project_key][0] for project_key in batch],
+                                                           [unique_projects[project_key][1] for project_key in batch]))
+            tasks[task] = batch
+
+        if tasks:
+            remaining = max(0, self.budget - (time.monotonic() - start)) if self.budget else None
+            done, unfinished = await asyncio.wait(tasks, timeout=remaining)
+            for task in done:
+                results.update(zip(tasks[task], task.result()))
+            if unfinished:
+                for task in unfinished:
+                    task.cancel()
+                unfinished_keys = [project_key for task in unfinished for project_key in tasks[task]]
+                print(f"分析超出时间预算（{self.budget}秒），{len(unfinished_keys)}个项目使用占位内容")
+                for project_key in unfinished_keys:
+                    results[project_key] = placeholder_analysis(unique_projects[project_key][0], self.TIMEOUT_TEXT)
+
+        return self._assemble(sources, results)
+
+async def crawl_sources_async(session, num_projects=None):
+    """并发获取所有来源的项目，每个来源有独立的截止时间，返回: (抓取结果, 各来源耗时)"""
+    github_crawler = AsyncGitHubCrawler(session, num_projects)
+    huggingface_crawler = AsyncHuggingFaceCrawler(session, num_projects)
+    streams = {
+        "github_trending": github_crawler.iter_trending_projects,
+        "github_newest": github_crawler.iter_newest_projects,
+        "huggingface_trending": huggingface_crawler.iter_trending_projects,
+        "huggingface_newest": huggingface_crawler.iter_newest_projects,
+    }
+    timings = {}
+
+    async def crawl(key, source_name):
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            with get_metrics().span("crawl", source=key) as span:
+                projects = await asyncio.wait_for(_collect(streams[key]()), config.CRAWL_SOURCE_DEADLINE)
+                span["projects"] = len(projects)
+            print(f"已获取{source_name}项目: {len(projects)}个")
+            return projects
+        except asyncio.TimeoutError:
+            status = "timeout"
+            print(f"获取{source_name}项目超时（超过{config.CRAWL_SOURCE_DEADLINE}秒），跳过该来源")
+            return []
+        except Exception as e:
+            status = "error"
+            print(f"获取{source_name}项目时出错: {e}")
+            return []
+        finally:
+            timings[key] = {"status": status, "seconds": round(time.perf_counter() - start, 3)}
+
+    results = await asyncio.gather(*[crawl(key, source_name) for key, source_name in REPORT_SOURCES])
+    return {key: projects for (key, _), projects in zip(REPORT_SOURCES, results)}, timings
+
+async def _collect(projects):
+    return [project async for project in projects]
+
+async def prepare_sources_async(session, num_projects=None):
+    """
+    抓取所有来源并完成分析前的准备，准备步骤与同步流水线的prepare_projects相同
+
+    返回: (合并后的抓取结果, 各来源的变化统计, 增长最快的项目, 主题分组, 各来源抓取耗时)
+    """
+    with get_metrics().span("stage", stage="crawl"):
+        crawled, crawl_timings = await crawl_sources_async(session, num_projects)
+    # 变化标注、指标历史、近似重复合并和主题索引查询都要读写本地文件，放到线程中执行
+    crawled, crawl_deltas, top_growth, topics = await asyncio.to_thread(prepare_projects, crawled)
+    return crawled, crawl_deltas, top_growth, topics, crawl_timings
+
+async def create_report_async(session, name=None, num_projects=None, recipients=None, prepared=None):
+    """
+    异步生成并发送一份报告
+
+    prepared: prepare_sources_async的结果，多份报告共用同一次抓取；为None时自行抓取
+    """
+    print(f"开始异步生成AI项目报告 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    metrics = get_metrics()
+
+    if not os.path.exists(config.CACHE_DIR):
+        os.makedirs(config.CACHE_DIR)
+
+    num_projects = num_projects or config.NUM_PROJECTS
+    if prepared is None:
+        prepared = await prepare_sources_async(session, num_projects)
+    crawled, crawl_deltas, top_growth, topics, crawl_timings = prepared
+
+    # 按本报告的项目数截取共用的抓取结果；复制项目字典，各报告的排名和分组标注互不影响
+    sources = {key: [dict(project) for project in (crawled.get(key) or [])[:num_projects]] for key, _ in REPORT_SOURCES}
+    truncated = any(len(crawled.get(key) or []) > num_projects for key, _ in REPORT_SOURCES)
+    if config.TOPIC_INDEX_ENABLED and truncated:
+        # 主题分组只包含本报告中的项目
+        try:
+            unique_projects = list({project.get("url") or project.get("name", ""): project
+                                    for projects in sources.values() for project in projects}.values())
+            for project in unique_projects:
+                project.pop("topic_peers", None)
+            topics = await asyncio.to_thread(get_topic_index().group, unique_projects)
+        except Exception as e:
+            print(f"查询主题索引时出错: {e}")
+
+    print("正在使用DeepSeek API分析项目...")
+    analysis_engine = AsyncAnalysisEngine(AsyncDeepSeekAnalyzer(session),
+                                          enricher=Enricher() if config.ENRICH_ENABLED else None)
+    with metrics.span("stage", stage="analysis"):
+        analyses = await analysis_engine.analyze_sources([
+            (key, source_name, sources[key]) for key, source_name in REPORT_SOURCES
+        ])
+
+    # 把本次分析的项目加入主题索引
+    if config.TOPIC_INDEX_ENABLED:
+        try:
+            await asyncio.to_thread(get_topic_index().add, [analysis for items in analyses.values() for analysis in items])
+        except Exception as e:
+            print(f"更新主题索引时出错: {e}")
+
+    # smtplib没有异步接口，放到线程中发送以免阻塞其他报告
+    print("正在发送邮件报告...")
+    email_sender = EmailSender()
+    if recipients:
+        email_sender.recipients = recipients
+    with metrics.span("stage", stage="email"):
+        email_sent = await asyncio.to_thread(
+            email_sender.send_project_report,
+            analyses["github_trending"],
+            analyses["github_newest"],
+            analyses["huggingface_trending"],
+            analyses["huggingface_newest"]
+        )
+    print("邮件报告已成功发送！" if email_sent else "发送邮件报告失败，请检查日志。")
+
+    report_file = await asyncio.to_thread(save_report, analyses, name=name, crawl_timings=crawl_timings,
+                                          crawl_delta=crawl_deltas, top_growth=top_growth, topics=topics)
+    print(f"报告已保存到: {report_file}")
+    return analyses
+
+async def run_reports_async(report_configs=None):
+    """在同一个事件循环和HTTP会话中并发生成多份报告"""
+    report_configs = report_configs or config.REPORT_CONFIGS
+    metrics = get_metrics()
+    metrics.reset()
+    async with aiohttp.ClientSession() as session:
+        # 所有报告共用一次抓取和准备，按最大的项目数抓取后各报告自行截取
+        fetch_size = max(report_config.get("num_projects") or config.NUM_PROJECTS for report_config in report_configs)
+        prepared = await prepare_sources_async(session, fetch_size)
+        results = await asyncio.gather(
+            *[create_report_async(session, prepared=prepared, **report_config) for report_config in report_configs],
+            return_exceptions=True
+        )
+    for report_config, result in zip(report_configs, results):
+        if isinstance(result, Exception):
+            print(f"生成报告 {report_config} 时出错: {result}")
+
+    try:
+        print(f"运行指标已保存到: {metrics.save()}")
+    except Exception as e:
+        print(f"保存运行指标时出错: {e}")
+
+    # 清理过期缓存和旧报告
+    await asyncio.to_thread(get_cache_store().evict)
+    await asyncio.to_thread(prune_report_files)
+    return results
+
+async def run_async_scheduler(hour=9, minute=0, report_configs=None):
+    """异步定时任务：每天指定时间生成报告，等待期间不占用线程"""
+    print(f"已设置异步定时任务，将在每天 {hour:02d}:{minute:02d} 生成AI项目报告")
+    while True:
+        now = datetime.now()
+        next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        await asyncio.sleep((next_run - now).total_seconds())
+        await run_reports_async(report_configs)
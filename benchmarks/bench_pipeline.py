@@ -0,0 +1,94 @@
+"""
+端到端流水线性能测试
+
+在本地模拟服务上离线运行完整的create_report（抓取、分析、发送邮件、保存报告），
+统计耗时、各阶段请求数和内存峰值。第一轮使用空缓存，之后各轮复用同一缓存目录。
+
+用法:
+    python benchmarks/bench_pipeline.py --rounds 2
+    python benchmarks/bench_pipeline.py --deepseek-latency 0.5 --error-rate 0.1 --rate-limit 20
+    python benchmarks/bench_pipeline.py --async
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import config
+from metrics import get_metrics
+from mock_upstream import MockUpstream
+
+def run_round(async_mode, quiet):
+    """运行一次完整的报告生成，返回(耗时, 内存峰值字节数)"""
+    output = io.StringIO() if quiet else None
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        if async_mode:
+            import asyncio
+            from async_pipeline import run_reports_async
+            asyncio.run(run_reports_async())
+        else:
+            from main import create_report
+            create_report()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端流水线性能测试")
+    parser.add_argument("--rounds", type=int, default=2, help="运行次数，第一轮为冷缓存")
+    parser.add_argument("--latency", type=float, default=0.0, help="所有模拟服务的响应延迟（秒）")
+    parser.add_argument("--deepseek-latency", type=float, default=None, help="DeepSeek接口的响应延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟服务返回500错误的概率")
+    parser.add_argument("--rate-limit", type=int, default=0, help="每个阶段每秒允许的最大请求数，0表示不限流")
+    parser.add_argument("--num-projects", type=int, default=None, help="每个来源的项目数")
+    parser.add_argument("--rest", action="store_true", help="不使用GitHub GraphQL，只使用REST搜索接口")
+    parser.add_argument("--async", dest="async_mode", action="store_true", help="测试异步流水线")
+    parser.add_argument("--verbose", action="store_true", help="显示流水线的输出")
+    args = parser.parse_args()
+
+    latency = {stage: args.latency for stage in ("github_trending", "github_search", "github_graphql", "huggingface", "readme", "deepseek")}
+    if args.deepseek_latency is not None:
+        latency["deepseek"] = args.deepseek_latency
+
+    # 在临时目录中运行，不读取也不改动真实的缓存和密钥文件
+    work_dir = tempfile.mkdtemp(prefix="pip_news_bench_")
+    os.chdir(work_dir)
+    config.CACHE_DIR = os.path.join(work_dir, "cache")
+    if args.num_projects:
+        config.NUM_PROJECTS = args.num_projects
+        config.REPORT_CONFIGS = [dict(report, num_projects=args.num_projects) for report in config.REPORT_CONFIGS]
+
+    with MockUpstream(latency=latency, error_rate=args.error_rate, rate_limit=args.rate_limit or None) as upstream:
+        upstream.patch_config()
+        if args.rest:
+            config.GITHUB_GRAPHQL_ENABLED = False
+        print(f"模拟服务: {upstream.base_url}，SMTP端口: {upstream.smtp_port}，工作目录: {work_dir}")
+
+        previous = {}
+        for round_index in range(args.rounds):
+            elapsed, peak = run_round(args.async_mode, not args.verbose)
+            stats = upstream.stats()
+            requests = {name: count - previous.get(name, 0) for name, count in sorted(stats.items())}
+            previous = stats
+
+            label = "冷缓存" if round_index == 0 else "热缓存"
+            print(f"\n第{round_index + 1}轮（{label}）: 耗时 {elapsed:.2f} 秒，内存峰值 {peak / 1024 / 1024:.1f} MB")
+            for name, count in requests.items():
+                if count:
+                    print(f"  {name}: {count}")
+            # 流水线各阶段和各类操作的耗时
+            for name, histogram in get_metrics().summary()["histograms"].items():
+                print(f"  {name}: {histogram['count']}次，共{histogram['sum']:.2f}秒，最长{histogram['max']:.2f}秒")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+项目评分和排名性能测试
+
+对比逐个评分加全量排序的原实现与ranking模块的批量评分加部分排序
+
+用法: python benchmarks/bench_ranking.py --records 100000 --top-k 10 --rounds 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from ranking import rank_projects
+
+def make_projects(num_records, seed=0):
+    """生成指定数量的模拟Hugging Face项目"""
+    rng = random.Random(seed)
+    authors = [f"user-{i}" for i in range(500)] + list(config.MAJOR_ORGANIZATIONS)
+    projects = []
+    for i in range(num_records):
+        author = rng.choice(authors)
+        projects.append({
+            "name": f"{author}/model-{i}",
+            "author": author,
+            "likes": rng.randint(0, 500),
+            "downloads": rng.randint(0, 10 ** 6),
+        })
+    return projects
+
+def rank_loop(projects, k):
+    """原实现：逐个项目检查组织列表并评分，然后全量排序"""
+    for project in projects:
+        project["score"] = 0
+        for org in config.MAJOR_ORGANIZATIONS:
+            if org.lower() in project["author"].lower() or org.lower() in project["name"].lower():
+                project["score"] += 100
+                break
+        project["score"] += min(project["likes"] * 2, 200)
+        project["score"] += min(project["downloads"] // 1000, 300)
+    return sorted(projects, key=lambda p: p["score"], reverse=True)[:k]
+
+def best_time(func, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description="项目评分和排名性能测试")
+    parser.add_argument("--records", type=int, default=100000, help="模拟项目数量")
+    parser.add_argument("--top-k", type=int, default=10, help="选出的项目数量")
+    parser.add_argument("--rounds", type=int, default=5, help="重复测试的次数")
+    args = parser.parse_args()
+
+    projects = make_projects(args.records)
+
+    loop_time, expected = best_time(lambda: rank_loop(projects, args.top_k), args.rounds)
+    expected = [(p["name"], p["score"]) for p in expected]
+    vector_time, ranked = best_time(lambda: rank_projects(projects, "huggingface", args.top_k), args.rounds)
+    ranked = [(p["name"], p["score"]) for p in ranked]
+
+    print(f"项目数: {args.records}，top-k: {args.top_k}")
+    print(f"逐个评分+全量排序: {loop_time * 1000:.1f} ms")
+    print(f"批量评分+部分排序: {vector_time * 1000:.1f} ms（{loop_time / vector_time:.1f}倍）")
+    print(f"结果一致: {'是' if ranked == expected else '否'}")
+
+if __name__ == "__main__":
+    main()
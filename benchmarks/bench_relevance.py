@@ -0,0 +1,60 @@
+"""
+AI相关性过滤性能测试
+
+用benchmarks/fixtures中的GitHub热门页面和Hugging Face模型列表生成候选项目，
+测试训练时间、批量打分的吞吐量和过滤结果
+
+用法: python benchmarks/bench_relevance.py --candidates 5000 --rounds 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import config
+from relevance import RelevanceClassifier
+from trending_parser import extract_articles
+
+def load_candidates(count):
+    fixtures = os.path.join(BENCH_DIR, "fixtures")
+    with open(os.path.join(fixtures, "github_trending.html"), encoding="utf-8") as f:
+        projects = [{"name": record["repo_path"], "description": record["description"], "language": record["language"]}
+                    for record in extract_articles(f.read())]
+    with open(os.path.join(fixtures, "hf_models.json"), encoding="utf-8") as f:
+        projects += [{"name": item.get("id", ""), "description": item.get("pipeline_tag") or "", "tags": item.get("tags") or []}
+                     for item in json.load(f)]
+    return [dict(projects[i % len(projects)]) for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description="AI相关性过滤性能测试")
+    parser.add_argument("--candidates", type=int, default=5000, help="每轮打分的候选项目数")
+    parser.add_argument("--rounds", type=int, default=3, help="重复测试的次数")
+    args = parser.parse_args()
+
+    model_path = os.path.join(tempfile.mkdtemp(), config.RELEVANCE_MODEL_NAME)
+    start = time.perf_counter()
+    classifier = RelevanceClassifier(model_path=model_path).load_or_train()
+    train_time = time.perf_counter() - start
+    start = time.perf_counter()
+    RelevanceClassifier(model_path=model_path).load_or_train()
+    load_time = time.perf_counter() - start
+
+    candidates = load_candidates(args.candidates)
+    timings = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        kept, dropped = classifier.filter(candidates)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    print(f"训练: {train_time * 1000:.0f} ms（{len(classifier.examples)}个样本），读取已保存的权重: {load_time * 1000:.1f} ms")
+    print(f"打分: {len(candidates)}个候选项目 {best * 1000:.1f} ms（每秒{len(candidates) / best:.0f}个）")
+    print(f"保留: {len(kept)}个，去掉: {len(dropped)}个")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+邮件报告渲染性能测试
+
+用法: python benchmarks/bench_render.py --projects 1000 --rounds 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_renderer import REPORT_SECTIONS, render_report
+
+SAMPLE_ANALYSIS = """### 1. 项目介绍
+这是一个用于**大模型推理加速**的开源项目，支持 `int4` 量化和 <b>多卡</b> 并行。
+
+### 2. 项目的应用场景
+- 在线对话服务
+- 离线批量推理
+- 边缘设备部署
+
+### 3. 项目评价
+1. 优点：*性能优秀*，文档完善，详见 [官网](https://example.com/docs?a=1&b=2)
+2. 缺点：对旧硬件支持有限
+
+```python
+model = load("example")
+```
+"""
+
+def make_analyses(num_projects, seed=0):
+    """生成指定数量的模拟分析结果，平均分配到各个板块"""
+    rng = random.Random(seed)
+    analyses = {section.key: [] for section in REPORT_SECTIONS}
+    keys = list(analyses)
+    for i in range(num_projects):
+        key = keys[i % len(keys)]
+        project = {
+            "name": f"org-{i % 97}/project-{i}",
+            "url": f"https://example.com/org-{i % 97}/project-{i}",
+            "description": f"Project {i} <with> & special \"chars\"",
+            "language": rng.choice(["Python", "C++", "Rust"]),
+            "stars": str(rng.randint(500, 90000)),
+            "tags": [f"tag-{j}" for j in range(rng.randint(0, 12))],
+            "likes": rng.randint(0, 5000),
+            "downloads": rng.randint(0, 10 ** 7),
+        }
+        analyses[key].append({"project": project, "analysis": SAMPLE_ANALYSIS})
+    return analyses
+
+def main():
+    parser = argparse.ArgumentParser(description="邮件报告渲染性能测试")
+    parser.add_argument("--projects", type=int, default=1000, help="报告中的项目总数")
+    parser.add_argument("--rounds", type=int, default=5, help="重复渲染的次数")
+    args = parser.parse_args()
+
+    analyses = make_analyses(args.projects)
+
+    timings = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        html = render_report(analyses)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"项目数: {args.projects}，HTML大小: {len(html) / 1024:.0f} KB")
+    print(f"最快: {best * 1000:.1f} ms，平均: {sum(timings) / len(timings) * 1000:.1f} ms")
+    print(f"吞吐量: {args.projects / best:.0f} 项目/秒")
+
+if __name__ == "__main__":
+    main()
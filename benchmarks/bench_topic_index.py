@@ -0,0 +1,80 @@
+"""
+主题索引性能测试
+
+生成指定行数的随机主题向量索引，测试为一份报告的项目计算向量、查询最近邻和追加写入的耗时
+
+用法: python benchmarks/bench_topic_index.py --rows 100000 --queries 50 --rounds 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import numpy as np
+import config
+from topic_index import TopicIndex, embed_projects
+
+def build_index(directory, rows, dims):
+    """直接写入随机的单位向量和对应的索引行"""
+    rng = np.random.default_rng(0)
+    path = os.path.join(directory, config.TOPIC_INDEX_FILE_NAME)
+    meta_path = os.path.join(directory, config.TOPIC_INDEX_META_NAME)
+    now = int(time.time())
+    with open(path, "wb") as f, open(meta_path, "w", encoding="utf-8") as meta:
+        for start in range(0, rows, 10000):
+            count = min(10000, rows - start)
+            vectors = rng.standard_normal((count, dims)).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            f.write(vectors.tobytes())
+            meta.writelines(f"{i}\t{now - (rows - i) * 60}\tfp{i}\thttps://example.com/p{i}\tproject-{i}\n"
+                            for i in range(start, start + count))
+    return path, meta_path
+
+def sample_projects(count):
+    topics = ["LLM inference engine", "RAG pipeline", "agent framework", "speech recognition", "image generation",
+              "code assistant", "vector database", "fine-tuning toolkit"]
+    return [{"name": f"org{i}/model-{i}", "url": f"https://example.com/new{i}",
+             "description": f"{topics[i % len(topics)]} with {i % 7}-bit quantization", "tags": ["llm", topics[i % len(topics)]]}
+            for i in range(count)]
+
+def best_time(func, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description="主题索引性能测试")
+    parser.add_argument("--rows", type=int, default=100000, help="索引中已有的项目数")
+    parser.add_argument("--queries", type=int, default=50, help="每份报告查询的项目数")
+    parser.add_argument("--rounds", type=int, default=3, help="重复测试的次数")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path, meta_path = build_index(directory, args.rows, config.TOPIC_EMBED_DIMS)
+    start = time.perf_counter()
+    index = TopicIndex(path, meta_path)
+    load_time = time.perf_counter() - start
+
+    projects = sample_projects(args.queries)
+    embed_time, vectors = best_time(lambda: embed_projects(projects, index.dims), args.rounds)
+    search_time, _ = best_time(lambda: index.nearest(vectors, [project["url"] for project in projects]), args.rounds)
+    group_time, groups = best_time(lambda: index.group([dict(project) for project in projects]), args.rounds)
+    analyses = [{"project": project, "fingerprint": f"new{i}"} for i, project in enumerate(projects)]
+    add_time, _ = best_time(lambda: index.add(analyses), 1)
+
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"索引: {args.rows}个项目，{config.TOPIC_EMBED_DIMS}维，向量文件{size_mb:.0f} MB，载入索引{load_time * 1000:.0f} ms")
+    print(f"计算{args.queries}个项目的向量: {embed_time * 1000:.1f} ms")
+    print(f"查询最近邻: {search_time * 1000:.1f} ms（每个项目{search_time * 1000 / args.queries:.2f} ms）")
+    print(f"报告内按主题分组: {group_time * 1000:.1f} ms，{len(groups)}个多项目主题")
+    print(f"追加写入: {add_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+GitHub热门页面解析性能测试
+
+用benchmarks/fixtures中保存的热门页面对比BeautifulSoup和只解析项目条目的HTMLParser后端，
+真实页面有大量导航和脚本，可以用--padding在条目前后加入同等体积的无关内容
+
+用法: python benchmarks/bench_trending_parse.py --pages 50 --padding 400 --rounds 3
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from trending_parser import extract_articles, extract_articles_bs4
+
+# 模拟页面头部导航等与项目无关的内容
+FILLER = '<div class="header-menu"><ul><li><a href="/features" class="HeaderMenu-link">Features</a></li>' \
+         '<li><span class="octicon" data-view-component="true">Explore</span></li></ul></div>\n'
+
+def load_page(padding_kb):
+    with open(os.path.join(BENCH_DIR, "fixtures", "github_trending.html"), encoding="utf-8") as f:
+        html = f.read()
+    if padding_kb:
+        filler = FILLER * (padding_kb * 1024 // len(FILLER) // 2)
+        main_start = html.index("<main>")
+        main_end = html.index("</main>")
+        html = html[:main_start] + filler + html[main_start:main_end] + filler + html[main_end:]
+    return html
+
+def best_time(func, pages, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(pages):
+            result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub热门页面解析性能测试")
+    parser.add_argument("--pages", type=int, default=50, help="每轮解析的页面数（例如语言数×时间范围数）")
+    parser.add_argument("--padding", type=int, default=400, help="在项目条目前后加入的无关内容大小（KB），0表示原始页面")
+    parser.add_argument("--rounds", type=int, default=3, help="重复测试的次数")
+    args = parser.parse_args()
+
+    html = load_page(args.padding)
+    bs4_time, expected = best_time(lambda: extract_articles_bs4(html), args.pages, args.rounds)
+    fast_time, records = best_time(lambda: extract_articles(html), args.pages, args.rounds)
+    megabytes = len(html.encode("utf-8")) * args.pages / 1024 / 1024
+
+    print(f"页面大小: {len(html) / 1024:.0f} KB，项目条目: {len(records)}，页面数: {args.pages}")
+    print(f"BeautifulSoup: {bs4_time * 1000:.1f} ms（{megabytes / bs4_time:.1f} MB/s）")
+    print(f"HTMLParser条目提取: {fast_time * 1000:.1f} ms（{megabytes / fast_time:.1f} MB/s，{bs4_time / fast_time:.1f}倍）")
+    print(f"结果一致: {'是' if records == expected else '否'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+"""
+本地模拟上游服务
+
+回放benchmarks/fixtures中录制的响应，模拟GitHub热门页面、GitHub搜索API、GitHub GraphQL接口、Hugging Face API、
+DeepSeek对话接口（支持流式输出和批量JSON回复）、README原始文件和SMTP服务器，可配置延迟、错误率和限流。
+
+用法:
+    with MockUpstream(latency={"deepseek": 0.5}, error_rate={"huggingface": 0.1}) as upstream:
+        upstream.patch_config()
+        ...
+        print(upstream.stats())
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 路径前缀与统计用的阶段名称
+ROUTES = [
+    ("/trending", "github_trending"),
+    ("/search/repositories", "github_search"),
+    ("/api/", "huggingface"),
+    ("/v1/chat/completions", "deepseek"),
+    ("/readme/", "readme"),
+    ("/graphql", "github_graphql"),
+]
+
+# 模拟的GraphQL额度（点数）
+GRAPHQL_RATE_LIMIT = 5000
+
+SAMPLE_ANALYSIS = """### 1. 项目介绍
+{name} 是一个面向开发者的开源项目，提供**开箱即用**的能力。
+
+### 2. 项目的应用场景
+- 在线服务
+- 离线批量处理
+
+### 3. 项目评价
+1. 优点：文档完善，社区活跃
+2. 缺点：对旧硬件支持有限"""
+
+# 模拟的README，包含YAML头、徽章、HTML、代码块和长篇附录，用于测试清理和字节上限
+SAMPLE_README = """---
+license: apache-2.0
+tags: [demo]
+---
+<p align="center"><img src="logo.png"></p>
+
+# {name}
+
+[![CI](https://example.com/badge.svg)](https://example.com/ci) {name} 是一个用于演示的项目，提供**高效**的推理和[完善的文档](https://example.com/docs)。
+
+## Features
+- 支持多种硬件后端
+- 内置量化和批处理
+
+## Installation
+```bash
+pip install {name}
+```
+
+## Usage
+调用`run()`即可开始推理。
+
+| 模型 | 速度 |
+|------|------|
+| base | 1x   |
+
+## Appendix
+"""
+
+_BATCH_COUNT_RE = re.compile(r"请对以下(\d+)个开源项目")
+_PROJECT_NAME_RE = re.compile(r"项目名称[:：]\s*(\S+)")
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    # 并发抓取时同时建立的连接较多，默认的监听队列长度（5）会导致连接被重置
+    request_queue_size = 128
+
+class MockUpstream:
+    """
+    在本机随机端口上启动模拟HTTP和SMTP服务
+
+    latency: 每个阶段的响应延迟（秒），{阶段: 秒}或对所有阶段生效的数值
+    error_rate: 返回500错误的概率
+    rate_limit: 每秒允许的最大请求数，超出时返回429和Retry-After
+    """
+
+    def __init__(self, latency=None, error_rate=None, rate_limit=None, seed=0):
+        self.latency = self._per_stage(latency)
+        self.error_rate = self._per_stage(error_rate)
+        self.rate_limit = self._per_stage(rate_limit)
+        self.random = random.Random(seed)
+
+        self.fixtures = {
+            "github_trending": load_fixture("github_trending.html"),
+            "github_search": load_fixture("github_search.json"),
+            "huggingface": json.loads(load_fixture("hf_models.json")),
+        }
+        self.search_items = {item["full_name"]: item for item in json.loads(self.fixtures["github_search"])["items"]}
+        self.graphql_remaining = GRAPHQL_RATE_LIMIT
+        self.counters = Counter()
+        self.messages = []
+        self._windows = defaultdict(list)
+        self._lock = threading.Lock()
+
+        self.http_server = _MockHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.http_server.daemon_threads = True
+        self.smtp_server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._make_smtp_handler())
+        self.smtp_server.daemon_threads = True
+        self._threads = []
+
+    def _per_stage(self, value):
+        if isinstance(value, dict):
+            return dict(value)
+        return {stage: value for _, stage in ROUTES}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.http_server.server_address[1]}"
+
+    @property
+    def smtp_port(self):
+        return self.smtp_server.server_address[1]
+
+    def start(self):
+        for server in (self.http_server, self.smtp_server):
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in (self.http_server, self.smtp_server):
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def patch_config(self):
+        """让爬虫、分析器和邮件发送都指向模拟服务"""
+        import config
+        from github_crawler import GitHubCrawler
+        from huggingface_crawler import HuggingFaceCrawler
+        from hf_harvester import HuggingFaceHarvester
+        from enrichment import Enricher
+        import github_graphql
+
+        GitHubCrawler.TRENDING_URL = f"{self.base_url}/trending"
+        GitHubCrawler.SEARCH_API_URL = f"{self.base_url}/search/repositories"
+        HuggingFaceCrawler.MODELS_API_URL = f"{self.base_url}/api/models"
+        HuggingFaceHarvester.API_URLS = {kind: f"{self.base_url}/api/{kind}s" for kind in HuggingFaceHarvester.API_URLS}
+        Enricher.GITHUB_README_URLS = [f"{self.base_url}/readme/github/{{name}}/README.md"]
+        Enricher.HUGGINGFACE_README_URL = f"{self.base_url}/readme/huggingface/{{path}}/README.md"
+        # 本地服务不需要礼貌性的请求间隔
+        config.TRENDING_REQUEST_DELAY = 0.01
+        config.GITHUB_GRAPHQL_URL = f"{self.base_url}/graphql"
+        config.GITHUB_TOKEN = "mock-token"
+        github_graphql._client = None
+        config.DEEPSEEK_API_URL = f"{self.base_url}/v1/chat/completions"
+        config.DEEPSEEK_API_KEY = "mock-key"
+        config.SMTP_OVERRIDE = {"host": "127.0.0.1", "port": self.smtp_port, "starttls": False, "login": False}
+        config.SENDER_EMAIL = "bench@example.com"
+        config.SENDER_PASSWORD = ""
+        config.RECIPIENTS = ["reader@example.com"]
+
+    def graphql_node(self, name):
+        """生成GraphQL仓库节点，搜索接口录制的仓库使用录制的数据，其他仓库按名称生成固定的数据"""
+        item = self.search_items.get(name) or {}
+        seed = int(hashlib.md5(name.encode("utf-8")).hexdigest()[:8], 16)
+        now = datetime.now(timezone.utc)
+        timestamp = lambda hours: (now - timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {
+            "nameWithOwner": name,
+            "url": item.get("html_url") or f"https://github.com/{name}",
+            "description": item["description"] if item else f"{name} 的模拟仓库描述",
+            "primaryLanguage": {"name": item.get("language") or "Python"},
+            "stargazerCount": item.get("stargazers_count") or 1000 + seed % 50000,
+            "forkCount": item.get("forks_count") or seed % 3000,
+            "createdAt": item.get("created_at") or timestamp(24 * 400),
+            "updatedAt": item.get("updated_at") or timestamp(seed % 48),
+            "pushedAt": timestamp(seed % 72),
+            "repositoryTopics": {"nodes": [{"topic": {"name": topic}} for topic in item.get("topics") or ["llm", "inference"]]},
+            "latestRelease": {"tagName": f"v{seed % 4}.{seed % 10}.0", "publishedAt": timestamp(24 * (seed % 30))},
+            "defaultBranchRef": {"target": {"oid": hashlib.sha1(name.encode("utf-8")).hexdigest()}},
+            "readme": {"text": SAMPLE_README.format(name=name.split("/")[-1])},
+            "stargazers": {"edges": [{"starredAt": timestamp(6 * i + seed % 6)} for i in range(seed % 60)]},
+        }
+
+    def stats(self):
+        """各阶段的请求数、注入的错误数和收到的邮件数"""
+        with self._lock:
+            stats = dict(self.counters)
+        stats["smtp_messages"] = len(self.messages)
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _fault(self, stage):
+        """按配置注入延迟、限流和错误，返回需要返回的错误状态码"""
+        delay = self.latency.get(stage)
+        if delay:
+            time.sleep(delay)
+
+        limit = self.rate_limit.get(stage)
+        if limit:
+            now = time.monotonic()
+            with self._lock:
+                window = [t for t in self._windows[stage] if now - t < 1.0]
+                limited = len(window) >= limit
+                if not limited:
+                    window.append(now)
+                self._windows[stage] = window
+            if limited:
+                return 429
+
+        rate = self.error_rate.get(stage)
+        if rate:
+            with self._lock:
+                failed = self.random.random() < rate
+            if failed:
+                return 500
+        return None
+
+    def _make_handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    # 客户端读到字节上限后会提前关闭连接
+                    pass
+
+            def _stage(self):
+                path = urlparse(self.path).path
+                for prefix, stage in ROUTES:
+                    if path.startswith(prefix):
+                        return stage
+                return None
+
+            def _send(self, status, body=b"", content_type="application/json", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def _handle(self):
+                # 先读完请求体，返回错误时连接仍可复用
+                length = int(self.headers.get("Content-Length") or 0)
+                self.body = self.rfile.read(length) if length else b""
+                stage = self._stage()
+                if stage is None:
+                    self._send(404, b'{"error": "not found"}')
+                    return
+                upstream._count(stage)
+
+                status = upstream._fault(stage)
+                if status is not None:
+                    upstream._count(f"{stage}_{status}")
+                    headers = {"Retry-After": "1"} if status == 429 else None
+                    self._send(status, b'{"error": "injected"}', headers=headers)
+                    return
+
+                if stage == "deepseek":
+                    self._deepseek()
+                elif stage == "huggingface":
+                    self._huggingface()
+                elif stage == "readme":
+                    self._readme()
+                elif stage == "github_graphql":
+                    self._graphql()
+                else:
+                    content_type = "text/html; charset=utf-8" if stage == "github_trending" else "application/json"
+                    self._fixture(upstream.fixtures[stage], content_type)
+
+            def _fixture(self, body, content_type="application/json", headers=None):
+                """返回录制的响应，支持ETag条件请求"""
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    upstream._count("not_modified")
+                    self._send(304, headers={"ETag": etag})
+                    return
+                self._send(200, body, content_type, dict(headers or {}, ETag=etag))
+
+            def _huggingface(self):
+                """按limit参数分页返回模型列表，下一页地址放在Link响应头中"""
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                items = upstream.fixtures["huggingface"]
+                limit = int(query.get("limit", [len(items)])[0])
+                page = int(query.get("page", [0])[0])
+                chunk = items[page * limit:(page + 1) * limit]
+
+                headers = {}
+                if (page + 1) * limit < len(items):
+                    next_query = {key: values[0] for key, values in query.items()}
+                    next_query["page"] = page + 1
+                    headers["Link"] = f'<{upstream.base_url}{url.path}?{urlencode(next_query)}>; rel="next"'
+                self._fixture(json.dumps(chunk).encode("utf-8"), headers=headers)
+
+            def _readme(self):
+                """返回约256KB的README，超出部分应被客户端的字节上限截断"""
+                name = urlparse(self.path).path.split("/")[-2]
+                body = SAMPLE_README.format(name=name) + "附录内容，与分析无关。\n" * 8000
+                self._fixture(body.encode("utf-8"), "text/plain; charset=utf-8")
+
+            def _graphql(self):
+                """
+                支持仓库搜索和按名称批量查询两种GraphQL查询
+
+                不解析查询语句，只根据是否包含search和变量owner0/name0...决定返回内容
+                """
+                payload = json.loads(self.body or b"{}")
+                query = payload.get("query", "")
+                variables = payload.get("variables") or {}
+                data = {}
+                if "search(" in query:
+                    items = list(upstream.search_items.values())
+                    start = int(variables.get("after") or 0)
+                    end = start + int(variables.get("first") or 10)
+                    nodes = [upstream.graphql_node(item["full_name"]) for item in items[start:end]]
+                    data["search"] = {"pageInfo": {"hasNextPage": end < len(items), "endCursor": str(end)}, "nodes": nodes}
+                else:
+                    i = 0
+                    while f"owner{i}" in variables:
+                        data[f"r{i}"] = upstream.graphql_node(f"{variables[f'owner{i}']}/{variables[f'name{i}']}")
+                        i += 1
+                    nodes = list(data.values())
+
+                # 与GitHub相同的计费方式：连接数（主题和星标各一个）除以100向上取整
+                cost = max(1, -(-(1 + 2 * len(nodes)) // 100))
+                with upstream._lock:
+                    upstream.graphql_remaining = max(0, upstream.graphql_remaining - cost)
+                    remaining = upstream.graphql_remaining
+                reset_at = (datetime.now(timezone.utc) + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+                data["rateLimit"] = {"cost": cost, "remaining": remaining, "resetAt": reset_at}
+                self._send(200, json.dumps({"data": data}, ensure_ascii=False).encode("utf-8"))
+
+            def _deepseek(self):
+                payload = json.loads(self.body or b"{}")
+                prompt = payload.get("messages", [{}])[-1].get("content", "")
+
+                match = _BATCH_COUNT_RE.search(prompt)
+                if payload.get("response_format", {}).get("type") == "json_object" and match:
+                    names = _PROJECT_NAME_RE.findall(prompt)
+                    results = [
+                        {"id": i, "analysis": SAMPLE_ANALYSIS.format(name=names[i - 1] if i <= len(names) else f"项目{i}")}
+                        for i in range(1, int(match.group(1)) + 1)
+                    ]
+                    content = json.dumps({"results": results}, ensure_ascii=False)
+                else:
+                    names = _PROJECT_NAME_RE.findall(prompt)
+                    content = SAMPLE_ANALYSIS.format(name=names[0] if names else "该项目")
+
+                usage = {"prompt_tokens": len(prompt) // 2, "completion_tokens": len(content) // 2}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+                if not payload.get("stream"):
+                    body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}], "usage": usage}
+                    self._send(200, json.dumps(body, ensure_ascii=False).encode("utf-8"))
+                    return
+
+                # 以SSE格式分块返回
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for start in range(0, len(content), 40):
+                    chunk = {"choices": [{"index": 0, "delta": {"content": content[start:start + 40]}}]}
+                    self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+                if payload.get("stream_options", {}).get("include_usage"):
+                    self._write_chunk(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n")
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text):
+                data = text.encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+            do_GET = _handle
+            do_POST = _handle
+
+        return Handler
+
+    def _make_smtp_handler(self):
+        upstream = self
+
+        class SMTPHandler(socketserver.StreamRequestHandler):
+            """只实现发送邮件所需命令的SMTP服务端"""
+
+            def _reply(self, line):
+                self.wfile.write(line.encode("ascii") + b"\r\n")
+
+            def handle(self):
+                self._reply("220 mock-smtp ready")
+                recipients = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode("utf-8", "replace").strip()
+                    verb = command.split(" ", 1)[0].upper()
+
+                    if verb == "EHLO":
+                        self.wfile.write(b"250-mock-smtp\r\n250-8BITMIME\r\n250 SIZE 52428800\r\n")
+                    elif verb == "HELO":
+                        self._reply("250 mock-smtp")
+                    elif verb == "MAIL":
+                        recipients = []
+                        self._reply("250 OK")
+                    elif verb == "RCPT":
+                        recipients.append(command.split(":", 1)[-1].strip(" <>"))
+                        self._reply("250 OK")
+                    elif verb == "DATA":
+                        self._reply("354 End data with <CR><LF>.<CR><LF>")
+                        size = 0
+                        while True:
+                            data = self.rfile.readline()
+                            if not data or data in (b".\r\n", b".\n"):
+                                break
+                            size += len(data)
+                        with upstream._lock:
+                            upstream.messages.append({"recipients": recipients, "size": size})
+                        self._reply("250 OK queued")
+                    elif verb in ("RSET", "NOOP"):
+                        self._reply("250 OK")
+                    elif verb == "QUIT":
+                        self._reply("221 Bye")
+                        return
+                    else:
+                        self._reply("502 Command not implemented")
+
+        return SMTPHandler
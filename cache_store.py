@@ -0,0 +1,193 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+import config
+from metrics import get_metrics
+
+class CacheStore:
+    """
+    基于SQLite的单文件缓存
+
+    所有缓存按(namespace, key)存储为JSON文本，写入在事务中完成，
+    支持按条目年龄和总大小淘汰最久未访问的缓存。
+    """
+
+    # 旧版JSON缓存文件与命名空间的对应关系: (文件名模式, 命名空间, 文件名前缀)
+    # 旧版analysis_*.json按名称的md5保存，而分析缓存现在按项目内容指纹（包含提示版本）查找，
+    # 导入后永远不会命中，因此不迁移，原文件保留在缓存目录中
+    LEGACY_PATTERNS = [
+        ("github_*.json", "crawl", ""),
+        ("huggingface_*.json", "crawl", ""),
+    ]
+
+    def __init__(self, path=None):
+        self.cache_dir = config.CACHE_DIR
+        self.path = path or os.path.join(self.cache_dir, config.CACHE_DB_NAME)
+
+        # 确保缓存目录存在
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # 多个线程共享同一个连接，由锁保证串行访问
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        self._conn.commit()
+
+    def get(self, namespace, key, max_age=None):
+        """
+        读取缓存
+
+        max_age: 最大有效期（秒），超过则视为未命中
+        返回: 缓存的值，未命中时返回None
+        """
+        value = self._read(namespace, key, max_age)
+        get_metrics().inc("cache_requests_total", namespace=namespace, result="miss" if value is None else "hit")
+        return value
+
+    def _read(self, namespace, key, max_age):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if max_age is not None and time.time() - created_at > max_age:
+                return None
+
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (time.time(), namespace, key)
+                )
+
+        return json.loads(value)
+
+    def put(self, namespace, key, value, created_at=None):
+        """写入缓存，整条记录在一个事务中原子替换"""
+        serialized = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, serialized, len(serialized.encode()), created_at or now, now)
+            )
+
+    def delete(self, namespace, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def keys(self, namespace):
+        """列出命名空间下的所有键"""
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM entries WHERE namespace = ?", (namespace,)).fetchall()
+        return [row[0] for row in rows]
+
+    def total_size(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self, max_bytes=None, max_age_days=None):
+        """
+        淘汰缓存：先删除超过最大年龄未访问的条目，再按最久未访问的顺序删除直到总大小不超过上限
+
+        返回: 删除的条目数
+        """
+        if max_bytes is None:
+            max_bytes = config.CACHE_MAX_SIZE_MB * 1024 * 1024
+        if max_age_days is None:
+            max_age_days = config.CACHE_MAX_ENTRY_AGE_DAYS
+
+        removed = 0
+        with self._lock, self._conn:
+            cutoff = time.time() - max_age_days * 86400
+            removed += self._conn.execute("DELETE FROM entries WHERE accessed_at < ?", (cutoff,)).rowcount
+
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > max_bytes:
+                rows = self._conn.execute(
+                    "SELECT namespace, key, size FROM entries ORDER BY accessed_at"
+                ).fetchall()
+                for namespace, key, size in rows:
+                    if total <= max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+                    total -= size
+                    removed += 1
+
+        if removed:
+            print(f"已淘汰{removed}条缓存")
+        return removed
+
+    def migrate_json_cache(self, cache_dir=None):
+        """把旧版缓存目录中的抓取结果JSON文件导入数据库，导入成功后删除原文件"""
+        cache_dir = cache_dir or self.cache_dir
+        migrated = 0
+        for pattern, namespace, prefix in self.LEGACY_PATTERNS:
+            for path in glob.glob(os.path.join(cache_dir, pattern)):
+                key = os.path.basename(path)[len(prefix):-len(".json")]
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        value = json.load(f)
+                    self.put(namespace, key, value, created_at=os.path.getmtime(path))
+                    os.remove(path)
+                    migrated += 1
+                except Exception as e:
+                    print(f"迁移缓存文件 {path} 时出错: {e}")
+
+        if migrated:
+            print(f"已将{migrated}个JSON缓存文件迁移到 {self.path}")
+        return migrated
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_cache_store():
+    """获取当前缓存目录对应的共享缓存，首次打开时自动迁移旧版JSON缓存"""
+    path = os.path.join(config.CACHE_DIR, config.CACHE_DB_NAME)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = CacheStore(path)
+            store.migrate_json_cache()
+            _stores[path] = store
+        return store
+
+def prune_report_files(cache_dir=None, keep=None):
+    """只保留最近的若干个report_*.json报告文件及对应的运行指标和运行记录"""
+    cache_dir = cache_dir or config.CACHE_DIR
+    keep = config.REPORT_FILES_TO_KEEP if keep is None else keep
+
+    # 运行指标、运行记录和性能数据与报告保留相同的数量
+    for pattern in ("report_*.json", "metrics_*.json", "metrics_*.prom", "profile_*.prof", "run_*.jsonl"):
+        files = sorted(glob.glob(os.path.join(cache_dir, pattern)), key=os.path.getmtime, reverse=True)
+        for path in files[keep:]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"删除旧报告 {path} 时出错: {e}")
@@ -3,6 +3,11 @@ import os
 # DeepSeek API 配置
 DEEPSEEK_API_KEY = "写key"
 DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+DEEPSEEK_MODEL = "deepseek-chat"
+
+# 分析缓存配置
+PROMPT_VERSION = 2  # 修改提示模板后递增，使旧的分析缓存失效
+ANALYSIS_METRIC_DRIFT = 0.2  # 星标/点赞/下载量相对变化超过该比例时重新分析
 
 # 邮件配置
 SENDER_EMAIL = "写发件邮箱"
@@ -11,7 +16,12 @@ RECIPIENTS = ["写收件邮箱"]
 
 # 缓存配置
 CACHE_DIR = "cache"
-MAX_CACHE_AGE_DAYS = 1
+MAX_CACHE_AGE_DAYS = 1  # 爬虫列表缓存的有效期，分析缓存按内容指纹判断
+CACHE_DB_NAME = "cache.sqlite3"  # 缓存数据库文件名，位于CACHE_DIR中
+CACHE_MAX_SIZE_MB = 200  # 缓存数据库的最大容量，超出时淘汰最久未访问的条目
+CACHE_MAX_ENTRY_AGE_DAYS = 90  # 超过该天数未访问的缓存条目会被淘汰
+REPORT_FILES_TO_KEEP = 30  # 缓存目录中保留的report_*.json报告文件数量
+REPORT_WRITE_INTERVAL = 5  # 分析过程中重写报告文件的最短间隔（秒），报告完成时总会写入
 
 # API 请求头
 HEADERS = {
@@ -21,3 +31,152 @@ HEADERS = {
 
 # 项目数量
 NUM_PROJECTS = 10
+
+# DeepSeek 分析并发配置
+ANALYSIS_MAX_WORKERS = 4  # 同时进行分析的最大线程数
+DEEPSEEK_TIMEOUT = 120  # 单次DeepSeek请求超时时间（秒）
+DEEPSEEK_MAX_RETRIES = 3  # 遇到限流或服务端错误时的最大重试次数
+DEEPSEEK_BATCH_SIZE = 4  # 每个请求中批量分析的项目数，设为1则逐个分析
+DEEPSEEK_MAX_OUTPUT_TOKENS = 8000  # 单次请求允许的最大输出token数
+DEEPSEEK_STREAM = True  # 使用流式输出，边生成边接收
+REPORT_TIME_BUDGET = 1800  # 分析阶段的总时间预算（秒），超时未完成的项目使用占位内容，设为None则不限制
+
+# 抓取配置
+GITHUB_TRENDING_PARSER = "htmlparser"  # 热门页面解析后端：htmlparser（只解析项目条目，较快）或bs4（BeautifulSoup）
+TRENDING_FANOUT_ENABLED = True  # 抓取多个编程语言和时间范围的GitHub热门页面并合并，关闭时只抓取默认热门页面
+TRENDING_LANGUAGES = ["", "python", "c++", "rust", "jupyter-notebook", "cuda", "typescript", "go"]  # 热门页面的语言，空字符串表示全部语言
+TRENDING_PERIODS = ["daily", "weekly", "monthly"]  # 热门页面的时间范围
+TRENDING_MAX_WORKERS = 4  # 并发抓取热门页面的线程数
+TRENDING_MAX_REQUESTS = 30  # 每次抓取最多请求的热门页面数，超出的页面使用缓存或跳过
+TRENDING_REQUEST_DELAY = 0.5  # 相邻两次热门页面请求之间的最小间隔（秒）
+TRENDING_PAGE_CACHE_HOURS = 12  # 每个热门页面缓存的有效期（小时）
+TRENDING_AI_KEYWORDS = ["llm", "gpt", "ai", "agent", "rag", "diffusion", "transformer", "neural", "model", "inference",
+                        "deep learning", "machine learning", "speech", "vision", "embedding", "大模型", "人工智能"]  # AI相关项目的关键词
+CRAWL_SOURCE_DEADLINE = 90  # 每个来源的抓取截止时间（秒），超时则放弃该来源
+
+# 异步模式下的报告配置，每项对应一份报告，可覆盖项目数量和收件人
+REPORT_CONFIGS = [
+    {"name": "daily", "num_projects": NUM_PROJECTS, "recipients": None},
+]
+
+# HTTP客户端配置
+HTTP_CONNECT_TIMEOUT = 5  # 建立连接超时时间（秒）
+HTTP_READ_TIMEOUT = 30  # 读取响应超时时间（秒），DeepSeek请求使用DEEPSEEK_TIMEOUT
+HTTP_MAX_RETRIES = 3  # 连接失败、限流或服务端错误时的最大重试次数
+HTTP_BACKOFF_FACTOR = 1  # 指数退避基数（秒），第n次重试等待 基数*2^n 秒
+HTTP_MAX_RETRY_WAIT = 60  # Retry-After或限流恢复等待超过该值（秒）时不再重试
+HTTP_POOL_CONNECTIONS = 10  # 缓存的主机连接池数量
+HTTP_POOL_MAXSIZE = 10  # 每个主机连接池的最大连接数
+
+# SMTP配置
+SMTP_PROVIDERS = {
+    # 邮箱域名: SMTP服务器、端口、是否STARTTLS、每分钟最多发送的邮件数
+    "qq.com": {"host": "smtp.qq.com", "port": 587, "starttls": True, "max_per_minute": 20},
+    "163.com": {"host": "smtp.163.com", "port": 25, "starttls": True, "max_per_minute": 15},
+    "gmail.com": {"host": "smtp.gmail.com", "port": 587, "starttls": True, "max_per_minute": 30},
+}
+# 自定义SMTP服务器，设置后忽略SMTP_PROVIDERS，例如本地测试服务器:
+# {"host": "127.0.0.1", "port": 8025, "starttls": False, "login": False}
+SMTP_OVERRIDE = None
+SMTP_TIMEOUT = 30  # SMTP连接超时时间（秒）
+EMAIL_PER_RECIPIENT = False  # 为每个收件人单独发送一份邮件，通过连接池并行发送
+SMTP_POOL_SIZE = 3  # 并行发送时的SMTP连接数
+SMTP_MAX_RETRIES = 2  # 发送失败的收件人最多重试次数
+SMTP_RETRY_BACKOFF = 5  # 重试退避基数（秒）
+
+# Hugging Face分页抓取配置
+HF_HARVEST_MAX_PAGES = 5  # 最多抓取的页数，大于1时启用分页流式抓取，设为1时只请求一页列表
+HF_HARVEST_PAGE_SIZE = 100  # 每页条目数
+HF_HARVEST_KINDS = ["model"]  # 抓取的类型，可添加"dataset"和"space"
+
+# 排名配置
+# 大公司或知名组织的列表，作者或项目名中包含其中任一名称的项目会获得额外加分
+MAJOR_ORGANIZATIONS = [
+    "google", "meta", "facebook", "microsoft", "openai", "deepmind", "anthropic",
+    "baidu", "tencent", "alibaba", "huawei", "nvidia", "apple", "amazon", "intel",
+    "ibm", "adobe", "twitter", "netflix", "salesforce", "uber", "lyft", "airbnb",
+    "pinterest", "snap", "dropbox", "huggingface", "stability", "cohere", "deepseek",
+    "zhipu", "bytedance", "xiaomi", "01ai", "mila", "stanford", "berkeley", "mit",
+    "carnegie", "nvidia", "amd", "pytorch", "tensorflow", "jax", "neurips", "google-research",
+    "facebookresearch", "openai-research", "stabilityai", "mistralai", "llama"
+]
+RANKING_FORMULAS = {
+    # major_org_bonus: 知名组织加分；terms: (字段, 权重, 上限)，每项得分为 min(floor(字段值*权重), 上限)
+    "huggingface": {
+        "major_org_bonus": 100,
+        "terms": [("likes", 2, 200), ("downloads", 0.001, 300)],  # 每个点赞2分最多200分，每1000下载1分最多300分
+    },
+    "github": {
+        "major_org_bonus": 100,
+        "terms": [("stars_value", 0.01, 300)],  # 每100星标1分，最多300分
+    },
+    # 多语言、多时间范围合并后的GitHub热门项目
+    "github_trending": {
+        "major_org_bonus": 100,
+        "terms": [
+            ("stars_value", 0.01, 300),  # 每100星标1分，最多300分
+            ("stars_per_day", 1, 200),  # 每天新增1个星标1分，最多200分
+            ("trending_page_count", 20, 100),  # 每出现在一个热门页面20分，最多100分
+            ("ai_related", 200, 200),  # 名称或描述与AI相关加200分
+        ],
+    },
+}
+
+# 项目历史记录配置
+HISTORY_FILE_NAME = "history.bin"  # 指标历史记录文件（定长二进制记录，只追加）
+HISTORY_INDEX_NAME = "history_index.tsv"  # 项目编号与URL的索引文件
+HISTORY_GROWTH_DAYS = 7  # 统计增长的时间窗口（天）
+HISTORY_TOP_GROWTH = 10  # 报告中列出的增长最快项目数
+
+# 近似重复项目合并配置
+DEDUP_ENABLED = True  # 分析前合并量化版本、镜像和复刻等近似重复的项目
+DEDUP_NUM_PERM = 64  # MinHash哈希函数个数
+DEDUP_BANDS = 16  # LSH分段数，须整除DEDUP_NUM_PERM，段数越多越容易成为候选
+DEDUP_THRESHOLD = 0.5  # 估计的Jaccard相似度达到该值视为近似重复
+
+# 提示文本和token预算配置
+PROMPT_INPUT_TOKENS = 900  # 每个项目信息部分的最大输入token数，超出时截断描述、减少标签
+PROMPT_MAX_TAGS = 20  # 提示中最多包含的标签数
+PROMPT_OUTPUT_TIERS = [(3, 2000), (10, 1200), (None, 800)]  # (排名上限, max_tokens)，None表示其余所有排名
+PROMPT_SUMMARY_MAX_TOKENS = 300  # 简短摘要模式的max_tokens
+DAILY_TOKEN_CEILING = 1000000  # 每日token用量上限（输入+输出），0表示不限制
+DAILY_COST_CEILING = 10.0  # 每日费用上限（元），0表示不限制
+BUDGET_DOWNGRADE_RATIO = 0.8  # 用量达到上限的该比例后，第一档以外的项目只生成简短摘要
+DEEPSEEK_INPUT_PRICE = 2.0  # 输入单价（元/百万token）
+DEEPSEEK_OUTPUT_PRICE = 8.0  # 输出单价（元/百万token）
+
+# README/模型卡片补充信息配置
+ENRICH_ENABLED = True  # 分析前获取项目的README或模型卡片，提取摘要加入提示文本
+ENRICH_MAX_WORKERS = 8  # 并发获取README的线程数
+ENRICH_MAX_BYTES = 64 * 1024  # 每个README最多读取的字节数，超出部分不再下载
+ENRICH_SUMMARY_CHARS = 1500  # 提取的README摘要最大字符数
+ENRICH_PROMPT_TOKENS = 300  # README摘要在提示文本中最多占用的token数
+
+# GitHub GraphQL配置（需要访问令牌，保存在github_token.txt或GITHUB_TOKEN中）
+GITHUB_GRAPHQL_ENABLED = True  # 有访问令牌时使用GraphQL获取GitHub最新项目并补充热门项目的信息
+GITHUB_TOKEN = ""  # GitHub访问令牌，github_token.txt存在时优先使用文件中的令牌
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"  # GraphQL接口地址
+GITHUB_GRAPHQL_PAGE_SIZE = 50  # 搜索时每页的仓库数，最多100
+GITHUB_GRAPHQL_MIN_REMAINING = 100  # 查询后至少保留的GraphQL额度（点数），不足时停止翻页
+GITHUB_GRAPHQL_RECENT_STARS = 100  # 每个仓库最多统计的最近星标数
+GITHUB_RECENT_STAR_DAYS = 7  # 统计最近新增星标的天数
+
+# AI相关性过滤配置
+RELEVANCE_ENABLED = True  # 排名前用本地分类器去掉与AI无关的GitHub候选项目（Hugging Face上的模型都与AI相关，不过滤）
+RELEVANCE_THRESHOLD = None  # 与AI相关的概率低于该值的项目被去掉，None表示使用在留出样本上校准的阈值
+RELEVANCE_DIMS = 2 ** 18  # 哈希特征的维数
+RELEVANCE_MODEL_NAME = "relevance_model.npz"  # 缓存目录中保存模型权重的文件名
+RELEVANCE_EXTRA_EXAMPLES = []  # 追加的训练样本，例如[("Vector database for embeddings", 1), ("Blog theme", 0)]
+
+# 主题索引配置
+TOPIC_INDEX_ENABLED = True  # 记录分析过的项目的主题向量，报告中按主题分组、标注往期相似项目并复用近似相同项目的分析
+TOPIC_INDEX_FILE_NAME = "topic_index.f32"  # 主题向量文件（float32定长行，只追加，查询时内存映射）
+TOPIC_INDEX_META_NAME = "topic_index.tsv"  # 向量行号与项目URL、分析缓存指纹的索引文件
+TOPIC_EMBED_DIMS = 512  # 主题向量的维数
+TOPIC_SEARCH_CHUNK_ROWS = 65536  # 最近邻查询时每次读取的向量行数
+TOPIC_NEIGHBOURS = 5  # 每个项目查询的最近邻个数
+TOPIC_GROUP_SIMILARITY = 0.4  # 当前报告中余弦相似度达到该值的项目归为同一主题
+TOPIC_COVERED_SIMILARITY = 0.5  # 与往期项目的相似度达到该值时标注为已覆盖过的主题
+TOPIC_COVERED_DAYS = 30  # 标注往期相似项目时回看的天数
+TOPIC_REUSE_SIMILARITY = 0.95  # 与近期分析过的项目相似度达到该值时直接复用其分析结果
+TOPIC_REUSE_DAYS = 7  # 复用分析结果的时间范围（天）
@@ -0,0 +1,93 @@
+import config
+from cache_store import get_cache_store
+
+# 比较时关注的文本字段和数值字段
+TEXT_FIELDS = ("description", "language", "tags")
+METRIC_FIELDS = ("stars_value", "likes", "downloads")
+
+def _project_key(project):
+    return project.get("url") or project.get("name", "")
+
+def _metric(project, field):
+    try:
+        return float(project.get(field) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def is_changed(old, new, metric_drift=None):
+    """文本字段有变化，或数值字段相对变化超过阈值时视为已变化"""
+    if metric_drift is None:
+        metric_drift = config.ANALYSIS_METRIC_DRIFT
+
+    for field in TEXT_FIELDS:
+        if old.get(field) != new.get(field):
+            return True
+    for field in METRIC_FIELDS:
+        old_value, new_value = _metric(old, field), _metric(new, field)
+        if old_value == new_value:
+            continue
+        if old_value == 0 or abs(new_value - old_value) / old_value > metric_drift:
+            return True
+    return False
+
+def compute_delta(previous, current):
+    """
+    比较两次抓取的结果
+
+    返回: {"new": [...], "changed": [...], "unchanged": [...], "dropped": [...]}
+    dropped为上次出现而本次不再出现的项目，其余为本次的项目
+    """
+    previous_by_key = {_project_key(project): project for project in previous or []}
+    current_keys = set()
+    delta = {"new": [], "changed": [], "unchanged": [], "dropped": []}
+
+    for project in current:
+        key = _project_key(project)
+        current_keys.add(key)
+        old = previous_by_key.get(key)
+        if old is None:
+            delta["new"].append(project)
+        elif is_changed(old, project):
+            delta["changed"].append(project)
+        else:
+            delta["unchanged"].append(project)
+
+    delta["dropped"] = [project for key, project in previous_by_key.items() if key not in current_keys]
+    return delta
+
+class DeltaTracker:
+    """记录每个来源上一次的抓取结果，计算本次相对上次的变化"""
+
+    def __init__(self):
+        self.cache = get_cache_store()
+
+    def update(self, source_key, projects):
+        """
+        计算变化并保存本次结果作为下次比较的基准
+
+        每个项目会被标注"delta"字段（new/changed/unchanged），供后续阶段只处理变化的项目
+        """
+        previous = self.cache.get("crawl_snapshot", source_key)
+        delta = compute_delta(previous, projects)
+
+        for status in ("new", "changed", "unchanged"):
+            for project in delta[status]:
+                project["delta"] = status
+
+        # 未变化的项目保留原来的基准，避免数值缓慢增长时一直被判为未变化
+        previous_by_key = {_project_key(project): project for project in previous or []}
+        snapshot = [
+            previous_by_key.get(_project_key(project), project) if project["delta"] == "unchanged" else project
+            for project in projects
+        ]
+        self.cache.put("crawl_snapshot", source_key, snapshot)
+        return delta
+
+def summarize_delta(delta):
+    """变化的数量统计，用于日志和报告"""
+    return {
+        "new": len(delta["new"]),
+        "changed": len(delta["changed"]),
+        "unchanged": len(delta["unchanged"]),
+        "dropped": [project.get("name", "未知项目") for project in delta["dropped"]],
+    }
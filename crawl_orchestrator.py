@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import config
+from metrics import get_metrics
+
+class CrawlOrchestrator:
+    """并发抓取多个来源，每个来源有独立的截止时间"""
+
+    def __init__(self, deadline=None):
+        self.deadline = deadline or config.CRAWL_SOURCE_DEADLINE
+        # 每个来源的耗时统计: {key: {"status": ..., "seconds": ...}}
+        self.timings = {}
+
+    def _timed_fetch(self, key, fetch):
+        """执行抓取函数并记录耗时"""
+        start = time.perf_counter()
+        try:
+            with get_metrics().span("crawl", source=key) as span:
+                projects = fetch()
+                span["projects"] = len(projects or [])
+                return projects
+        finally:
+            elapsed = time.perf_counter() - start
+            # 超时的来源在截止时已记录状态，这里只补充实际耗时
+            timing = self.timings.setdefault(key, {"status": "ok"})
+            timing["seconds"] = round(elapsed, 3)
+
+    def crawl(self, sources):
+        """
+        并发执行所有来源的抓取
+
+        sources: [(key, source_name, fetch), ...]，fetch为无参数的抓取函数
+        返回: {key: projects}，失败或超时的来源返回空列表
+        """
+        self.timings = {}
+        results = {}
+        start = time.perf_counter()
+
+        executor = ThreadPoolExecutor(max_workers=len(sources))
+        futures = [
+            (key, source_name, executor.submit(self._timed_fetch, key, fetch))
+            for key, source_name, fetch in sources
+        ]
+
+        for key, source_name, future in futures:
+            remaining = max(0, self.deadline - (time.perf_counter() - start))
+            try:
+                results[key] = future.result(timeout=remaining)
+                print(f"已获取{source_name}项目: {len(results[key])}个")
+            except TimeoutError:
+                print(f"获取{source_name}项目超时（超过{self.deadline}秒），跳过该来源")
+                self.timings[key] = {"status": "timeout", "seconds": self.deadline}
+                results[key] = []
+            except Exception as e:
+                print(f"获取{source_name}项目时出错: {e}")
+                self.timings.setdefault(key, {})["status"] = "error"
+                results[key] = []
+
+        # 不等待超时的抓取线程结束，避免拖慢整个报告
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for key, source_name, _ in futures:
+            timing = self.timings.get(key, {})
+            print(f"{source_name}抓取耗时: {timing.get('seconds', 0):.2f}秒 ({timing.get('status', 'unknown')})")
+
+        return results
@@ -0,0 +1,189 @@
+import re
+import zlib
+from urllib.parse import urlparse
+import numpy as np
+import config
+
+# 量化版本或格式转换常见的名称后缀和标签，比较时忽略
+VARIANT_TOKENS = {
+    "gguf", "ggml", "awq", "gptq", "exl2", "mlx", "onnx", "openvino", "quantized", "quant", "imatrix",
+    "int4", "int8", "fp16", "bf16", "fp8", "fp32", "4bit", "8bit", "bnb", "hf", "i1",
+}
+_VARIANT_RE = re.compile(r"^(q\d\w*|iq\d\w*|\d+bit|w\d+a\d+|\d+bpw|[a-z])$")
+# 大量项目共有的标签，不能说明两个项目相似
+GENERIC_TAG_PREFIXES = ("license:", "region:", "endpoints_compatible", "autotrain_compatible",
+                        "text-generation-inference", "safetensors", "transformers", "pytorch", "deploy:")
+_NAME_SPLIT_RE = re.compile(r"[-_.\s/]+")
+_WORD_RE = re.compile(r"\w+")
+
+# MinHash使用的哈希参数: (a * x + b) >> 32，a为奇数
+_HASH_SHIFT = np.uint64(32)
+
+def name_stem_tokens(name):
+    """项目名去掉作者和量化后缀后的词"""
+    stem = name.rsplit("/", 1)[-1].lower()
+    return [token for token in _NAME_SPLIT_RE.split(stem)
+            if token and token not in VARIANT_TOKENS and not _VARIANT_RE.match(token)]
+
+def project_shingles(project):
+    """项目的特征集合: 名称词干、描述中的相邻词对和标签"""
+    shingles = set()
+    stem = name_stem_tokens(project.get("name") or "")
+    shingles.update(f"n:{token}" for token in stem)
+    if stem:
+        shingles.add("s:" + "-".join(stem))
+
+    words = _WORD_RE.findall((project.get("description") or "").lower())
+    if len(words) == 1:
+        shingles.add(f"d:{words[0]}")
+    shingles.update(f"d:{first} {second}" for first, second in zip(words, words[1:]))
+
+    for tag in project.get("tags") or []:
+        tag = str(tag).lower()
+        if tag in VARIANT_TOKENS or tag.startswith(GENERIC_TAG_PREFIXES):
+            continue
+        shingles.add(f"t:{tag}")
+    return shingles
+
+class Deduplicator:
+    """
+    近似重复项目聚类
+
+    用MinHash估计项目特征集合的Jaccard相似度，用LSH分桶只比较可能相似的项目，
+    相似度达到阈值的项目用并查集合并为一组，每组只保留一个代表项目进行分析。
+    """
+
+    def __init__(self, num_perm=None, bands=None, threshold=None, seed=1):
+        self.num_perm = num_perm or config.DEDUP_NUM_PERM
+        self.bands = bands or config.DEDUP_BANDS
+        self.threshold = config.DEDUP_THRESHOLD if threshold is None else threshold
+        if self.num_perm % self.bands:
+            raise ValueError("DEDUP_NUM_PERM必须是DEDUP_BANDS的整数倍")
+        self.rows = self.num_perm // self.bands
+
+        rng = np.random.default_rng(seed)
+        self.hash_a = rng.integers(1, 2 ** 63, size=self.num_perm, dtype=np.uint64) | np.uint64(1)
+        self.hash_b = rng.integers(0, 2 ** 63, size=self.num_perm, dtype=np.uint64)
+
+    def signatures(self, projects, chunk_size=2000):
+        """计算所有项目的MinHash签名，没有特征的项目签名全为最大值"""
+        empty = np.iinfo(np.uint64).max
+        result = np.full((len(projects), self.num_perm), empty, dtype=np.uint64)
+
+        for chunk_start in range(0, len(projects), chunk_size):
+            hashes = []
+            owners = []
+            for offset, project in enumerate(projects[chunk_start:chunk_start + chunk_size]):
+                shingles = project_shingles(project)
+                hashes.extend(zlib.crc32(shingle.encode("utf-8")) for shingle in shingles)
+                owners.extend([offset] * len(shingles))
+            if not hashes:
+                continue
+
+            hashes = np.array(hashes, dtype=np.uint64)
+            owners = np.array(owners, dtype=np.int64)
+            # 每个特征在所有哈希函数下的取值，无符号整数溢出即取模2^64
+            with np.errstate(over="ignore"):
+                values = (self.hash_a[:, None] * hashes[None, :] + self.hash_b[:, None]) >> _HASH_SHIFT
+            # 特征按项目连续排列，按段取最小值即为签名
+            starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+            result[chunk_start + owners[starts]] = np.minimum.reduceat(values, starts, axis=1).T
+        return result
+
+    def cluster(self, projects):
+        """
+        把近似重复的项目分组
+
+        返回: 多于一个项目的分组列表，每组为项目下标列表，第一个为最早出现的项目
+        """
+        if len(projects) < 2:
+            return []
+        signatures = self.signatures(projects)
+        has_features = signatures[:, 0] != np.iinfo(np.uint64).max
+
+        parent = list(range(len(projects)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            rows = np.ascontiguousarray(signatures[:, band * self.rows:(band + 1) * self.rows])
+            keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * self.rows))).ravel()
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            order = np.argsort(inverse, kind="stable")
+            # 按桶排列后各桶的起止位置，只处理有多个项目的桶
+            ends = np.cumsum(counts)
+            shared = counts > 1
+            for start, end in zip((ends - counts)[shared], ends[shared]):
+                members = order[start:end]
+                members = members[has_features[members]]
+                # 同一个桶中的项目两两用完整签名确认相似度，不只与桶中第一个项目比较
+                for position, i in enumerate(members[:-1]):
+                    others = members[position + 1:]
+                    similar = others[np.mean(signatures[others] == signatures[i], axis=1) >= self.threshold]
+                    for j in similar:
+                        root_i, root_j = find(i), find(j)
+                        if root_i != root_j:
+                            # 以较早出现的项目作为根
+                            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups = {}
+        for i in range(len(projects)):
+            groups.setdefault(find(i), []).append(i)
+        return [members for members in groups.values() if len(members) > 1]
+
+    def collapse_sources(self, sources):
+        """
+        合并各来源中的近似重复项目
+
+        sources: {来源键: [项目, ...]}
+        每组只在每个来源中保留最早出现的项目，其余项目作为"siblings"附加到保留的项目上；
+        保留的项目标注"cluster"为组内同一网站的代表项目的URL，分析时同一组在每个网站只分析一次。
+        返回: ({来源键: [项目, ...]}, 被合并的项目数)
+        """
+        # 按URL去重后再聚类，同一个项目出现在多个来源中不算重复
+        unique = {}
+        for projects in sources.values():
+            for project in projects or []:
+                unique.setdefault(project.get("url") or project.get("name", ""), project)
+        candidates = list(unique.values())
+        cluster_of = {}
+        for members in self.cluster(candidates):
+            for index in members:
+                cluster_of[self._key(candidates[index])] = [candidates[i] for i in members]
+
+        collapsed = {}
+        removed = 0
+        for key, projects in sources.items():
+            kept = []
+            seen_clusters = set()
+            for project in projects or []:
+                members = cluster_of.get(self._key(project))
+                if members is None:
+                    kept.append(project)
+                    continue
+                # 代表项目取同一网站中最早出现的项目，GitHub仓库和Hugging Face模型分别分析，
+                # 报告中各来源显示的都是本网站项目的分析
+                site = self._site(project)
+                representative = self._key(next(member for member in members if self._site(member) == site))
+                if representative in seen_clusters:
+                    removed += 1
+                    continue
+                seen_clusters.add(representative)
+                project["cluster"] = representative
+                project["siblings"] = [
+                    {"name": member.get("name", "未知项目"), "url": member.get("url", "")}
+                    for member in members if self._key(member) != self._key(project)
+                ]
+                kept.append(project)
+            collapsed[key] = kept
+        return collapsed, removed
+
+    def _key(self, project):
+        return project.get("url") or project.get("name", "")
+
+    def _site(self, project):
+        return urlparse(project.get("url") or "").netloc
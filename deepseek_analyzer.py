@@ -1,25 +1,41 @@
-import requests
+import hashlib
 import json
-import os
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 import config
+from http_client import get_http_client
+from cache_store import get_cache_store
+from metrics import get_metrics
+from prompt_budget import BudgetExceededError, PromptBuilder, count_tokens, get_token_ledger
 
 class DeepSeekAnalyzer:
+    # 参与缓存指纹计算的提示文本字段，任一字段变化都会重新分析
+    FINGERPRINT_FIELDS = ("name", "url", "description", "language", "tags", "readme_summary")
+    # 数值字段，仅当相对变化超过阈值时才重新分析
+    METRIC_FIELDS = ("stars_value", "likes", "downloads")
+    
     def __init__(self):
-        self.cache_dir = config.CACHE_DIR
-        self.max_cache_age_days = config.MAX_CACHE_AGE_DAYS
+        self.cache = get_cache_store()
+        self.model = config.DEEPSEEK_MODEL
+        self.prompt_version = config.PROMPT_VERSION
+        self.metric_drift = config.ANALYSIS_METRIC_DRIFT
         
         # 从配置文件获取API密钥
         self.api_key = self._get_api_key()
         self.api_url = config.DEEPSEEK_API_URL
+        self.timeout = config.DEEPSEEK_TIMEOUT
+        self.max_retries = config.DEEPSEEK_MAX_RETRIES
+        self.stream = config.DEEPSEEK_STREAM
+        # 报告生成的截止时间(time.monotonic)，超过后不再发起或继续接收请求
+        self.deadline = None
+        self.http = get_http_client()
+        # 按token预算生成提示文本，按每日上限决定是否降级为简短摘要
+        self.prompt_builder = PromptBuilder()
+        self.ledger = get_token_ledger()
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
-        
-        # 确保缓存目录存在
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
     
     def _get_api_key(self):
         """从apikey.txt文件中获取API密钥"""
@@ -31,108 +47,364 @@ class DeepSeekAnalyzer:
             # 如果无法读取文件，则使用配置中的API密钥
             return config.DEEPSEEK_API_KEY
     
-    def _get_cache_path(self, project_url):
-        """获取项目分析缓存文件路径"""
-        # 使用项目URL的哈希值作为缓存文件名
-        import hashlib
-        url_hash = hashlib.md5(project_url.encode()).hexdigest()
-        return os.path.join(self.cache_dir, f"analysis_{url_hash}.json")
+    def _fingerprint(self, project, with_readme=True):
+        """根据提示文本的输入、模型和提示版本计算项目指纹，with_readme为False时不包含README摘要"""
+        fields = [field for field in self.FINGERPRINT_FIELDS if with_readme or field != "readme_summary"]
+        data = {field: project.get(field) for field in fields}
+        data["tags"] = sorted(data["tags"] or [])
+        data["model"] = self.model
+        data["prompt_version"] = self.prompt_version
+        
+        serialized = json.dumps(data, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(serialized.encode()).hexdigest()
+    
+    def _metrics(self, project):
+        """提取项目的数值字段"""
+        metrics = {}
+        for field in self.METRIC_FIELDS:
+            try:
+                metrics[field] = float(project.get(field) or 0)
+            except (TypeError, ValueError):
+                metrics[field] = 0.0
+        return metrics
+    
+    def _metrics_drifted(self, cached_metrics, metrics):
+        """检查数值字段的相对变化是否超过阈值"""
+        for field, value in metrics.items():
+            old_value = cached_metrics.get(field, 0.0)
+            if old_value == value:
+                continue
+            if old_value == 0 or abs(value - old_value) / old_value > self.metric_drift:
+                return True
+        return False
+    
+    def get_cached_analysis(self, project, check_drift=True):
+        """
+        读取有效的分析缓存，缓存无效时返回None
+
+        check_drift: 是否检查数值字段的变化，与上次抓取相比未变化的项目无需检查
+        """
+        # 使用项目内容指纹作为缓存键，内容不变时缓存一直有效
+        fingerprint = self._fingerprint(project)
+        try:
+            cached = self.cache.get("analysis", fingerprint)
+            if cached is None and project.get("readme_failed"):
+                # README获取失败导致摘要为空，按不含README摘要的指纹找到上次获取成功时的分析
+                alias = self.cache.get("analysis_alias", self._fingerprint(project, with_readme=False))
+                if alias:
+                    fingerprint = alias["fingerprint"]
+                    cached = self.cache.get("analysis", fingerprint)
+        except Exception as e:
+            print(f"读取缓存时出错: {e}")
+            return None
+        if cached is None:
+            return self._reuse_near_identical(project)
+        
+        # 星标、点赞、下载量变化明显时重新分析
+        if check_drift and self._metrics_drifted(cached.get("metrics", {}), self._metrics(project)):
+            print(f"项目 {project.get('name', '未知项目')} 的数据变化超过阈值，重新分析")
+            return None
+        
+        # 预算宽裕时，之前降级生成的简短摘要需要重新完整分析
+        if cached.get("mode") == "summary" and self.ledger.mode_for(project) == "full":
+            return None
+        
+        # 使用最新的项目数据，分析文本复用缓存
+        cached["project"] = project
+        cached["fingerprint"] = fingerprint
+        return cached
+    
+    def _reuse_near_identical(self, project):
+        """
+        复用主题索引标注的近期分析过的近似相同项目（如其他作者上传的同一模型）的分析结果
+
+        复用的结果不以本项目的指纹写入缓存，只标注"reused_from"，超出复用期限后本项目会重新分析；
+        返回的指纹是被复用项目的指纹，中断后继续运行时可以再次找回
+        """
+        source = project.get("near_identical")
+        if not source:
+            return None
+        try:
+            cached = self.cache.get("analysis", source["fingerprint"])
+        except Exception as e:
+            print(f"读取缓存时出错: {e}")
+            return None
+        if cached is None:
+            return None
+        print(f"项目 {project.get('name', '未知项目')} 与近期分析过的 {source['name']} 几乎相同，复用其分析结果")
+        get_metrics().inc("analysis_reused_total")
+        return dict(cached, project=project, fingerprint=source["fingerprint"],
+                    reused_from={"name": source["name"], "url": source["url"]})
+    
+    def _build_payload(self, project, mode="full"):
+        """构建DeepSeek API的请求体，输出token数按项目排名分配"""
+        # 准备发送给DeepSeek的提示文本
+        prompt = self._create_prompt(project, mode)
+        
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": self.prompt_builder.output_budget(project, mode)
+        }
+    
+    def _extract_content(self, result):
+        """从API响应中提取回复文本"""
+        return result.get("choices", [{}])[0].get("message", {}).get("content", "")
     
-    def _is_cache_valid(self, cache_path):
-        """检查缓存是否有效"""
-        if not os.path.exists(cache_path):
-            return False
+    def _save_analysis(self, project, analysis, mode="full"):
+        """保存分析结果到缓存"""
+        # 保存结果到缓存
+        fingerprint = self._fingerprint(project)
+        analysis_data = {
+            "project": project,
+            "analysis": analysis,
+            "mode": mode,
+            "metrics": self._metrics(project),
+            "timestamp": datetime.now().isoformat()
+        }
         
-        cache_time = datetime.fromtimestamp(os.path.getmtime(cache_path))
-        max_age = timedelta(days=self.max_cache_age_days)
+        self.cache.put("analysis", fingerprint, analysis_data)
+        if not project.get("readme_failed"):
+            # 记录不含README摘要的指纹对应的分析，之后README暂时获取失败时仍能找回
+            self.cache.put("analysis_alias", self._fingerprint(project, with_readme=False), {"fingerprint": fingerprint})
         
-        return datetime.now() - cache_time < max_age
+        # 缓存指纹不保存在缓存内容中，主题索引用它找回分析结果
+        return dict(analysis_data, fingerprint=fingerprint)
+    
+    def _error_analysis(self, project, error):
+        """分析失败时返回的记录"""
+        print(f"调用DeepSeek API时出错: {error}")
+        return {
+            "project": project,
+            "analysis": f"无法分析项目。错误: {str(error)}",
+            "timestamp": datetime.now().isoformat()
+        }
     
     def analyze_project(self, project):
         """使用DeepSeek API分析项目"""
-        project_url = project.get("url", "")
-        cache_path = self._get_cache_path(project_url)
+        cached = self.get_cached_analysis(project)
+        if cached is not None:
+            return cached
         
-        # 如果缓存有效，直接返回缓存结果
-        if self._is_cache_valid(cache_path):
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"读取缓存时出错: {e}")
-        
-        # 准备发送给DeepSeek的提示文本
-        prompt = self._create_prompt(project)
+        mode = self.ledger.mode_for(project)
+        if mode == "skip":
+            get_metrics().inc("deepseek_skipped_total")
+            return self._error_analysis(project, "已达到今日token或费用上限，跳过分析")
+        if mode == "summary":
+            get_metrics().inc("deepseek_downgraded_total")
         
         # 调用DeepSeek API
         try:
-            payload = {
-                "model": "deepseek-chat",
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 2000
-            }
-            
-            response = requests.post(self.api_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            analysis = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-            
-            # 保存结果到缓存
-            analysis_data = {
-                "project": project,
-                "analysis": analysis,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(analysis_data, f, ensure_ascii=False, indent=2)
+            return self._save_analysis(project, self._complete(self._build_payload(project, mode)), mode)
+        except BudgetExceededError as e:
+            get_metrics().inc("deepseek_skipped_total")
+            return self._error_analysis(project, e)
+        except Exception as e:
+            return self._error_analysis(project, e)
+    
+    def analyze_batch(self, projects):
+        """
+        把多个项目放进同一个请求中分析，按项目拆分返回的JSON结果
+
+        解析失败的项目会退回到单项目分析
+        返回: 与输入顺序一致的分析结果列表
+        """
+        results = [self.get_cached_analysis(project) for project in projects]
+        # 只有完整分析的项目合并为一个请求，降级或跳过的项目单独处理
+        pending = []
+        for i, result in enumerate(results):
+            if result is None and self.ledger.mode_for(projects[i]) != "full":
+                results[i] = self.analyze_project(projects[i])
+            elif result is None:
+                pending.append(i)
+        
+        if len(pending) == 1:
+            results[pending[0]] = self.analyze_project(projects[pending[0]])
+        elif pending:
+            pending_projects = [projects[i] for i in pending]
+            try:
+                content = self._complete(self._build_batch_payload(pending_projects))
+                sections = self._split_batch_response(content, len(pending_projects))
+            except Exception as e:
+                print(f"批量分析{len(pending_projects)}个项目时出错: {e}，改为逐个分析")
+                sections = {}
             
-            return analysis_data
+            for position, i in enumerate(pending):
+                analysis = sections.get(position)
+                if analysis:
+                    results[i] = self._save_analysis(projects[i], analysis)
+                else:
+                    results[i] = self.analyze_project(projects[i])
         
-        except Exception as e:
-            print(f"调用DeepSeek API时出错: {e}")
-            return {
-                "project": project,
-                "analysis": f"无法分析项目。错误: {str(e)}",
-                "timestamp": datetime.now().isoformat()
-            }
-    
-    def _create_prompt(self, project):
-        """创建用于DeepSeek API的提示文本"""
-        name = project.get("name", "未知项目")
-        url = project.get("url", "")
-        description = project.get("description", "无描述")
-        
-        # 为GitHub项目添加特定信息
-        language = project.get("language", "")
-        stars = project.get("stars", "")
-        
-        # 为Hugging Face项目添加特定信息
-        tags = project.get("tags", [])
-        likes = project.get("likes", "")
-        downloads = project.get("downloads", "")
+        return results
+    
+    def _post_with_retry(self, payload, stream=False, before_retry=None):
+        """
+        通过共享HTTP客户端发送请求，限流和服务端错误由客户端负责退避重试
+
+        请求不是幂等的，读取超时后不重试，以免同一个请求被重复计费
+        """
+        response = self.http.post(
+            self.api_url,
+            headers=self.headers,
+            json=payload,
+            timeout=(config.HTTP_CONNECT_TIMEOUT, self.timeout),
+            max_retries=self.max_retries,
+            before_retry=before_retry,
+            stream=stream
+        )
+        response.raise_for_status()
+        return response
+    
+    def _check_deadline(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TimeoutError("超出报告生成时间预算")
+    
+    def _prompt_tokens(self, payload):
+        """按本地规则估算请求的输入token数"""
+        return sum(count_tokens(message["content"]) for message in payload["messages"])
+    
+    def _reserve(self, payload):
+        """按最大输出token数为一次请求预留额度，超出每日上限时抛出BudgetExceededError"""
+        return self.ledger.reserve(self._prompt_tokens(payload), payload.get("max_tokens") or 0)
+    
+    def _complete(self, payload):
+        """发送请求并返回回复文本，启用流式输出时边接收边拼接"""
+        self._check_deadline()
+        # 发送前按最大输出token数预留额度，超出每日上限时不发送；每次重试前重新预留
+        reservations = [self._reserve(payload)]
+        before_retry = lambda: reservations.append(self._reserve(payload))
+        metrics = get_metrics()
+        try:
+            with metrics.span("deepseek_request", mode="stream" if self.stream else "plain") as span:
+                if not self.stream:
+                    result = self._post_with_retry(payload, before_retry=before_retry).json()
+                    content = self._extract_content(result)
+                    usage = result.get("usage")
+                else:
+                    content, usage = self._complete_stream(payload, before_retry)
+                
+                # 服务端未返回用量时按本地规则估算
+                usage = usage or {
+                    "prompt_tokens": self._prompt_tokens(payload),
+                    "completion_tokens": count_tokens(content)
+                }
+                span["prompt_tokens"] = usage.get("prompt_tokens", 0)
+                span["completion_tokens"] = usage.get("completion_tokens", 0)
+                metrics.inc("deepseek_tokens_total", span["prompt_tokens"], type="prompt")
+                metrics.inc("deepseek_tokens_total", span["completion_tokens"], type="completion")
+        except Exception:
+            for reservation in reservations:
+                self.ledger.release(reservation)
+            raise
+        # 实际用量记在第一次预留上，其余重试的预留直接释放
+        for reservation in reservations[1:]:
+            self.ledger.release(reservation)
+        self.ledger.record(span["prompt_tokens"], span["completion_tokens"], reservations[0])
+        return content
+    
+    def _complete_stream(self, payload, before_retry=None):
+        """接收流式回复，返回(回复文本, token用量)"""
+        # 要求在最后一个数据块中返回token用量
+        payload = dict(payload, stream=True, stream_options={"include_usage": True})
+        response = self._post_with_retry(payload, stream=True, before_retry=before_retry)
+        chunks = []
+        usage = None
+        try:
+            for line in response.iter_lines():
+                # 每收到一个数据块检查一次预算，超时则立即断开连接
+                self._check_deadline()
+                line = line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                usage = event.get("usage") or usage
+                # 携带用量的数据块中choices为空
+                delta = (event.get("choices") or [{}])[0].get("delta", {})
+                chunks.append(delta.get("content") or "")
+        finally:
+            response.close()
+        return "".join(chunks), usage
+    
+    def _build_batch_payload(self, projects):
+        """构建批量分析的请求体，要求模型以JSON格式返回"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": self._create_batch_prompt(projects)}
+            ],
+            "temperature": 0.7,
+            "max_tokens": min(sum(self.prompt_builder.output_budget(project) for project in projects), config.DEEPSEEK_MAX_OUTPUT_TOKENS),
+            "response_format": {"type": "json_object"}
+        }
+    
+    def _split_batch_response(self, content, count):
+        """
+        把批量分析的JSON回复拆分为各个项目的分析文本
+
+        返回: {项目序号(从0开始): 分析文本}，缺失或格式错误的项目不包含在内
+        """
+        content = content.strip()
+        # 去掉模型可能添加的代码块标记
+        if content.startswith("```"):
+            content = content.strip("`")
+            if content.startswith("json"):
+                content = content[len("json"):]
         
-        prompt = f"""请对以下开源项目进行详细解读：
+        data = json.loads(content)
+        items = data.get("results", []) if isinstance(data, dict) else data
+        
+        sections = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                position = int(item.get("id")) - 1
+            except (TypeError, ValueError):
+                continue
+            analysis = item.get("analysis")
+            if 0 <= position < count and isinstance(analysis, str) and analysis.strip():
+                sections[position] = analysis.strip()
+        return sections
+    
+    def _create_batch_prompt(self, projects):
+        """创建批量分析的提示文本，公共说明只出现一次"""
+        prompt = f"请对以下{len(projects)}个开源项目分别进行详细解读：\n"
+        for i, project in enumerate(projects, 1):
+            prompt += f"\n### 项目{i}\n{self._describe_project(project)}"
+        
+        prompt += f"""
+请对每个项目提供以下信息：
+1. 项目介绍（用通俗易懂的语言描述）
+2. 项目的应用场景
+3. 项目评价（优点和缺点）
+
+请确保你的回答结构清晰，内容全面，语言通俗易懂。
+请只返回JSON，格式为：{{"results": [{{"id": 项目序号, "analysis": "该项目的完整解读，可使用Markdown"}}]}}，
+results中必须包含全部{len(projects)}个项目。"""
+        
+        return prompt
+    
+    def _describe_project(self, project):
+        """生成项目基本信息的文本，按输入token预算截断描述和标签"""
+        return self.prompt_builder.describe(project)
+    
+    def _create_prompt(self, project, mode="full"):
+        """创建用于DeepSeek API的提示文本，summary模式只要求简短摘要"""
+        if mode == "summary":
+            return f"""请用不超过3句话简要介绍以下开源项目的用途和亮点：
 
-项目名称：{name}
-项目链接：{url}
-项目描述：{description}
-"""
+{self._describe_project(project)}"""
+        
+        prompt = f"""请对以下开源项目进行详细解读：
 
-        if language:
-            prompt += f"编程语言：{language}\n"
-        if stars:
-            prompt += f"星标数量：{stars}\n"
-        if tags:
-            prompt += f"标签：{', '.join(tags)}\n"
-        if likes:
-            prompt += f"点赞数量：{likes}\n"
-        if downloads:
-            prompt += f"下载数量：{downloads}\n"
+{self._describe_project(project)}"""
         
         prompt += """
 请提供以下信息：
@@ -1,10 +1,13 @@
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.header import Header
 import os
+from html import escape
 import config
 from datetime import datetime
+from report_renderer import render_report
+from metrics import get_metrics
+from mail_delivery import DeliveryEngine, open_smtp_connection, resolve_smtp_settings
 
 class EmailSender:
     def __init__(self):
@@ -12,6 +15,8 @@ class EmailSender:
         self.sender_email = self._get_sender_email()
         self.sender_password = self._get_sender_password()
         self.recipients = self._get_recipients()
+        # 最近一次发送报告时实际收到邮件的收件人
+        self.last_sent = []
         
     def _get_sender_email(self):
         """从发件邮箱文件中获取发件人邮箱"""
@@ -48,14 +53,8 @@ class EmailSender:
             print(f"读取收件邮箱时出错: {e}")
             return config.RECIPIENTS
     
-    def send_project_report(self, github_trending, github_newest, huggingface_trending, huggingface_newest):
-        """发送项目报告邮件"""
-        # 检查是否有项目数据
-        if not any([github_trending, github_newest, huggingface_trending, huggingface_newest]):
-            print("警告：所有项目列表均为空，不发送邮件")
-            return False
-            
-        # 创建邮件主体
+    def _build_message(self, html, to):
+        """创建一封邮件，to为收件人列表"""
         msg = MIMEMultipart()
         
         # 设置邮件主题
@@ -64,235 +63,98 @@ class EmailSender:
         
         # 设置发件人和收件人
         msg['From'] = self.sender_email
-        msg['To'] = ','.join(self.recipients)
+        msg['To'] = ','.join(to)
         
+        msg.attach(MIMEText(html, 'html', 'utf-8'))
+        return msg
+    
+    def _render_content(self, github_trending, github_newest, huggingface_trending, huggingface_newest):
+        """生成邮件HTML，失败时返回一个简单的错误说明"""
         try:
-            # 创建邮件内容
-            email_content = self._create_email_content(
+            return self._create_email_content(
                 github_trending, 
                 github_newest, 
                 huggingface_trending, 
                 huggingface_newest
             )
-            
-            msg.attach(MIMEText(email_content, 'html', 'utf-8'))
         except Exception as e:
             print(f"创建邮件内容时出错: {e}")
             # 如果创建邮件内容失败，则创建一个简单的错误邮件
-            error_content = f"""
+            return f"""
             <html>
             <body>
                 <h1>AI开源项目日报生成失败</h1>
                 <p>在生成项目报告时遇到问题，请查看系统日志以获取更多信息。</p>
-                <p>错误信息: {str(e)}</p>
+                <p>错误信息: {escape(str(e))}</p>
                 <p>时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
             </body>
             </html>
             """
-            msg.attach(MIMEText(error_content, 'html', 'utf-8'))
+    
+    def send_project_report(self, github_trending, github_newest, huggingface_trending, huggingface_newest, per_recipient=None):
+        """
+        发送项目报告邮件，实际收到邮件的收件人保存在last_sent中
+
+        per_recipient: 是否为每个收件人单独发送，默认使用config.EMAIL_PER_RECIPIENT
+        """
+        self.last_sent = []
+        # 检查是否有项目数据
+        if not any([github_trending, github_newest, huggingface_trending, huggingface_newest]):
+            print("警告：所有项目列表均为空，不发送邮件")
+            return False
+        
+        html = self._render_content(github_trending, github_newest, huggingface_trending, huggingface_newest)
+        
+        if per_recipient is None:
+            per_recipient = config.EMAIL_PER_RECIPIENT
+        if per_recipient:
+            return self._send_individually(html)
         
+        metrics = get_metrics()
         try:
             # 连接到SMTP服务器并发送邮件
-            if '@qq.com' in self.sender_email:
-                smtp_server = 'smtp.qq.com'
-                port = 587
-            elif '@163.com' in self.sender_email:
-                smtp_server = 'smtp.163.com'
-                port = 25
-            elif '@gmail.com' in self.sender_email:
-                smtp_server = 'smtp.gmail.com'
-                port = 587
-            else:
-                raise ValueError(f"不支持的邮箱类型: {self.sender_email}")
-            
-            server = smtplib.SMTP(smtp_server, port)
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
-            server.send_message(msg)
-            server.quit()
+            with metrics.span("smtp_send", mode="single"):
+                settings = resolve_smtp_settings(self.sender_email)
+                server = open_smtp_connection(settings, self.sender_email, self.sender_password)
+                try:
+                    server.send_message(self._build_message(html, self.recipients))
+                    # 服务器已接收邮件，之后关闭连接出错也不影响送达
+                    self.last_sent = list(self.recipients)
+                finally:
+                    try:
+                        server.quit()
+                    except Exception:
+                        server.close()
             
+            metrics.inc("smtp_messages_total", result="sent")
             print(f"邮件已成功发送至: {', '.join(self.recipients)}")
             return True
         except Exception as e:
+            metrics.inc("smtp_messages_total", result="failed")
             print(f"发送邮件时出错: {e}")
             return False
     
-    def _create_email_content(self, github_trending, github_newest, huggingface_trending, huggingface_newest):
-        """创建邮件内容HTML"""
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        
-        html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 800px; margin: 0 auto; padding: 20px; }}
-                h1 {{ color: #2c3e50; text-align: center; margin-bottom: 30px; }}
-                h2 {{ color: #3498db; margin-top: 30px; border-bottom: 1px solid #eee; padding-bottom: 10px; }}
-                h3 {{ color: #2c3e50; margin-top: 20px; }}
-                .project {{ margin-bottom: 30px; padding: 15px; background-color: #f9f9f9; border-radius: 5px; }}
-                .project h3 {{ margin-top: 0; }}
-                .project-link {{ color: #3498db; text-decoration: none; }}
-                .project-link:hover {{ text-decoration: underline; }}
-                .project-meta {{ color: #7f8c8d; font-size: 0.9em; margin-bottom: 10px; }}
-                .section-description {{ color: #666; margin-bottom: 20px; }}
-                .timestamp {{ color: #999; text-align: center; margin-top: 30px; font-size: 0.8em; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>AI开源项目日报</h1>
-                <p class="section-description">这份报告汇总了GitHub和Hugging Face平台上最热门和最新的AI开源项目，希望能帮助您了解AI领域的最新动态。</p>
-        """
-        
-        # GitHub热门项目
-        if github_trending:
-            html += f"""
-                    <h2>GitHub热门项目</h2>
-                    <p class="section-description">以下是GitHub平台上当前最受欢迎的{len(github_trending)}个项目：</p>
-            """
-            
-            for item in github_trending:
-                try:
-                    project = item.get("project", {})
-                    analysis = item.get("analysis", "无分析结果")
-                    
-                    name = project.get("name", "未知项目")
-                    url = project.get("url", "#")
-                    description = project.get("description", "无描述")
-                    language = project.get("language", "未知")
-                    stars = project.get("stars", "0")
-                    
-                    html += f"""
-                    <div class="project">
-                        <h3><a href="{url}" class="project-link" target="_blank">{name}</a></h3>
-                        <p class="project-meta">语言: {language} | 星标: {stars}</p>
-                        <p><strong>描述:</strong> {description}</p>
-                        <p><strong>AI解析:</strong></p>
-                        <div>{analysis.replace('\n', '<br>')}</div>
-                    </div>
-                    """
-                except Exception as e:
-                    print(f"处理GitHub热门项目时出错: {e}")
-        else:
-            html += f"""
-                    <h2>GitHub热门项目</h2>
-                    <p class="section-description">无法获取GitHub热门项目数据。</p>
-            """
-        
-        # GitHub最新项目
-        if github_newest:
-            html += f"""
-                    <h2>GitHub最新项目</h2>
-                    <p class="section-description">以下是GitHub平台上最近更新的{len(github_newest)}个项目：</p>
-            """
-            
-            for item in github_newest:
-                try:
-                    project = item.get("project", {})
-                    analysis = item.get("analysis", "无分析结果")
-                    
-                    name = project.get("name", "未知项目")
-                    url = project.get("url", "#")
-                    description = project.get("description", "无描述")
-                    language = project.get("language", "未知")
-                    stars = project.get("stars", "0")
-                    
-                    html += f"""
-                    <div class="project">
-                        <h3><a href="{url}" class="project-link" target="_blank">{name}</a></h3>
-                        <p class="project-meta">语言: {language} | 星标: {stars}</p>
-                        <p><strong>描述:</strong> {description}</p>
-                        <p><strong>AI解析:</strong></p>
-                        <div>{analysis.replace('\n', '<br>')}</div>
-                    </div>
-                    """
-                except Exception as e:
-                    print(f"处理GitHub最新项目时出错: {e}")
-        else:
-            html += f"""
-                    <h2>GitHub最新项目</h2>
-                    <p class="section-description">无法获取GitHub最新项目数据。</p>
-            """
-        
-        # Hugging Face热门项目
-        if huggingface_trending:
-            html += f"""
-                    <h2>Hugging Face热门项目</h2>
-                    <p class="section-description">以下是Hugging Face平台上当前最受欢迎的{len(huggingface_trending)}个项目：</p>
-            """
-            
-            for item in huggingface_trending:
-                try:
-                    project = item.get("project", {})
-                    analysis = item.get("analysis", "无分析结果")
-                    
-                    name = project.get("name", "未知项目")
-                    url = project.get("url", "#")
-                    description = project.get("description", "无描述")
-                    tags = project.get("tags", [])
-                    likes = project.get("likes", "0")
-                    downloads = project.get("downloads", "0")
-                    
-                    html += f"""
-                    <div class="project">
-                        <h3><a href="{url}" class="project-link" target="_blank">{name}</a></h3>
-                        <p class="project-meta">标签: {', '.join(tags) if tags else '无'} | 点赞: {likes} | 下载: {downloads}</p>
-                        <p><strong>描述:</strong> {description}</p>
-                        <p><strong>AI解析:</strong></p>
-                        <div>{analysis.replace('\n', '<br>')}</div>
-                    </div>
-                    """
-                except Exception as e:
-                    print(f"处理Hugging Face热门项目时出错: {e}")
-        else:
-            html += f"""
-                    <h2>Hugging Face热门项目</h2>
-                    <p class="section-description">无法获取Hugging Face热门项目数据。</p>
-            """
-        
-        # Hugging Face最新项目
-        if huggingface_newest:
-            html += f"""
-                    <h2>Hugging Face最新项目</h2>
-                    <p class="section-description">以下是Hugging Face平台上最新发布的{len(huggingface_newest)}个项目：</p>
-            """
-            
-            for item in huggingface_newest:
-                try:
-                    project = item.get("project", {})
-                    analysis = item.get("analysis", "无分析结果")
-                    
-                    name = project.get("name", "未知项目")
-                    url = project.get("url", "#")
-                    description = project.get("description", "无描述")
-                    tags = project.get("tags", [])
-                    likes = project.get("likes", "0")
-                    downloads = project.get("downloads", "0")
-                    
-                    html += f"""
-                    <div class="project">
-                        <h3><a href="{url}" class="project-link" target="_blank">{name}</a></h3>
-                        <p class="project-meta">标签: {', '.join(tags) if tags else '无'} | 点赞: {likes} | 下载: {downloads}</p>
-                        <p><strong>描述:</strong> {description}</p>
-                        <p><strong>AI解析:</strong></p>
-                        <div>{analysis.replace('\n', '<br>')}</div>
-                    </div>
-                    """
-                except Exception as e:
-                    print(f"处理Hugging Face最新项目时出错: {e}")
-        else:
-            html += f"""
-                    <h2>Hugging Face最新项目</h2>
-                    <p class="section-description">无法获取Hugging Face最新项目数据。</p>
-            """
+    def _send_individually(self, html):
+        """通过SMTP连接池为每个收件人单独发送一份邮件"""
+        try:
+            engine = DeliveryEngine(self.sender_email, self.sender_password)
+        except Exception as e:
+            print(f"发送邮件时出错: {e}")
+            return False
         
-        # 结束HTML
-        html += f"""
-                <p class="timestamp">报告生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-            </div>
-        </body>
-        </html>
-        """
+        result = engine.deliver(lambda recipient: self._build_message(html, [recipient]), self.recipients)
+        self.last_sent = list(result["sent"])
         
-        return html
+        print(f"邮件已成功发送至{len(result['sent'])}个收件人")
+        for recipient, error in result["failed"].items():
+            print(f"发送至 {recipient} 失败: {error}")
+        return bool(result["sent"])
+    
+    def _create_email_content(self, github_trending, github_newest, huggingface_trending, huggingface_newest):
+        """创建邮件内容HTML"""
+        return render_report({
+            "github_trending": github_trending,
+            "github_newest": github_newest,
+            "huggingface_trending": huggingface_trending,
+            "huggingface_newest": huggingface_newest
+        })
@@ -0,0 +1,202 @@
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import config
+from http_client import get_http_client
+from cache_store import get_cache_store
+from metrics import get_metrics
+
+# Markdown/HTML清理使用的正则表达式
+_FRONT_MATTER_RE = re.compile(r"\A---\s*\n.*?\n---\s*\n", re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_FENCE_RE = re.compile(r"^(```|~~~).*?^\1[^\n]*$", re.DOTALL | re.MULTILINE)
+_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_TAG_RE = re.compile(r"<[^>]+>")
+_TABLE_RE = re.compile(r"^\s*\|.*$", re.MULTILINE)
+_EMPHASIS_RE = re.compile(r"(\*\*|__|\*|`)")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_RST_HEADING_RE = re.compile(r"^[=\-~^]{3,}\s*$")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# 优先提取的章节标题关键词
+KEY_SECTIONS = (
+    "introduction", "overview", "about", "features", "highlights", "model description", "model details",
+    "usage", "quick start", "quickstart", "getting started", "intended use", "uses", "limitations",
+    "简介", "介绍", "概述", "特性", "功能", "亮点", "使用", "快速开始", "局限",
+)
+
+def strip_markup(text):
+    """去掉YAML头、HTML、图片、代码块和表格，只保留正文文本和标题"""
+    text = _FRONT_MATTER_RE.sub("", text)
+    text = _COMMENT_RE.sub("", text)
+    text = _FENCE_RE.sub("", text)
+    text = _IMAGE_RE.sub("", text)
+    text = _LINK_RE.sub(r"\1", text)
+    text = _TAG_RE.sub("", text)
+    text = _TABLE_RE.sub("", text)
+    text = _EMPHASIS_RE.sub("", text)
+    lines = [line.rstrip() for line in text.splitlines() if not _RST_HEADING_RE.match(line)]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+def extract_summary(text, max_chars=None):
+    """
+    从README中提取摘要
+
+    依次取标题前的开头段落和标题包含关键词的章节，总长度不超过max_chars
+    """
+    max_chars = max_chars or config.ENRICH_SUMMARY_CHARS
+    sections = []
+    title, body = "", []
+    for line in strip_markup(text).splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            sections.append((title, "\n".join(body).strip()))
+            title, body = match.group(2), []
+        else:
+            body.append(line)
+    sections.append((title, "\n".join(body).strip()))
+
+    intro = next((body for _, body in sections if body), "")
+    parts = [intro] if intro else []
+    for title, body in sections:
+        if body and body != intro and any(keyword in title.lower() for keyword in KEY_SECTIONS):
+            parts.append(f"{title}: {body}")
+
+    summary = ""
+    for part in parts:
+        part = " ".join(part.split())
+        if len(summary) + len(part) + 1 > max_chars:
+            summary += (" " if summary else "") + part[:max(0, max_chars - len(summary) - 2)] + "…"
+            break
+        summary += (" " if summary else "") + part
+    return summary.strip()
+
+class Enricher:
+    """
+    获取项目的README或模型卡片
+
+    流式读取响应，超过字节上限后停止读取；提取的摘要按版本缓存：
+    Hugging Face使用sha或lastModified，GitHub使用pushed_at，没有版本信息时用ETag条件请求确认内容是否变化。
+    """
+
+    GITHUB_README_URLS = [
+        "https://raw.githubusercontent.com/{name}/HEAD/README.md",
+        "https://raw.githubusercontent.com/{name}/HEAD/readme.md",
+        "https://raw.githubusercontent.com/{name}/HEAD/README.rst",
+    ]
+    HUGGINGFACE_README_URL = "https://huggingface.co/{path}/raw/main/README.md"
+
+    def __init__(self, max_workers=None, max_bytes=None):
+        self.max_workers = max_workers or config.ENRICH_MAX_WORKERS
+        self.max_bytes = max_bytes or config.ENRICH_MAX_BYTES
+        self.http = get_http_client()
+        self.cache = get_cache_store()
+
+    def _readme_urls(self, project):
+        url = project.get("url") or ""
+        if "huggingface.co/" in url:
+            return [self.HUGGINGFACE_README_URL.format(path=url.split("huggingface.co/", 1)[1])]
+        if "github.com/" in url:
+            name = url.split("github.com/", 1)[1].strip("/")
+            return [template.format(name=name) for template in self.GITHUB_README_URLS]
+        return []
+
+    def _version(self, project):
+        return project.get("sha") or project.get("last_modified") or project.get("pushed_at") or None
+
+    def _fetch(self, url, etag=None):
+        """
+        流式读取README，最多读取max_bytes字节
+
+        返回: (文本, ETag, 是否未修改)，不存在时文本为None
+        """
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self.http.get(url, headers=headers, stream=True, max_retries=1)
+        try:
+            if response.status_code == 304:
+                return None, etag, True
+            if response.status_code == 404:
+                return None, None, False
+            response.raise_for_status()
+
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=16 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_bytes:
+                    break
+            text = b"".join(chunks)[:self.max_bytes].decode("utf-8", errors="ignore")
+            return text, response.headers.get("ETag"), False
+        finally:
+            # 提前关闭连接，不再接收剩余内容
+            response.close()
+
+    def enrich(self, project):
+        """
+        获取项目的README摘要，不修改项目本身
+
+        返回: 摘要文本，没有README时返回空字符串；获取失败时返回上次成功获取的摘要，没有时返回None
+        """
+        # 已经通过其他途径（例如GitHub GraphQL）获取到摘要
+        if project.get("readme_summary"):
+            return project["readme_summary"]
+        urls = self._readme_urls(project)
+        if not urls:
+            return ""
+
+        metrics = get_metrics()
+        cached = self.cache.get("enrichment", project["url"])
+        version = self._version(project)
+        if cached and version and cached.get("version") == version:
+            metrics.inc("enrichment_total", result="hit")
+            return cached.get("summary", "")
+
+        try:
+            with metrics.span("enrich_fetch"):
+                for url in urls:
+                    etag = cached.get("etag") if cached and cached.get("source") == url else None
+                    text, etag, not_modified = self._fetch(url, etag)
+                    if not_modified:
+                        metrics.inc("enrichment_total", result="not_modified")
+                        summary = cached.get("summary", "")
+                        break
+                    if text is not None:
+                        metrics.inc("enrichment_total", result="fetched")
+                        summary = extract_summary(text)
+                        break
+                else:
+                    metrics.inc("enrichment_total", result="missing")
+                    url, etag, summary = None, None, ""
+        except Exception as e:
+            metrics.inc("enrichment_total", result="error")
+            print(f"获取项目 {project.get('name', '未知项目')} 的README时出错: {e}")
+            # 获取失败时沿用上次成功获取的摘要，保持分析缓存指纹不变
+            return cached.get("summary", "") if cached else None
+
+        self.cache.put("enrichment", project["url"], {"version": version, "etag": etag, "source": url, "summary": summary})
+        return summary
+
+    def iter_enriched(self, projects):
+        """
+        并发获取README，哪个项目先完成就先产出哪个
+
+        摘要在产出项目时才写入readme_summary字段，即在调用方的线程中修改项目，
+        避免与正在序列化报告的线程同时修改同一个字典；获取失败且没有可沿用的摘要时标注"readme_failed"
+        """
+        if not projects:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.enrich, project): project for project in projects}
+            for future in as_completed(futures):
+                project = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    print(f"补充项目信息时出错: {e}")
+                    summary = None
+                if summary:
+                    project["readme_summary"] = summary
+                elif summary is None:
+                    project["readme_failed"] = True
+                yield project
@@ -1,115 +1,125 @@
-import requests
-from bs4 import BeautifulSoup
 import json
-import os
-from datetime import datetime, timedelta
 import config
+from http_client import get_http_client
+from cache_store import get_cache_store
+from ranking import rank_projects
+from trending_parser import PARSERS, extract_articles, parse_star_count
+from trending_fanout import TrendingFanout
+from github_graphql import get_github_graphql
+from relevance import keep_relevant
 
 class GitHubCrawler:
     def __init__(self):
-        self.cache_dir = config.CACHE_DIR
         self.max_cache_age_days = config.MAX_CACHE_AGE_DAYS
         self.num_projects = config.NUM_PROJECTS
-        
-        # 确保缓存目录存在
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
+        self.http = get_http_client()
+        self.cache = get_cache_store()
     
-    def _get_cache_path(self, category):
-        """获取缓存文件路径"""
-        return os.path.join(self.cache_dir, f"github_{category}.json")
+    def _get_cache_key(self, category):
+        """获取缓存键，项目数不是默认值时加上项目数，不同大小的报告不会读到彼此截断后的列表"""
+        if self.num_projects != config.NUM_PROJECTS:
+            return f"github_{category}_{self.num_projects}"
+        return f"github_{category}"
     
-    def _is_cache_valid(self, cache_path):
-        """检查缓存是否有效"""
-        if not os.path.exists(cache_path):
-            return False
-        
-        cache_time = datetime.fromtimestamp(os.path.getmtime(cache_path))
-        max_age = timedelta(days=self.max_cache_age_days)
-        
-        return datetime.now() - cache_time < max_age
+    TRENDING_URL = "https://github.com/trending"
+    SEARCH_API_URL = "https://api.github.com/search/repositories"
     
     def _fetch_trending_projects(self):
         """获取GitHub上的热门项目"""
-        url = "https://github.com/trending"
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if config.TRENDING_FANOUT_ENABLED:
+            # 抓取多个语言和时间范围的热门页面并合并
+            projects = TrendingFanout(self).crawl(self.num_projects)
+        else:
+            html, _ = self.http.conditional_get(self.TRENDING_URL)
+            projects = self._parse_trending_html(html)
+        return self._augment_trending(projects)
+    
+    def _augment_trending(self, projects):
+        """有访问令牌时用一次GraphQL查询补充主题、版本和README等信息"""
+        graphql = get_github_graphql()
+        if graphql and projects:
+            try:
+                graphql.augment(projects)
+            except Exception as e:
+                print(f"通过GraphQL补充GitHub热门项目信息时出错: {e}")
+        return projects
+    
+    def _parse_trending_html(self, html):
+        """解析GitHub热门页面HTML"""
+        extract = PARSERS.get(config.GITHUB_TRENDING_PARSER, extract_articles)
         
         projects = []
-        article_elements = soup.select('article.Box-row')
-        
         # 对所有收集到的项目进行筛选，所以这里多获取一些
-        for article in article_elements[:self.num_projects * 2]:
+        for record in extract(html, limit=self.num_projects * 2):
             try:
-                # 获取项目名和链接
-                repo_element = article.select_one('h2 a')
-                if repo_element:
-                    repo_path = repo_element.get('href', '').strip('/')
-                    if repo_path:
-                        name = repo_path
-                        url = f"https://github.com/{repo_path}"
-                        
-                        # 获取项目描述
-                        description_element = article.select_one('p')
-                        description = description_element.text.strip() if description_element else ""
-                        
-                        # 如果没有描述，跳过该项目
-                        if not description or description == "无描述":
-                            continue
-                        
-                        # 获取编程语言
-                        language_element = article.select_one('span[itemprop="programmingLanguage"]')
-                        language = language_element.text.strip() if language_element else "未知"
-                        
-                        # 获取星标数
-                        stars_element = article.select_one('a.Link--muted[href$="/stargazers"]')
-                        stars_text = stars_element.text.strip() if stars_element else "0"
-                        
-                        # 处理星标数的格式，如"1.2k"转换为数字
-                        try:
-                            if 'k' in stars_text.lower():
-                                stars_value = float(stars_text.lower().replace('k', '')) * 1000
-                            else:
-                                stars_value = float(stars_text.replace(',', ''))
-                            
-                            # 转换回字符串形式保存
-                            stars = stars_text
-                            
-                            # 如果星标数低于500，跳过该项目
-                            if stars_value < 500:
-                                continue
-                        except:
-                            # 如果无法解析星标数，使用原始文本
-                            stars = stars_text
-                        
-                        projects.append({
-                            "name": name,
-                            "url": url,
-                            "description": description,
-                            "language": language,
-                            "stars": stars,
-                            "stars_value": stars_value if 'stars_value' in locals() else 0
-                        })
+                project = self._record_to_project(record)
+                if project:
+                    projects.append(project)
             except Exception as e:
                 print(f"解析GitHub热门项目时出错: {e}")
                 
-        # 只返回指定数量的项目
-        return projects[:self.num_projects]
+        # 去掉与AI无关的项目后批量评分，只返回评分最高的指定数量的项目
+        return rank_projects(keep_relevant(projects, "GitHub热门"), "github", self.num_projects)
     
-    def _fetch_newest_projects(self):
-        """获取GitHub上的最新项目"""
+    def _record_to_project(self, record):
+        """把热门页面中提取的条目转换为项目，不符合条件时返回None"""
+        repo_path = record["repo_path"]
+        if not repo_path:
+            return None
+        
+        # 如果没有描述，跳过该项目
+        description = record["description"]
+        if not description or description == "无描述":
+            return None
+        
+        # 处理星标数的格式，如"1,234"或"1.2k"转换为数字，无法解析时按0处理
+        stars_text = record["stars_text"] or "0"
+        stars_value = parse_star_count(stars_text)
+        # 如果星标数低于500，跳过该项目
+        if stars_value is not None and stars_value < 500:
+            return None
+        
+        return {
+            "name": repo_path,
+            "url": f"https://github.com/{repo_path}",
+            "description": description,
+            "language": record["language"] or "未知",
+            "stars": stars_text,
+            "stars_value": stars_value or 0,
+            # 统计周期内新增的星标数，例如"21 stars today"
+            "stars_gained": parse_star_count(record["stars_gained_text"]) or 0
+        }
+    
+    def _newest_search_params(self):
+        """GitHub搜索API的查询参数"""
         # 使用GitHub API搜索最近更新的项目，要求星标数达到或超过500
-        url = "https://api.github.com/search/repositories"
-        params = {
+        return {
             "q": "stars:>=500",  # 要求星标数至少500
             "sort": "updated",  # 按最近更新排序
             "order": "desc",
             "per_page": 50  # 获取更多项目，便于筛选
         }
-        
-        response = requests.get(url, params=params, headers={"User-Agent": "Mozilla/5.0"})
-        data = response.json()
-        
+    
+    def _fetch_newest_projects(self):
+        """获取GitHub上的最新项目"""
+        graphql = get_github_graphql()
+        if graphql:
+            try:
+                return graphql.search(
+                    "stars:>=500 sort:updated-desc",
+                    self.num_projects,
+                    select=lambda projects: keep_relevant(
+                        [project for project in projects if project["description"] and project["stars_value"] >= 500],
+                        "GitHub最新"
+                    )
+                )
+            except Exception as e:
+                print(f"通过GraphQL获取GitHub最新项目时出错: {e}，改用REST搜索接口")
+        text, _ = self.http.conditional_get(self.SEARCH_API_URL, params=self._newest_search_params())
+        return self._parse_newest_items(json.loads(text))
+    
+    def _parse_newest_items(self, data):
+        """解析GitHub搜索API返回的数据"""
         projects = []
         # 处理所有返回的项目
         for item in data.get("items", []):
@@ -135,45 +145,49 @@ class GitHubCrawler:
                     "stars": str(stars_count),
                     "stars_value": stars_count,
                     "updated_at": item.get("updated_at", ""),
+                    "pushed_at": item.get("pushed_at", ""),
                     "created_at": item.get("created_at", "")
                 })
                 
-                # 如果收集到足够的项目，则停止
-                if len(projects) >= self.num_projects:
-                    break
             except Exception as e:
                 print(f"解析GitHub最新项目时出错: {e}")
         
-        return projects[:self.num_projects]
+        # 去掉与AI无关的项目后按原有顺序取前几个
+        return keep_relevant(projects, "GitHub最新")[:self.num_projects]
+    
+    def _load_cache(self, category):
+        """读取有效的缓存，缓存无效时返回None"""
+        return self.cache.get("crawl", self._get_cache_key(category), max_age=self.max_cache_age_days * 86400)
+    
+    def _save_cache(self, category, projects):
+        """保存项目列表到缓存，空列表多半是抓取失败，不缓存，下次重新抓取"""
+        if not projects:
+            print(f"{self._get_cache_key(category)}没有获取到项目，不写入缓存")
+            return
+        self.cache.put("crawl", self._get_cache_key(category), projects)
     
     def get_trending_projects(self):
         """获取GitHub上的热门项目（优先使用缓存）"""
-        cache_path = self._get_cache_path("trending")
-        
-        if self._is_cache_valid(cache_path):
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        projects = self._load_cache("trending")
+        if projects is not None:
+            return projects
         
         projects = self._fetch_trending_projects()
         
         # 保存到缓存
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, ensure_ascii=False, indent=2)
+        self._save_cache("trending", projects)
         
         return projects
     
     def get_newest_projects(self):
         """获取GitHub上的最新项目（优先使用缓存）"""
-        cache_path = self._get_cache_path("newest")
-        
-        if self._is_cache_valid(cache_path):
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        projects = self._load_cache("newest")
+        if projects is not None:
+            return projects
         
         projects = self._fetch_newest_projects()
         
         # 保存到缓存
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, ensure_ascii=False, indent=2)
+        self._save_cache("newest", projects)
         
         return projects
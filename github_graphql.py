@@ -0,0 +1,246 @@
+import math
+import threading
+from datetime import datetime, timedelta, timezone
+import config
+from http_client import get_http_client
+from metrics import get_metrics
+from enrichment import extract_summary
+
+# 每个仓库需要的字段，搜索和按名称批量查询共用
+REPOSITORY_FRAGMENT = """
+fragment RepoFields on Repository {
+  nameWithOwner
+  url
+  description
+  primaryLanguage { name }
+  stargazerCount
+  forkCount
+  createdAt
+  updatedAt
+  pushedAt
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+  latestRelease { tagName publishedAt }
+  defaultBranchRef { target { oid } }
+  readme: object(expression: "HEAD:README.md") { ... on Blob { text } }
+  stargazers(first: %(recent_stars)d, orderBy: {field: STARRED_AT, direction: DESC}) { edges { starredAt } }
+}
+"""
+
+SEARCH_QUERY = """
+query($query: String!, $first: Int!, $after: String) {
+  rateLimit { cost remaining resetAt }
+  search(query: $query, type: REPOSITORY, first: $first, after: $after) {
+    pageInfo { hasNextPage endCursor }
+    nodes { ...RepoFields }
+  }
+}
+"""
+
+class GraphQLError(Exception):
+    """GraphQL接口返回了错误"""
+
+class GitHubGraphQL:
+    """
+    GitHub GraphQL客户端
+
+    一次查询最多获取100个仓库的星标、主题、README开头、最近新增星标和最新版本，
+    替代逐个仓库的REST请求。每次查询都会带上rateLimit，剩余额度不足以支付下一页的预计费用时停止翻页。
+    """
+
+    # 每个查询最多包含的仓库数，GitHub对单个连接的上限是100
+    MAX_BATCH = 100
+
+    def __init__(self, token=None):
+        self.token = token or self._get_token()
+        self.api_url = config.GITHUB_GRAPHQL_URL
+        self.page_size = min(config.GITHUB_GRAPHQL_PAGE_SIZE, self.MAX_BATCH)
+        self.min_remaining = config.GITHUB_GRAPHQL_MIN_REMAINING
+        self.recent_stars = config.GITHUB_GRAPHQL_RECENT_STARS
+        self.recent_days = config.GITHUB_RECENT_STAR_DAYS
+        self.http = get_http_client()
+        # 最近一次查询返回的额度信息: {"cost", "remaining", "resetAt"}
+        self.rate_limit = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return bool(self.token)
+
+    def _get_token(self):
+        """从github_token.txt文件中获取访问令牌，没有文件时使用配置中的令牌"""
+        try:
+            with open("github_token.txt", "r") as f:
+                return f.readline().strip()
+        except Exception:
+            return config.GITHUB_TOKEN
+
+    def _fragment(self):
+        return REPOSITORY_FRAGMENT % {"recent_stars": self.recent_stars}
+
+    def estimate_cost(self, repositories):
+        """
+        按GitHub的计算方式估算查询费用
+
+        每个连接按请求的节点数计，总数除以100向上取整，最少为1
+        """
+        requests = 1 + repositories * (2 + math.ceil(self.recent_stars / 100))
+        return max(1, math.ceil(requests / 100))
+
+    def query(self, query, variables=None):
+        """执行一次查询，返回data部分"""
+        headers = {"Authorization": f"bearer {self.token}", "Content-Type": "application/json"}
+        metrics = get_metrics()
+        with metrics.span("github_graphql_request"):
+            # GraphQL查询是只读的，读取超时后也可以安全重试
+            response = self.http.post(self.api_url, json={"query": query, "variables": variables or {}}, headers=headers,
+                                      retry_on_timeout=True)
+        response.raise_for_status()
+        result = response.json()
+
+        data = result.get("data") or {}
+        rate_limit = data.get("rateLimit")
+        if rate_limit:
+            with self._lock:
+                self.rate_limit = rate_limit
+            metrics.inc("github_graphql_cost_total", rate_limit.get("cost", 0))
+        if result.get("errors"):
+            messages = "; ".join(error.get("message", "") for error in result["errors"])
+            # 部分仓库不存在时仍返回其余数据，只有完全没有数据时才视为失败
+            if not data:
+                raise GraphQLError(messages)
+            print(f"GitHub GraphQL查询返回错误: {messages}")
+        return data
+
+    def affordable(self, repositories):
+        """剩余额度是否足够支付一次包含指定数量仓库的查询"""
+        with self._lock:
+            rate_limit = self.rate_limit
+        if rate_limit is None:
+            return True
+        return rate_limit.get("remaining", 0) - self.estimate_cost(repositories) >= self.min_remaining
+
+    def search(self, search_query, limit, select=None):
+        """
+        按搜索条件获取仓库，自动翻页直到收集到limit个项目
+
+        select: 可选的筛选函数，每页调用一次，接收并返回项目列表
+        返回: 项目列表
+        """
+        projects = []
+        after = None
+        while len(projects) < limit:
+            first = self.page_size
+            if not self.affordable(first):
+                # 额度不足时缩小页面，仍然不够则停止
+                first = max(1, first // 4)
+                if not self.affordable(first):
+                    print(f"GitHub GraphQL剩余额度不足（{self.rate_limit}），停止翻页")
+                    break
+            data = self.query(SEARCH_QUERY + self._fragment(), {"query": search_query, "first": first, "after": after})
+            search = data.get("search") or {}
+            page = [project for project in map(self._node_to_project, search.get("nodes") or []) if project]
+            projects.extend(select(page) if select else page)
+            page_info = search.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                break
+            after = page_info.get("endCursor")
+        return projects[:limit]
+
+    def fetch_repositories(self, names):
+        """
+        按"owner/name"批量获取仓库，每个查询最多MAX_BATCH个仓库
+
+        返回: {"owner/name": 项目}，不存在或额度不足而未获取的仓库不在结果中
+        """
+        results = {}
+        for start in range(0, len(names), self.MAX_BATCH):
+            batch = names[start:start + self.MAX_BATCH]
+            if not self.affordable(len(batch)):
+                print(f"GitHub GraphQL剩余额度不足（{self.rate_limit}），{len(names) - start}个仓库未获取")
+                break
+            declarations = []
+            fields = []
+            variables = {}
+            for i, name in enumerate(batch):
+                owner, _, repo = name.partition("/")
+                declarations.append(f"$owner{i}: String!, $name{i}: String!")
+                fields.append(f"  r{i}: repository(owner: $owner{i}, name: $name{i}) {{ ...RepoFields }}")
+                variables[f"owner{i}"] = owner
+                variables[f"name{i}"] = repo
+            query = (f"query({', '.join(declarations)}) {{\n  rateLimit {{ cost remaining resetAt }}\n"
+                     + "\n".join(fields) + "\n}\n" + self._fragment())
+
+            data = self.query(query, variables)
+            for i, name in enumerate(batch):
+                project = self._node_to_project(data.get(f"r{i}"))
+                if project:
+                    results[name] = project
+        return results
+
+    def augment(self, projects):
+        """用GraphQL数据补充已有项目的主题、版本、最近星标和README摘要，返回补充成功的项目数"""
+        names = [project["name"] for project in projects if "github.com/" in project.get("url", "")]
+        if not names:
+            return 0
+        fetched = self.fetch_repositories(names)
+        for project in projects:
+            extra = fetched.get(project["name"])
+            if not extra:
+                continue
+            for field in ("tags", "forks", "latest_release", "stars_recent", "sha", "pushed_at", "readme_summary"):
+                if extra.get(field):
+                    project[field] = extra[field]
+        return len(fetched)
+
+    def _node_to_project(self, node):
+        """把GraphQL返回的仓库节点转换为项目"""
+        if not node or not node.get("nameWithOwner"):
+            return None
+        stars = node.get("stargazerCount") or 0
+        release = node.get("latestRelease") or {}
+        readme = (node.get("readme") or {}).get("text") or ""
+        target = (node.get("defaultBranchRef") or {}).get("target") or {}
+        topics = [item["topic"]["name"] for item in (node.get("repositoryTopics") or {}).get("nodes") or []
+                  if item and item.get("topic")]
+
+        return {
+            "name": node["nameWithOwner"],
+            "url": node.get("url") or f"https://github.com/{node['nameWithOwner']}",
+            "description": node.get("description") or "",
+            "language": (node.get("primaryLanguage") or {}).get("name") or "未知",
+            "stars": str(stars),
+            "stars_value": stars,
+            "forks": node.get("forkCount") or 0,
+            "tags": topics,
+            "latest_release": f"{release['tagName']}（{release.get('publishedAt', '')[:10]}）" if release.get("tagName") else "",
+            "stars_recent": self._recent_stars(node),
+            "sha": target.get("oid", ""),
+            "readme_summary": extract_summary(readme[:config.ENRICH_MAX_BYTES]) if readme else "",
+            "updated_at": node.get("updatedAt", ""),
+            "pushed_at": node.get("pushedAt", ""),
+            "created_at": node.get("createdAt", ""),
+        }
+
+    def _recent_stars(self, node):
+        """最近recent_days天新增的星标数，最多统计recent_stars个"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.recent_days)
+        count = 0
+        for edge in (node.get("stargazers") or {}).get("edges") or []:
+            try:
+                starred_at = datetime.fromisoformat(edge["starredAt"].replace("Z", "+00:00"))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if starred_at >= cutoff:
+                count += 1
+        return count
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_github_graphql():
+    """获取进程内共享的GitHub GraphQL客户端，没有配置访问令牌时返回None"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubGraphQL()
+        return _client if _client.available and config.GITHUB_GRAPHQL_ENABLED else None
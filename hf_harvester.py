@@ -0,0 +1,134 @@
+import codecs
+import itertools
+import json
+import config
+from http_client import get_http_client
+from ranking import rank_projects
+
+_decoder = json.JSONDecoder()
+
+def iter_json_array(chunks):
+    """
+    从字节块流中逐个解析JSON数组的元素
+
+    不需要把整个响应读入内存，每解析出一个元素就立即产出。
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    started = False
+
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        buffer = buffer[position:] + text_decoder.decode(chunk or b"", final=final)
+        position = 0
+
+        while True:
+            # 跳过空白和元素之间的逗号
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                break
+
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("响应不是JSON数组")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # 当前元素还没有接收完整，等待下一个数据块
+                if final:
+                    raise
+                break
+            position = end
+            yield item
+
+class HuggingFaceHarvester:
+    """
+    分页抓取Hugging Face的模型、数据集和Spaces
+
+    按Link响应头中的下一页地址翻页，流式解析每一页，每积累一批条目就批量评分，
+    内存中只保留评分最高的top_k个项目。
+    """
+
+    API_URLS = {
+        "model": "https://huggingface.co/api/models",
+        "dataset": "https://huggingface.co/api/datasets",
+        "space": "https://huggingface.co/api/spaces",
+    }
+    URL_PREFIXES = {
+        "model": "https://huggingface.co/",
+        "dataset": "https://huggingface.co/datasets/",
+        "space": "https://huggingface.co/spaces/",
+    }
+
+    # 每批评分的条目数
+    BATCH_SIZE = 1000
+
+    def __init__(self, crawler, page_size=None, max_pages=None):
+        # 复用HuggingFaceCrawler的条目转换规则
+        self.crawler = crawler
+        self.http = get_http_client()
+        self.page_size = page_size or config.HF_HARVEST_PAGE_SIZE
+        self.max_pages = max_pages or config.HF_HARVEST_MAX_PAGES
+
+    def iter_items(self, kind, sort):
+        """逐页请求并逐个产出原始条目"""
+        url = self.API_URLS[kind]
+        params = {"sort": sort, "limit": self.page_size, "full": "true"}
+
+        for page in range(self.max_pages):
+            response = self.http.get(url, params=params, stream=True)
+            try:
+                response.raise_for_status()
+                yield from iter_json_array(response.iter_content(chunk_size=64 * 1024))
+                # 下一页地址中已包含游标和查询参数
+                url = response.links.get("next", {}).get("url")
+            finally:
+                response.close()
+            params = None
+            if not url:
+                break
+
+    def harvest(self, sort="trending", top_k=None, kinds=None):
+        """
+        抓取并返回评分最高的top_k个项目（按评分从高到低排序）
+
+        kinds: 要抓取的类型，可选model、dataset、space
+        """
+        top_k = top_k or self.crawler.num_projects
+        kinds = kinds or config.HF_HARVEST_KINDS
+        top = []
+        batch = []
+        scanned = 0
+
+        for kind in kinds:
+            try:
+                for item in self.iter_items(kind, sort):
+                    scanned += 1
+                    try:
+                        project = self.crawler._item_to_project(item, url_prefix=self.URL_PREFIXES[kind])
+                    except Exception as e:
+                        print(f"解析Hugging Face项目时出错: {e}")
+                        continue
+                    if not project:
+                        continue
+
+                    project["type"] = kind
+                    batch.append(project)
+                    if len(batch) >= self.BATCH_SIZE:
+                        # 已保留的项目排在前面，评分相同时先出现的项目优先
+                        top = rank_projects(top + batch, "huggingface", top_k)
+                        batch = []
+            except Exception as e:
+                print(f"抓取Hugging Face {kind} 列表时出错: {e}")
+
+        top = rank_projects(top + batch, "huggingface", top_k)
+        print(f"Hugging Face共扫描{scanned}个条目，保留评分最高的{len(top)}个")
+        return top
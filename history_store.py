@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+import numpy as np
+import config
+
+# 每条记录的固定格式: 项目编号、抓取时间和各项指标
+RECORD_DTYPE = np.dtype([
+    ("project_id", "<u4"),
+    ("ts", "<u4"),
+    ("stars", "<i8"),
+    ("likes", "<i8"),
+    ("downloads", "<i8"),
+])
+
+# 指标与项目字段的对应关系
+METRIC_FIELDS = {
+    "stars": "stars_value",
+    "likes": "likes",
+    "downloads": "downloads",
+}
+
+class HistoryStore:
+    """
+    项目指标的历史记录
+
+    每次抓取的星标、点赞和下载量以定长二进制记录追加到同一个文件，读取时整体载入为NumPy数组，
+    按列计算增长，不需要重新抓取。项目URL与编号的对应关系保存在单独的索引文件中。
+    """
+
+    def __init__(self, path=None, index_path=None):
+        self.path = path or os.path.join(config.CACHE_DIR, config.HISTORY_FILE_NAME)
+        self.index_path = index_path or os.path.join(config.CACHE_DIR, config.HISTORY_INDEX_NAME)
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        # 项目编号 -> (URL, 名称)，URL -> 项目编号
+        self._projects = {}
+        self._ids = {}
+        # 下一个新项目使用的编号
+        self._next_id = 0
+        self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    # 只跳过写入中断导致的不完整行，之后的行照常读取
+                    if len(parts) != 3 or not parts[0].isdigit() or parts[1] in self._ids:
+                        continue
+                    project_id = int(parts[0])
+                    self._ids[parts[1]] = project_id
+                    self._projects[project_id] = (parts[1], parts[2])
+                    self._next_id = max(self._next_id, project_id + 1)
+
+        # 索引行损坏时记录文件中可能有更大的编号，新项目不能再使用这些编号
+        records = self.load()
+        if len(records):
+            self._next_id = max(self._next_id, int(records["project_id"].max()) + 1)
+
+    def _project_id(self, project, new_entries):
+        url = project.get("url")
+        project_id = self._ids.get(url)
+        if project_id is None:
+            project_id = self._next_id
+            self._next_id += 1
+            name = str(project.get("name", "")).replace("\t", " ").replace("\n", " ")
+            self._ids[url] = project_id
+            self._projects[project_id] = (url, name)
+            new_entries.append(f"{project_id}\t{url}\t{name}\n")
+        return project_id
+
+    def _metric(self, project, field):
+        try:
+            return int(float(project.get(field) or 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def record(self, projects, ts=None):
+        """
+        追加一次抓取的指标，同一次调用中重复出现的项目只记录一次
+
+        返回: 写入的记录数
+        """
+        ts = int(ts if ts is not None else time.time())
+        rows = {}
+        with self._lock:
+            new_entries = []
+            for project in projects:
+                url = project.get("url")
+                if not url or "\t" in url or "\n" in url:
+                    continue
+                project_id = self._project_id(project, new_entries)
+                rows[project_id] = tuple(self._metric(project, field) for field in METRIC_FIELDS.values())
+
+            if not rows:
+                return 0
+            records = np.array(
+                [(project_id, ts) + metrics for project_id, metrics in rows.items()],
+                dtype=RECORD_DTYPE
+            )
+
+            # 先写索引再写记录，保证记录引用的编号都能在索引中找到
+            if new_entries:
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.writelines(new_entries)
+            with open(self.path, "ab") as f:
+                self._truncate_partial_record(f)
+                f.write(records.tobytes())
+        return len(records)
+
+    def _truncate_partial_record(self, f):
+        """丢弃上次写入中断留下的不完整记录"""
+        size = f.seek(0, os.SEEK_END)
+        remainder = size % RECORD_DTYPE.itemsize
+        if remainder:
+            f.truncate(size - remainder)
+
+    def load(self):
+        """读取全部记录"""
+        if not os.path.exists(self.path):
+            return np.empty(0, dtype=RECORD_DTYPE)
+        count = os.path.getsize(self.path) // RECORD_DTYPE.itemsize
+        return np.fromfile(self.path, dtype=RECORD_DTYPE, count=count)
+
+    def series(self, url, metric="stars"):
+        """单个项目某项指标的历史: [(时间戳, 数值), ...]"""
+        project_id = self._ids.get(url)
+        if project_id is None:
+            return []
+        records = self.load()
+        records = records[records["project_id"] == project_id]
+        records = records[np.argsort(records["ts"], kind="stable")]
+        return [(int(ts), int(value)) for ts, value in zip(records["ts"], records[metric])]
+
+    def top_growth(self, days=None, metric="stars", k=None, now=None):
+        """
+        统计窗口内某项指标增长最多的项目
+
+        增长 = 窗口内最后一次记录 - 窗口开始前最后一次记录（没有时使用窗口内第一次记录）
+        没有增长的项目不统计，其中包括没有该项指标的来源（如GitHub项目的likes和downloads始终为0）
+        返回: [{"url", "name", "growth", "velocity"(每天增长), "latest"}, ...]，按增长从高到低排序
+        """
+        days = days or config.HISTORY_GROWTH_DAYS
+        k = k or config.HISTORY_TOP_GROWTH
+        now = int(now if now is not None else time.time())
+        start = now - days * 86400
+
+        records = self.load()
+        # 索引行已损坏的项目没有URL，不参与统计
+        known = np.isin(records["project_id"], np.fromiter(self._projects, dtype=np.int64, count=len(self._projects)))
+        records = records[(records["ts"] <= now) & known]
+        if len(records) == 0:
+            return []
+
+        # 按项目和时间排序后，每个项目的记录是连续的一段
+        records = records[np.lexsort((records["ts"], records["project_id"]))]
+        ids = records["project_id"]
+        ts = records["ts"].astype(np.int64)
+        values = records[metric]
+
+        # 每个项目的基准记录: 窗口开始前的最后一条，没有时为第一条
+        group_starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        group_ends = np.r_[group_starts[1:], len(ids)] - 1
+        # 每个项目中时间不晚于窗口开始的记录数
+        in_before = np.add.reduceat((ts <= start).astype(np.int64), group_starts)
+        baseline = np.where(in_before > 0, group_starts + in_before - 1, group_starts)
+
+        # 只统计窗口内有记录的项目
+        active = ts[group_ends] > start
+        baseline, latest = baseline[active], group_ends[active]
+        if len(latest) == 0:
+            return []
+
+        growth = values[latest] - values[baseline]
+        span_days = np.maximum((ts[latest] - ts[baseline]) / 86400.0, 1.0)
+        order = np.argsort(-growth, kind="stable")
+        order = order[growth[order] > 0][:k]
+
+        results = []
+        for i in order:
+            url, name = self._projects[ids[latest[i]]]
+            results.append({
+                "url": url,
+                "name": name,
+                "growth": int(growth[i]),
+                "velocity": round(float(growth[i] / span_days[i]), 1),
+                "latest": int(values[latest[i]]),
+            })
+        return results
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_history_store():
+    """获取进程内共享的历史记录"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
@@ -0,0 +1,251 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+import config
+from cache_store import get_cache_store
+from metrics import get_metrics
+
+# 需要重试的HTTP状态码
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def is_connect_error(error):
+    """是否为建立连接阶段的错误（连接超时、连接被拒绝、域名解析失败），这时请求还没有发到服务端"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.ConnectionError) or isinstance(error, requests.Timeout):
+        return False
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+class RetryPolicy:
+    """
+    HTTP重试策略，同步客户端和异步流水线共用
+
+    决定哪些响应需要重试、重试前等待多久（遵守Retry-After和GitHub的X-RateLimit-*响应头，否则指数退避），
+    并按主机记录额度恢复时间，同一进程内所有请求共享同一份限流状态。
+    """
+
+    def __init__(self):
+        self.max_retries = config.HTTP_MAX_RETRIES
+        self.backoff_factor = config.HTTP_BACKOFF_FACTOR
+        self.max_retry_wait = config.HTTP_MAX_RETRY_WAIT
+
+        # 被限流的主机及其恢复时间: {host: timestamp}
+        self._rate_limited_until = {}
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt):
+        return self.backoff_factor * (2 ** attempt)
+
+    def should_retry(self, status, headers):
+        if status in RETRY_STATUS_CODES:
+            return True
+        # GitHub在额度用尽时返回403并带有X-RateLimit-Remaining: 0
+        return status == 403 and headers.get("X-RateLimit-Remaining") == "0"
+
+    def retry_delay(self, headers, attempt):
+        """计算重试前的等待时间，超过最大等待时间时返回None"""
+        delay = self._parse_retry_after(headers.get("Retry-After"))
+        if delay is None:
+            delay = self._rate_limit_reset_delay(headers)
+        if delay is None:
+            delay = self.backoff(attempt)
+        return delay if delay <= self.max_retry_wait else None
+
+    def _parse_retry_after(self, value):
+        """Retry-After可以是秒数或HTTP日期"""
+        if not value:
+            return None
+        if value.strip().isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def _rate_limit_reset_delay(self, headers):
+        """根据X-RateLimit-Reset计算额度恢复前需要等待的时间"""
+        if headers.get("X-RateLimit-Remaining") != "0":
+            return None
+        reset = headers.get("X-RateLimit-Reset", "")
+        if not reset.isdigit():
+            return None
+        return max(0, int(reset) - time.time())
+
+    def record_rate_limit(self, host, headers):
+        """额度用尽时记录恢复时间，之后对该主机的请求会先等待"""
+        delay = self._rate_limit_reset_delay(headers)
+        if delay is not None:
+            with self._lock:
+                self._rate_limited_until[host] = time.time() + delay
+
+    def rate_limit_wait(self, host):
+        """对该主机发送请求前需要等待的时间，额度未用尽或需要等待过久时返回0"""
+        with self._lock:
+            until = self._rate_limited_until.get(host, 0)
+        delay = until - time.time()
+        if 0 < delay <= self.max_retry_wait:
+            print(f"{host}请求额度已用尽，等待{delay:.0f}秒")
+            return delay
+        return 0
+
+class HttpClient:
+    """
+    共享的HTTP客户端
+
+    所有请求复用同一个requests.Session，按主机维护连接池并保持长连接，
+    支持gzip压缩、连接/读取超时，失败时按共享的RetryPolicy重试。
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        # 每个主机一个连接池，pool_maxsize决定同一主机的最大并发连接数
+        adapter = HTTPAdapter(
+            pool_connections=config.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=config.HTTP_POOL_MAXSIZE,
+            max_retries=0
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        })
+
+        self.timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+        self.retry = get_retry_policy()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, max_retries=None, retry_on_timeout=None, before_retry=None, **kwargs):
+        """
+        发送请求，失败时按退避策略重试，重试耗尽后返回最后一次响应
+
+        retry_on_timeout: 读取超时或连接中断后是否重试，默认只有非POST请求重试；
+            POST请求可能已被服务端处理，默认只在连接阶段出错时重试，幂等的POST请求可以传True
+        before_retry: 每次重试前调用，抛出异常时停止重试（如为重试预留token额度）
+        """
+        if max_retries is None:
+            max_retries = self.retry.max_retries
+        if retry_on_timeout is None:
+            retry_on_timeout = method.upper() != "POST"
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).netloc
+        metrics = get_metrics()
+
+        for attempt in range(max_retries + 1):
+            wait = self.retry.rate_limit_wait(host)
+            if wait:
+                time.sleep(wait)
+            if attempt > 0:
+                if before_retry:
+                    before_retry()
+                metrics.inc("http_retries_total", host=host)
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.inc("http_requests_total", host=host, status="error")
+                if attempt == max_retries or not (retry_on_timeout or is_connect_error(e)):
+                    raise
+                delay = self.retry.backoff(attempt)
+                print(f"请求{host}失败: {e}，{delay:.1f}秒后重试（第{attempt + 1}次）")
+                time.sleep(delay)
+                continue
+            # 流式响应只统计到收到响应头为止
+            metrics.observe("http_request_seconds", time.perf_counter() - start, host=host)
+            metrics.inc("http_requests_total", host=host, status=response.status_code)
+
+            self.retry.record_rate_limit(host, response.headers)
+
+            if not self.retry.should_retry(response.status_code, response.headers) or attempt == max_retries:
+                return response
+
+            delay = self.retry.retry_delay(response.headers, attempt)
+            if delay is None:
+                # 需要等待的时间过长，放弃重试
+                return response
+            print(f"{host}返回{response.status_code}，{delay:.1f}秒后重试（第{attempt + 1}次）")
+            # 关闭响应，使连接回到连接池
+            response.close()
+            time.sleep(delay)
+
+    def conditional_get(self, url, params=None, **kwargs):
+        """
+        带ETag/Last-Modified校验的GET请求
+
+        服务端返回304时使用上次缓存的响应内容，不重新下载。
+        返回: (响应文本, 是否未修改)
+        """
+        cache_key, cached, headers = prepare_conditional(url, params, kwargs.pop("headers", None))
+        response = self.get(url, params=params, headers=headers, **kwargs)
+        if response.status_code == 304 and cached:
+            get_metrics().inc("http_not_modified_total", host=urlparse(url).netloc)
+            print(f"{urlparse(url).netloc}内容未变化，使用缓存")
+            return cached["body"], True
+
+        response.raise_for_status()
+        store_conditional(cache_key, response.headers, response.text)
+        return response.text, False
+
+def prepare_conditional(url, params=None, headers=None):
+    """
+    条件请求的缓存键、上次缓存的响应和带校验信息的请求头，同步客户端和异步流水线共用
+
+    返回: (缓存键, 缓存内容或None, 请求头)
+    """
+    cache_key = url + ("?" + urlencode(sorted(params.items())) if params else "")
+    cached = get_cache_store().get("http", cache_key)
+
+    headers = dict(headers or {})
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    return cache_key, cached, headers
+
+def store_conditional(cache_key, headers, body):
+    """响应带有ETag或Last-Modified时缓存响应内容，下次请求时用于校验"""
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if etag or last_modified:
+        get_cache_store().put("http", cache_key, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body
+        })
+
+_retry_policy = None
+_retry_policy_lock = threading.Lock()
+_client = None
+_client_lock = threading.Lock()
+
+def get_retry_policy():
+    """获取进程内共享的重试策略"""
+    global _retry_policy
+    with _retry_policy_lock:
+        if _retry_policy is None:
+            _retry_policy = RetryPolicy()
+        return _retry_policy
+
+def get_http_client():
+    """获取进程内共享的HTTP客户端"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -1,62 +1,56 @@
-import requests
 import json
-import os
-from datetime import datetime, timedelta
 import config
+from http_client import get_http_client
+from cache_store import get_cache_store
+from hf_harvester import HuggingFaceHarvester
+from ranking import rank_projects
 
 class HuggingFaceCrawler:
     def __init__(self):
-        self.cache_dir = config.CACHE_DIR
         self.max_cache_age_days = config.MAX_CACHE_AGE_DAYS
         self.num_projects = config.NUM_PROJECTS
-        
-        # 确保缓存目录存在
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
+        self.http = get_http_client()
+        self.cache = get_cache_store()
     
-    def _get_cache_path(self, category):
-        """获取缓存文件路径"""
-        return os.path.join(self.cache_dir, f"huggingface_{category}.json")
+    def _get_cache_key(self, category):
+        """获取缓存键，项目数不是默认值时加上项目数，不同大小的报告不会读到彼此截断后的列表"""
+        if self.num_projects != config.NUM_PROJECTS:
+            return f"huggingface_{category}_{self.num_projects}"
+        return f"huggingface_{category}"
     
-    def _is_cache_valid(self, cache_path):
-        """检查缓存是否有效"""
-        if not os.path.exists(cache_path):
-            return False
-        
-        cache_time = datetime.fromtimestamp(os.path.getmtime(cache_path))
-        max_age = timedelta(days=self.max_cache_age_days)
-        
-        return datetime.now() - cache_time < max_age
+    # 大公司或知名组织的列表，统一在config中维护
+    MAJOR_ORGANIZATIONS = config.MAJOR_ORGANIZATIONS
     
-    # 定义大公司或知名组织的列表
-    MAJOR_ORGANIZATIONS = [
-        "google", "meta", "facebook", "microsoft", "openai", "deepmind", "anthropic", 
-        "baidu", "tencent", "alibaba", "huawei", "nvidia", "apple", "amazon", "intel",
-        "ibm", "adobe", "twitter", "netflix", "salesforce", "uber", "lyft", "airbnb",
-        "pinterest", "snap", "dropbox", "huggingface", "stability", "cohere", "deepseek",
-        "zhipu", "bytedance", "xiaomi", "01ai", "mila", "stanford", "berkeley", "mit",
-        "carnegie", "nvidia", "amd", "pytorch", "tensorflow", "jax", "neurips", "google-research",
-        "facebookresearch", "openai-research", "stabilityai", "mistralai", "llama"
-    ]
+    MODELS_API_URL = "https://huggingface.co/api/models"
     
-    def _fetch_projects(self, sort="trending", limit=None):
-        """获取Hugging Face上的项目"""
-        if limit is None:
-            limit = self.num_projects
-        
+    def _build_params(self, sort, limit):
+        """Hugging Face模型API的查询参数"""
         # 获取更多项目以便筛选
         fetch_limit = max(50, limit * 3)
-            
-        url = "https://huggingface.co/api/models"
-        params = {
+        
+        return {
             "sort": sort,
             "limit": fetch_limit,
             "full": "true"  # 获取完整信息
         }
+    
+    def _use_harvester(self):
+        """需要跨多页或多种类型排名时，使用分页流式抓取"""
+        return config.HF_HARVEST_MAX_PAGES > 1 or config.HF_HARVEST_KINDS != ["model"]
+    
+    def _fetch_projects(self, sort="trending", limit=None):
+        """获取Hugging Face上的项目"""
+        if limit is None:
+            limit = self.num_projects
         
-        response = requests.get(url, params=params, headers={"User-Agent": "Mozilla/5.0"})
-        data = response.json()
+        if self._use_harvester():
+            return HuggingFaceHarvester(self).harvest(sort=sort, top_k=limit)
         
+        text, _ = self.http.conditional_get(self.MODELS_API_URL, params=self._build_params(sort, limit))
+        return self._parse_projects(json.loads(text), limit)
+    
+    def _parse_projects(self, data, limit):
+        """解析Hugging Face API返回的数据，评分并排序"""
         # 打印API返回数据结构，便于调试
         print(f"Hugging Face API返回数据类型: {type(data)}")
         
@@ -85,91 +79,90 @@ class HuggingFaceCrawler:
         all_projects = []
         for item in items:
             try:
-                if not isinstance(item, dict):
-                    continue
-                    
-                # 构建项目信息
-                model_id = item.get("modelId", "")
-                name = item.get("id", model_id) or item.get("name", "")
-                
-                if not name:
-                    continue
-                    
-                # 获取描述
-                description = item.get("description", "")
-                if not description:  # 跳过没有描述的项目
-                    continue
-                    
-                # 获取其他元数据
-                tags = item.get("tags", [])
-                likes = item.get("likes", 0)
-                downloads = item.get("downloads", 0)
-                author = item.get("author", "") or name.split("/")[0] if "/" in name else ""
-                
-                # 创建项目对象
-                project = {
-                    "name": name,
-                    "url": f"https://huggingface.co/{name}",
-                    "description": description,
-                    "tags": tags,
-                    "likes": likes,
-                    "downloads": downloads,
-                    "author": author,
-                    "is_major_org": False,  # 默认为非大公司
-                    "score": 0  # 初始评分
-                }
-                
-                # 检查是否来自大公司
-                for org in self.MAJOR_ORGANIZATIONS:
-                    if org.lower() in author.lower() or org.lower() in name.lower():
-                        project["is_major_org"] = True
-                        # 大公司项目评分+100
-                        project["score"] += 100
-                        break
-                
-                # 根据点赞和下载量计算评分
-                project["score"] += min(likes * 2, 200)  # 每个点赞2分，最多200分
-                project["score"] += min(downloads // 1000, 300)  # 每1000下载1分，最多300分
-                
-                # 将项目添加到列表中
-                all_projects.append(project)
+                project = self._item_to_project(item)
+                if project:
+                    # 将项目添加到列表中
+                    all_projects.append(project)
             except Exception as e:
                 print(f"解析Hugging Face项目时出错: {e}")
         
-        # 按评分排序
-        all_projects.sort(key=lambda p: p["score"], reverse=True)
+        # 批量评分并选出评分最高的项目
+        return rank_projects(all_projects, "huggingface", limit)
+    
+    def _item_to_project(self, item, url_prefix="https://huggingface.co/"):
+        """把API返回的单个条目转换为项目，不符合条件时返回None"""
+        if not isinstance(item, dict):
+            return None
+            
+        # 构建项目信息
+        model_id = item.get("modelId", "")
+        name = item.get("id", model_id) or item.get("name", "")
+        
+        if not name:
+            return None
+            
+        # 获取描述
+        description = item.get("description", "")
+        if not description:  # 跳过没有描述的项目
+            return None
+            
+        # 获取其他元数据
+        tags = item.get("tags", [])
+        likes = item.get("likes", 0)
+        downloads = item.get("downloads", 0)
+        author = item.get("author", "") or name.split("/")[0] if "/" in name else ""
+        
+        # 创建项目对象
+        project = {
+            "name": name,
+            "url": f"{url_prefix}{name}",
+            "description": description,
+            "tags": tags,
+            "likes": likes,
+            "downloads": downloads,
+            "author": author,
+            # 用于判断模型卡片是否变化
+            "sha": item.get("sha", ""),
+            "last_modified": item.get("lastModified", ""),
+            "is_major_org": False,  # 由ranking模块批量评分时设置
+            "score": 0
+        }
         
-        # 返回排序后的项目，限制数量
-        return all_projects[:limit]
+        return project
+    
+    def _load_cache(self, category):
+        """读取有效的缓存，缓存无效时返回None"""
+        return self.cache.get("crawl", self._get_cache_key(category), max_age=self.max_cache_age_days * 86400)
+    
+    def _save_cache(self, category, projects):
+        """保存项目列表到缓存，空列表多半是抓取失败，不缓存，下次重新抓取"""
+        if not projects:
+            print(f"{self._get_cache_key(category)}没有获取到项目，不写入缓存")
+            return
+        self.cache.put("crawl", self._get_cache_key(category), projects)
     
     def get_trending_projects(self):
         """获取Hugging Face上的热门项目（优先使用缓存）"""
-        cache_path = self._get_cache_path("trending")
-        
-        if self._is_cache_valid(cache_path):
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        projects = self._load_cache("trending")
+        if projects is not None:
+            return projects
         
         projects = self._fetch_projects(sort="trending")
         
         # 保存到缓存
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, ensure_ascii=False, indent=2)
+        self._save_cache("trending", projects)
         
         return projects
     
     def get_newest_projects(self):
         """获取Hugging Face上的最新项目（优先使用缓存）"""
-        cache_path = self._get_cache_path("newest")
-        
-        if self._is_cache_valid(cache_path):
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        projects = self._load_cache("newest")
+        if projects is not None:
+            return projects
         
         projects = self._fetch_projects(sort="created_at")
         
         # 保存到缓存
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, ensure_ascii=False, indent=2)
+        self._save_cache("newest", projects)
         
         return projects
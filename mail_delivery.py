@@ -0,0 +1,176 @@
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import config
+from metrics import get_metrics
+
+def resolve_smtp_settings(sender_email):
+    """
+    根据发件邮箱确定SMTP服务器配置
+
+    优先使用config.SMTP_OVERRIDE（如本地测试服务器），否则按邮箱域名查找config.SMTP_PROVIDERS
+    """
+    if config.SMTP_OVERRIDE:
+        return dict(config.SMTP_OVERRIDE)
+
+    domain = sender_email.rsplit("@", 1)[-1].lower()
+    settings = config.SMTP_PROVIDERS.get(domain)
+    if settings is None:
+        raise ValueError(f"不支持的邮箱类型: {sender_email}")
+    return dict(settings)
+
+def open_smtp_connection(settings, sender_email, sender_password):
+    """建立SMTP连接，按配置启用STARTTLS并登录"""
+    server = smtplib.SMTP(settings["host"], settings["port"], timeout=config.SMTP_TIMEOUT)
+    try:
+        if settings.get("starttls", True):
+            server.starttls()
+        if settings.get("login", True):
+            server.login(sender_email, sender_password)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+class Throttle:
+    """令牌桶限速，控制每分钟发送的邮件数量"""
+
+    def __init__(self, max_per_minute):
+        self.rate = max_per_minute / 60.0 if max_per_minute else None
+        self.capacity = max(1.0, self.rate or 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate is None:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class SMTPConnectionPool:
+    """复用已登录的SMTP连接，最多同时保持size个连接"""
+
+    def __init__(self, settings, sender_email, sender_password, size):
+        self.settings = settings
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self._idle = queue.LifoQueue()
+        self._slots = threading.Semaphore(size)
+
+    def acquire(self):
+        """取出一个空闲连接，没有时新建"""
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return open_smtp_connection(self.settings, self.sender_email, self.sender_password)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, server, broken=False):
+        """归还连接，出错的连接直接关闭"""
+        if broken:
+            try:
+                server.close()
+            except Exception:
+                pass
+        else:
+            self._idle.put(server)
+        self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+
+class DeliveryEngine:
+    """
+    为每个收件人单独发送一份邮件
+
+    使用小型SMTP连接池并行发送，按服务商限速，失败的收件人会在所有收件人处理完后重试。
+    """
+
+    def __init__(self, sender_email, sender_password, settings=None, pool_size=None, max_retries=None):
+        self.sender_email = sender_email
+        self.settings = settings or resolve_smtp_settings(sender_email)
+        self.pool_size = pool_size or config.SMTP_POOL_SIZE
+        self.max_retries = config.SMTP_MAX_RETRIES if max_retries is None else max_retries
+        self.pool = SMTPConnectionPool(self.settings, sender_email, sender_password, self.pool_size)
+        self.throttle = Throttle(self.settings.get("max_per_minute"))
+
+    def _send_one(self, build_message, recipient):
+        """发送给单个收件人，返回None表示成功，否则返回错误"""
+        self.throttle.acquire()
+        try:
+            server = self.pool.acquire()
+        except Exception as e:
+            return e
+
+        try:
+            with get_metrics().span("smtp_send", mode="pooled"):
+                server.send_message(build_message(recipient), self.sender_email, [recipient])
+        except smtplib.SMTPRecipientsRefused as e:
+            # 收件人被拒绝不影响连接本身
+            self.pool.release(server)
+            return e
+        except Exception as e:
+            self.pool.release(server, broken=True)
+            return e
+
+        self.pool.release(server)
+        return None
+
+    def deliver(self, build_message, recipients):
+        """
+        并行发送邮件
+
+        build_message: 根据收件人地址生成邮件的函数
+        返回: {"sent": [收件人...], "failed": {收件人: 错误信息}}
+        """
+        sent = []
+        failed = {}
+        pending = list(dict.fromkeys(recipients))
+
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            for attempt in range(self.max_retries + 1):
+                if not pending:
+                    break
+                if attempt > 0:
+                    delay = config.SMTP_RETRY_BACKOFF * (2 ** (attempt - 1))
+                    print(f"{len(pending)}个收件人发送失败，{delay}秒后重试（第{attempt}次）")
+                    time.sleep(delay)
+
+                errors = executor.map(lambda recipient: self._send_one(build_message, recipient), pending)
+                retry = []
+                for recipient, error in zip(pending, errors):
+                    get_metrics().inc("smtp_messages_total", result="sent" if error is None else "failed")
+                    if error is None:
+                        sent.append(recipient)
+                        failed.pop(recipient, None)
+                    else:
+                        failed[recipient] = str(error)
+                        retry.append(recipient)
+                pending = retry
+
+        self.pool.close()
+        return {"sent": sent, "failed": failed}
@@ -2,99 +2,214 @@ import os
 import time
 import schedule
 from datetime import datetime
-import json
 
 from github_crawler import GitHubCrawler
 from huggingface_crawler import HuggingFaceCrawler
 from deepseek_analyzer import DeepSeekAnalyzer
+from analysis_engine import AnalysisEngine
+from crawl_orchestrator import CrawlOrchestrator
+from crawl_delta import DeltaTracker, summarize_delta
+from report_writer import ReportBuilder
+from run_journal import RunJournal
+from history_store import get_history_store
+from dedup import Deduplicator
+from topic_index import get_topic_index
+from enrichment import Enricher
+from metrics import get_metrics
+from cache_store import get_cache_store, prune_report_files
 from email_sender import EmailSender
 import config
 
-def create_report():
+def crawl_sources():
+    """并发获取所有来源的项目，返回: (抓取结果, 各来源耗时)"""
+    github_crawler = GitHubCrawler()
+    huggingface_crawler = HuggingFaceCrawler()
+    crawl_orchestrator = CrawlOrchestrator()
+    crawled = crawl_orchestrator.crawl([
+        ("github_trending", "GitHub热门", github_crawler.get_trending_projects),
+        ("github_newest", "GitHub最新", github_crawler.get_newest_projects),
+        ("huggingface_trending", "Hugging Face热门", huggingface_crawler.get_trending_projects),
+        ("huggingface_newest", "Hugging Face最新", huggingface_crawler.get_newest_projects),
+    ])
+    return crawled, crawl_orchestrator.timings
+
+def prepare_projects(crawled):
+    """
+    分析前的准备: 标注与上次抓取相比的变化、记录指标历史、合并近似重复项目、查询主题索引
+
+    返回: (合并后的抓取结果, 各来源的变化统计, 增长最快的项目, 主题分组)
+    """
+    # 与上次抓取结果比较，标注新增、变化和未变化的项目
+    delta_tracker = DeltaTracker()
+    crawl_deltas = {}
+    for key, projects in crawled.items():
+        # 抓取失败的来源不更新基准，避免把所有项目误判为下榜
+        if not projects:
+            continue
+        crawl_deltas[key] = summarize_delta(delta_tracker.update(key, projects))
+        summary = crawl_deltas[key]
+        print(f"{key}: 新增{summary['new']}个，变化{summary['changed']}个，未变化{summary['unchanged']}个，下榜{len(summary['dropped'])}个")
+    
+    # 记录本次抓取的指标，统计近期增长最快的项目
+    top_growth = {}
+    try:
+        history = get_history_store()
+        history.record([project for projects in crawled.values() for project in projects])
+        for metric in ("stars", "likes", "downloads"):
+            top_growth[metric] = history.top_growth(metric=metric)
+    except Exception as e:
+        print(f"记录项目历史时出错: {e}")
+    
+    # 合并量化版本、镜像等近似重复的项目，每组只分析一个代表项目
+    if config.DEDUP_ENABLED:
+        try:
+            crawled, collapsed = Deduplicator().collapse_sources(crawled)
+            if collapsed:
+                print(f"合并了{collapsed}个近似重复的项目")
+        except Exception as e:
+            print(f"合并近似重复项目时出错: {e}")
+    
+    # 与往期分析过的项目比较，并把本次报告中主题相近的项目分组
+    topics = []
+    if config.TOPIC_INDEX_ENABLED:
+        try:
+            topic_index = get_topic_index()
+            unique_projects = list({project.get("url") or project.get("name", ""): project
+                                    for projects in crawled.values() for project in projects}.values())
+            covered = topic_index.annotate(unique_projects)
+            topics = topic_index.group(unique_projects)
+            print(f"共{len(unique_projects)}个项目，{covered}个与往期项目主题相似，分为{len(topics)}个多项目主题")
+        except Exception as e:
+            print(f"查询主题索引时出错: {e}")
+    return crawled, crawl_deltas, top_growth, topics
+
+def create_report(resume=None):
+    """
+    生成并发送一份报告
+
+    resume: 中断的运行编号，跳过该运行已完成的阶段、项目和已发送的邮件
+    """
     print(f"开始生成AI项目报告 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    metrics = get_metrics()
+    metrics.reset()
     
     # 创建缓存目录
     if not os.path.exists(config.CACHE_DIR):
         os.makedirs(config.CACHE_DIR)
     
+    # 每个阶段和每个项目完成后写入运行记录，中断后可以继续
+    try:
+        journal = RunJournal(resume)
+    except Exception as e:
+        print(f"读取运行记录时出错: {e}")
+        return
+    if journal.completed:
+        print(f"运行{journal.run_id}已经完成，报告: {journal.report_file}")
+        return
+    if journal.resumed:
+        print(f"继续运行{journal.run_id}，已完成的阶段: {', '.join(journal.stages) or '无'}")
+    else:
+        print(f"运行编号: {journal.run_id}，中断后可以用 python main.py --resume {journal.run_id} 继续")
+    
     # 初始化各个组件
-    github_crawler = GitHubCrawler()
-    huggingface_crawler = HuggingFaceCrawler()
     deepseek_analyzer = DeepSeekAnalyzer()
     email_sender = EmailSender()
     
-    print("正在获取GitHub热门项目...")
-    github_trending_projects = github_crawler.get_trending_projects()
+    crawl_stage = journal.stage("crawl")
+    if crawl_stage is None:
+        print("正在并发获取GitHub和Hugging Face项目...")
+        with metrics.span("stage", stage="crawl"):
+            crawled, crawl_timings = crawl_sources()
+        journal.checkpoint("crawl", crawled=crawled, timings=crawl_timings)
+    else:
+        crawled, crawl_timings = crawl_stage["crawled"], crawl_stage["timings"]
     
-    print("正在获取GitHub最新项目...")
-    github_newest_projects = github_crawler.get_newest_projects()
+    # 变化标注和指标历史只能执行一次，完成后立即记录
+    prepare_stage = journal.stage("prepare")
+    if prepare_stage is None:
+        crawled, crawl_deltas, top_growth, topics = prepare_projects(crawled)
+        journal.checkpoint("prepare", crawled=crawled, crawl_delta=crawl_deltas, top_growth=top_growth, topics=topics)
+    else:
+        crawled, crawl_deltas = prepare_stage["crawled"], prepare_stage["crawl_delta"]
+        top_growth, topics = prepare_stage["top_growth"], prepare_stage["topics"]
     
-    print("正在获取Hugging Face热门项目...")
-    huggingface_trending_projects = huggingface_crawler.get_trending_projects()
+    # 分析项目，每完成一个就写入报告文件和运行记录
+    print("正在使用DeepSeek API分析项目...")
+    report = ReportBuilder(crawled, report_time=journal.run_id)
+    print(f"报告将增量写入: {report.report_file}")
+    completed = journal.completed_analyses()
+    if completed:
+        print(f"运行记录中已有{len(completed)}个项目的分析结果")
     
-    print("正在获取Hugging Face最新项目...")
-    huggingface_newest_projects = huggingface_crawler.get_newest_projects()
+    def on_result(key, index, analysis):
+        report.add(key, index, analysis)
+        journal.record_analysis(key, index, analysis)
     
-    # 分析项目
-    print("正在使用DeepSeek API分析项目...")
+    analysis_engine = AnalysisEngine(deepseek_analyzer, enricher=Enricher() if config.ENRICH_ENABLED else None)
+    with metrics.span("stage", stage="analysis"):
+        analyses = analysis_engine.analyze_sources([
+            ("github_trending", "GitHub热门", crawled["github_trending"]),
+            ("github_newest", "GitHub最新", crawled["github_newest"]),
+            ("huggingface_trending", "Hugging Face热门", crawled["huggingface_trending"]),
+            ("huggingface_newest", "Hugging Face最新", crawled["huggingface_newest"]),
+        ], on_result=on_result, completed=completed)
+    github_trending_analyses = analyses["github_trending"]
+    github_newest_analyses = analyses["github_newest"]
+    huggingface_trending_analyses = analyses["huggingface_trending"]
+    huggingface_newest_analyses = analyses["huggingface_newest"]
     
-    # 定义一个辅助函数来处理项目分析，增加错误处理
-    def analyze_projects(projects, source_name):
-        analyses = []
-        if not projects:
-            print(f"警告：{source_name}项目列表为空，跳过分析")
-            return analyses
-            
-        for project in projects:
-            try:
-                name = project.get('name', '未知项目')
-                print(f"分析{source_name}项目: {name}")
-                analysis = deepseek_analyzer.analyze_project(project)
-                analyses.append(analysis)
-            except Exception as e:
-                print(f"分析{source_name}项目 {project.get('name', '未知项目')} 时出错: {e}")
-                # 添加一个错误分析记录，避免跳过
-                analyses.append({
-                    "project": project,
-                    "analysis": f"分析过程中出错: {str(e)}",
-                    "timestamp": datetime.now().isoformat()
-                })
-        return analyses
-    
-    # 分析各平台项目
-    github_trending_analyses = analyze_projects(github_trending_projects, "GitHub热门")
-    github_newest_analyses = analyze_projects(github_newest_projects, "GitHub最新")
-    huggingface_trending_analyses = analyze_projects(huggingface_trending_projects, "Hugging Face热门")
-    huggingface_newest_analyses = analyze_projects(huggingface_newest_projects, "Hugging Face最新")
-    
-    # 发送邮件报告
+    # 把本次分析的项目加入主题索引
+    if config.TOPIC_INDEX_ENABLED:
+        try:
+            get_topic_index().add([analysis for items in analyses.values() for analysis in items])
+        except Exception as e:
+            print(f"更新主题索引时出错: {e}")
+    
+    # 发送邮件报告，已收到本次报告的收件人不再发送
     print("正在发送邮件报告...")
-    email_sent = email_sender.send_project_report(
-        github_trending_analyses,
-        github_newest_analyses,
-        huggingface_trending_analyses,
-        huggingface_newest_analyses
-    )
-    
-    if email_sent:
-        print("邮件报告已成功发送！")
+    if journal.unconfirmed_recipients:
+        print(f"上次在发送邮件时中断，无法确定以下收件人是否已收到报告，不再重复发送: {', '.join(sorted(journal.unconfirmed_recipients))}")
+    recipients = journal.pending_recipients(email_sender.recipients)
+    if not recipients:
+        print("没有需要发送的收件人（运行记录显示已发送或发送时中断），不再发送邮件")
     else:
-        print("发送邮件报告失败，请检查日志。")
+        email_sender.recipients = recipients
+        journal.email_started(recipients)
+        with metrics.span("stage", stage="email"):
+            email_sent = email_sender.send_project_report(
+                github_trending_analyses,
+                github_newest_analyses,
+                huggingface_trending_analyses,
+                huggingface_newest_analyses
+            )
+        journal.email_finished(email_sender.last_sent)
+        
+        if email_sent:
+            print("邮件报告已成功发送！")
+        else:
+            print("发送邮件报告失败，请检查日志。")
     
     # 保存本次报告到文件
-    report_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-    report_file = os.path.join(config.CACHE_DIR, f"report_{report_time}.json")
-    
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "github_trending": github_trending_analyses,
-            "github_newest": github_newest_analyses,
-            "huggingface_trending": huggingface_trending_analyses,
-            "huggingface_newest": huggingface_newest_analyses,
-            "timestamp": datetime.now().isoformat()
-        }, f, ensure_ascii=False, indent=2)
+    report_file = report.finalize(crawl_timings=crawl_timings, crawl_delta=crawl_deltas, top_growth=top_growth, topics=topics,
+                                  run_id=journal.run_id)
     
     print(f"报告已保存到: {report_file}")
+    
+    # 保存本次运行的耗时、请求和token统计
+    try:
+        print(f"运行指标已保存到: {metrics.save(report_file)}")
+    except Exception as e:
+        print(f"保存运行指标时出错: {e}")
+    
+    # 有收件人未收到邮件时保留未完成状态，可以继续运行重新发送
+    if not journal.pending_recipients(email_sender.recipients):
+        journal.complete(report_file)
+    else:
+        print(f"部分收件人未收到邮件，可以用 python main.py --resume {journal.run_id} 重新发送")
+    
+    # 清理过期缓存和旧报告
+    get_cache_store().evict()
+    prune_report_files()
     print(f"AI项目报告生成完成 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 def schedule_report(hour=9, minute=0):
@@ -116,16 +231,46 @@ if __name__ == "__main__":
     parser.add_argument("--schedule", action="store_true", help="设置定时任务")
     parser.add_argument("--hour", type=int, default=9, help="定时任务小时（0-23）")
     parser.add_argument("--minute", type=int, default=0, help="定时任务分钟（0-59）")
+    parser.add_argument("--async", dest="async_mode", action="store_true", help="使用异步流水线生成config.REPORT_CONFIGS中的所有报告")
+    parser.add_argument("--profile", action="store_true", help="生成一次报告并用cProfile记录性能数据")
+    parser.add_argument("--resume", metavar="RUN_ID", help="继续运行编号为RUN_ID的中断的报告，跳过已完成的阶段、项目和已发送的邮件")
     
     args = parser.parse_args()
     
-    if args.now:
-        create_report()
-    
-    if args.schedule:
-        schedule_report(args.hour, args.minute)
-        run_scheduler()
-    
-    # 如果没有指定任何参数，则立即生成一次报告
-    if not (args.now or args.schedule):
-        create_report()
+    if args.resume:
+        create_report(resume=args.resume)
+    elif args.profile:
+        import cProfile
+        import pstats
+        
+        # cProfile只记录主线程，抓取和分析线程的耗时见运行指标中的span
+        profile_file = os.path.join(config.CACHE_DIR, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        profiler = cProfile.Profile()
+        if args.async_mode:
+            import asyncio
+            from async_pipeline import run_reports_async
+            profiler.runcall(asyncio.run, run_reports_async())
+        else:
+            profiler.runcall(create_report)
+        profiler.dump_stats(profile_file)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+        print(f"性能数据已保存到: {profile_file}，可用 python -m pstats 或 snakeviz 查看")
+    elif args.async_mode:
+        import asyncio
+        from async_pipeline import run_reports_async, run_async_scheduler
+        
+        if args.now or not args.schedule:
+            asyncio.run(run_reports_async())
+        if args.schedule:
+            asyncio.run(run_async_scheduler(args.hour, args.minute))
+    else:
+        if args.now:
+            create_report()
+        
+        if args.schedule:
+            schedule_report(args.hour, args.minute)
+            run_scheduler()
+        
+        # 如果没有指定任何参数，则立即生成一次报告
+        if not (args.now or args.schedule):
+            create_report()
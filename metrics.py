@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import config
+
+# 耗时直方图的默认分桶上限（秒）
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# 导出为Prometheus格式时的指标名前缀
+METRIC_PREFIX = "pip_news_"
+
+class Metrics:
+    """
+    报告流水线的运行指标
+
+    记录计数器、直方图和带耗时的区间(span)，可以导出为Prometheus文本格式，
+    或作为JSON运行摘要保存在报告文件旁边。所有方法都可以在多个线程中同时调用。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """开始新的一次运行"""
+        with self._lock:
+            self.started_at = time.time()
+            # {(名称, ((标签, 值), ...)): 数值}
+            self.counters = {}
+            # {(名称, 标签): {"buckets": [...], "counts": [...], "sum": 总和, "count": 次数, "max": 最大值}}
+            self.histograms = {}
+            self.spans = []
+
+    def _key(self, name, labels):
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        """计数器加value"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        """在直方图中记录一个观测值"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    "buckets": list(buckets), "counts": [0] * len(buckets), "sum": 0, "count": 0, "max": 0
+                }
+            for i, bound in enumerate(histogram["buckets"]):
+                if value <= bound:
+                    histogram["counts"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+            histogram["max"] = max(histogram["max"], value)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        记录一段操作的耗时
+
+        耗时写入"<name>_seconds"直方图，区间本身保存在运行摘要中；
+        出错时状态为error。yield的字典可以补充属性，例如token数。
+        """
+        attributes = {}
+        status = "ok"
+        start_time = time.time()
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe(f"{name}_seconds", seconds, **labels)
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "labels": {label: str(value) for label, value in labels.items()},
+                    "start": round(start_time - self.started_at, 3),
+                    "seconds": round(seconds, 3),
+                    "status": status,
+                    **attributes
+                })
+
+    def to_prometheus(self):
+        """导出为Prometheus文本格式"""
+        def format_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{label}="{_escape_label(value)}"' for label, value in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+
+        declared = set()
+        for (name, labels), value in counters:
+            metric = METRIC_PREFIX + name
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{format_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            metric = METRIC_PREFIX + name
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared.add(metric)
+            for bound, count in zip(histogram["buckets"], histogram["counts"]):
+                lines.append(f"{metric}_bucket{format_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{metric}_bucket{format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+            lines.append(f"{metric}_sum{format_labels(labels)} {round(histogram['sum'], 6)}")
+            lines.append(f"{metric}_count{format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """JSON运行摘要"""
+        def format_key(name, labels):
+            return name + "".join(f"[{label}={value}]" for label, value in labels)
+
+        with self._lock:
+            return {
+                "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+                "duration": round(time.time() - self.started_at, 3),
+                "counters": {format_key(*key): value for key, value in sorted(self.counters.items())},
+                "histograms": {
+                    format_key(*key): {
+                        "count": histogram["count"],
+                        "sum": round(histogram["sum"], 3),
+                        "avg": round(histogram["sum"] / histogram["count"], 3) if histogram["count"] else 0,
+                        "max": round(histogram["max"], 3),
+                    }
+                    for key, histogram in sorted(self.histograms.items())
+                },
+                "spans": list(self.spans),
+            }
+
+    def save(self, report_file=None):
+        """
+        保存运行摘要和Prometheus指标
+
+        文件名与报告文件对应，例如report_20240101_090000.json对应
+        metrics_20240101_090000.json和metrics_20240101_090000.prom
+        返回: JSON摘要文件路径
+        """
+        if report_file:
+            directory, filename = os.path.split(report_file)
+            stem = "metrics_" + os.path.splitext(filename)[0][len("report_"):]
+        else:
+            directory = config.CACHE_DIR
+            stem = "metrics_" + datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        summary_file = os.path.join(directory, stem + ".json")
+        _write_atomic(summary_file, json.dumps(self.summary(), ensure_ascii=False, indent=2))
+        _write_atomic(os.path.join(directory, stem + ".prom"), self.to_prometheus())
+        return summary_file
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+_metrics = Metrics()
+
+def get_metrics():
+    """获取进程内共享的运行指标"""
+    return _metrics
@@ -0,0 +1,238 @@
+import math
+import re
+import threading
+from datetime import date
+import config
+from cache_store import get_cache_store
+from metrics import get_metrics
+
+# 中日韩字符，按DeepSeek的经验值每个约0.6个token，其他非空白字符每个约0.3个token
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+_SPACE_RE = re.compile(r"\s")
+CJK_TOKEN_WEIGHT = 0.6
+OTHER_TOKEN_WEIGHT = 0.3
+
+# 不提供有效信息的标签
+GENERIC_TAG_PREFIXES = ("license:", "region:", "endpoints_compatible", "autotrain_compatible", "deploy:",
+                        "text-generation-inference", "safetensors")
+# 标签优先级，越靠前越先保留，其余标签排在最后
+TAG_PRIORITY_PREFIXES = ("base_model:", "arxiv:", "dataset:")
+
+def count_tokens(text):
+    """用本地规则估算文本的token数，不依赖分词器"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    other = len(text) - cjk - len(_SPACE_RE.findall(text))
+    return math.ceil(cjk * CJK_TOKEN_WEIGHT + other * OTHER_TOKEN_WEIGHT)
+
+def trim_to_tokens(text, max_tokens, suffix="…"):
+    """截断文本使其不超过max_tokens个token"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - count_tokens(suffix)
+    used = 0.0
+    for i, char in enumerate(text):
+        if char.isspace():
+            continue
+        used += CJK_TOKEN_WEIGHT if _CJK_RE.match(char) else OTHER_TOKEN_WEIGHT
+        if used > budget:
+            return text[:i].rstrip() + suffix
+    return text
+
+def prioritize_tags(tags, max_tags=None):
+    """去掉无信息量的标签，按优先级排序并限制数量"""
+    max_tags = config.PROMPT_MAX_TAGS if max_tags is None else max_tags
+
+    def priority(tag):
+        for i, prefix in enumerate(TAG_PRIORITY_PREFIXES):
+            if tag.startswith(prefix):
+                return i
+        return len(TAG_PRIORITY_PREFIXES)
+
+    useful = [str(tag) for tag in dict.fromkeys(tags or []) if not str(tag).startswith(GENERIC_TAG_PREFIXES)]
+    return sorted(useful, key=priority)[:max_tags]
+
+class PromptBuilder:
+    """
+    按token预算生成项目信息文本
+
+    字段按重要性依次加入，描述和README摘要按剩余预算截断，标签先去掉无信息量的再按优先级逐个加入直到预算用完。
+    输出token数按项目排名所在的档位分配。
+    """
+
+    def __init__(self, input_tokens=None, output_tiers=None, summary_tokens=None):
+        self.input_tokens = input_tokens or config.PROMPT_INPUT_TOKENS
+        self.output_tiers = output_tiers or config.PROMPT_OUTPUT_TIERS
+        self.summary_tokens = summary_tokens or config.PROMPT_SUMMARY_MAX_TOKENS
+
+    def describe(self, project, budget=None):
+        """生成不超过budget个token的项目信息文本"""
+        budget = budget or self.input_tokens
+        lines = [
+            f"项目名称：{project.get('name', '未知项目')}",
+            f"项目链接：{project.get('url', '')}",
+        ]
+        extra = []
+        for label, field in (("编程语言", "language"), ("星标数量", "stars"), ("近期新增星标", "stars_recent"),
+                             ("点赞数量", "likes"), ("下载数量", "downloads"), ("最新版本", "latest_release")):
+            value = project.get(field)
+            if value:
+                extra.append(f"{label}：{value}")
+
+        # 描述优先于标签，至少为标签保留少量预算
+        used = count_tokens("\n".join(lines + extra))
+        tags = prioritize_tags(project.get("tags"))
+        tag_reserve = min(count_tokens("标签：" + ", ".join(tags)), budget // 5) if tags else 0
+        description = project.get("description") or "无描述"
+        description = trim_to_tokens(description, max(budget - used - tag_reserve, 20))
+        lines.append(f"项目描述：{description}")
+        lines.extend(extra)
+        used = count_tokens("\n".join(lines))
+
+        # README摘要排在描述之后，使用剩余预算并受单独的上限限制
+        readme = project.get("readme_summary")
+        readme_budget = min(config.ENRICH_PROMPT_TOKENS, budget - used - tag_reserve - 5)
+        if readme and readme_budget >= 20:
+            lines.append(f"README摘要：{trim_to_tokens(readme, readme_budget)}")
+            used = count_tokens("\n".join(lines))
+
+        kept_tags = []
+        for tag in tags:
+            cost = count_tokens(tag) + 1
+            if used + cost + 2 > budget:
+                break
+            kept_tags.append(tag)
+            used += cost
+        if kept_tags:
+            lines.append(f"标签：{', '.join(kept_tags)}")
+
+        return "\n".join(lines) + "\n"
+
+    def output_budget(self, project, mode="full"):
+        """按项目排名所在档位分配max_tokens，摘要模式使用较小的固定值"""
+        if mode == "summary":
+            return self.summary_tokens
+        rank = project.get("rank") or math.inf
+        for max_rank, max_tokens in self.output_tiers:
+            if max_rank is None or rank <= max_rank:
+                return max_tokens
+        return self.output_tiers[-1][1]
+
+class BudgetExceededError(Exception):
+    """请求可能用到的token会超出每日上限"""
+
+class TokenLedger:
+    """
+    每日token用量和费用统计
+
+    用量保存在缓存数据库中，多次运行累计。接近上限时排名靠后的项目改为生成简短摘要，达到上限后不再调用API。
+    并发请求在发送前先在锁内按提示长度和最大输出token数预留额度，收到响应后换成实际用量，
+    多个线程同时检查上限时不会一起超出。
+    """
+
+    def __init__(self):
+        self.cache = get_cache_store()
+        self.token_ceiling = config.DAILY_TOKEN_CEILING
+        self.cost_ceiling = config.DAILY_COST_CEILING
+        self.downgrade_ratio = config.BUDGET_DOWNGRADE_RATIO
+        # 始终完整分析的排名范围，即第一档
+        self.protected_rank = config.PROMPT_OUTPUT_TIERS[0][0] or math.inf
+        self._lock = threading.Lock()
+        self._day = None
+        self._usage = None
+        # 已发送但尚未收到响应的请求预留的额度
+        self._reserved_tokens = 0
+        self._reserved_cost = 0.0
+
+    def _load(self):
+        """读取当天的用量，日期变化后重新开始统计"""
+        today = date.today().isoformat()
+        if self._day != today:
+            self._day = today
+            self._usage = self.cache.get("token_budget", today) or {"prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0}
+        return self._usage
+
+    def usage(self):
+        with self._lock:
+            return dict(self._load())
+
+    def cost(self, prompt_tokens, completion_tokens):
+        """按每百万token的单价计算费用"""
+        return (prompt_tokens * config.DEEPSEEK_INPUT_PRICE + completion_tokens * config.DEEPSEEK_OUTPUT_PRICE) / 1_000_000
+
+    def _fraction(self, extra_tokens=0, extra_cost=0.0):
+        """已用和已预留的额度（再加上extra）占上限的比例，取token和费用中较高的一个，调用时需持有锁"""
+        usage = self._load()
+        fractions = [0.0]
+        if self.token_ceiling:
+            tokens = usage["prompt_tokens"] + usage["completion_tokens"] + self._reserved_tokens + extra_tokens
+            fractions.append(tokens / self.token_ceiling)
+        if self.cost_ceiling:
+            fractions.append((usage["cost"] + self._reserved_cost + extra_cost) / self.cost_ceiling)
+        return max(fractions)
+
+    def fraction_used(self):
+        """已用额度占上限的比例，包括进行中的请求预留的额度"""
+        with self._lock:
+            return self._fraction()
+
+    def mode_for(self, project):
+        """
+        决定项目的分析方式
+
+        返回: "full"完整分析，"summary"简短摘要，"skip"不调用API
+        """
+        fraction = self.fraction_used()
+        if fraction >= 1:
+            return "skip"
+        if fraction >= self.downgrade_ratio and (project.get("rank") or math.inf) > self.protected_rank:
+            return "summary"
+        return "full"
+
+    def reserve(self, prompt_tokens, max_completion_tokens):
+        """
+        发送请求前预留额度，检查上限和预留在同一次加锁中完成
+
+        超出上限时抛出BudgetExceededError
+        返回: 预留的(输入token数, 输出token数)，请求结束后传给record或release
+        """
+        cost = self.cost(prompt_tokens, max_completion_tokens)
+        with self._lock:
+            if self._fraction(prompt_tokens + max_completion_tokens, cost) > 1:
+                raise BudgetExceededError("已达到今日token或费用上限，跳过分析")
+            self._reserved_tokens += prompt_tokens + max_completion_tokens
+            self._reserved_cost += cost
+        return (prompt_tokens, max_completion_tokens)
+
+    def _release(self, reservation):
+        if reservation:
+            self._reserved_tokens -= sum(reservation)
+            self._reserved_cost -= self.cost(*reservation)
+
+    def release(self, reservation):
+        """请求失败时释放预留的额度"""
+        with self._lock:
+            self._release(reservation)
+
+    def record(self, prompt_tokens, completion_tokens, reservation=None):
+        """累计一次请求的用量并保存，同时释放请求前预留的额度"""
+        with self._lock:
+            self._release(reservation)
+            usage = self._load()
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+            usage["cost"] = round(usage["cost"] + self.cost(prompt_tokens, completion_tokens), 6)
+            self.cache.put("token_budget", self._day, usage)
+        get_metrics().inc("deepseek_cost_total", self.cost(prompt_tokens, completion_tokens))
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+def get_token_ledger():
+    """获取进程内共享的token用量统计"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = TokenLedger()
+        return _ledger
@@ -0,0 +1,106 @@
+import re
+import numpy as np
+import config
+
+def project_owner(project):
+    """项目的作者（组织或用户名），没有作者字段时取名称中"/"前的部分"""
+    name = project.get("name") or ""
+    return project.get("author") or (name.split("/")[0] if "/" in name else "")
+
+class OrgMatcher:
+    """
+    知名组织匹配器
+
+    把所有组织名编译成一个正则表达式，把所有项目的作者拼接成一个字符串后只扫描一遍，
+    代替对每个项目、每个组织逐个检查。组织名必须是完整的词，"meta-llama"匹配"meta"，
+    "metadata"和"commit"不匹配"meta"和"mit"。
+    """
+
+    def __init__(self, organizations):
+        names = sorted({org.lower() for org in organizations}, key=len, reverse=True)
+        # 不使用IGNORECASE，预先转为小写，正则引擎可以按首字符快速跳过
+        self.pattern = re.compile(r"\b(?:" + "|".join(re.escape(name) for name in names) + r")\b")
+
+    def match(self, owner):
+        return self.pattern.search(owner.lower()) is not None
+
+    def match_many(self, projects):
+        """返回每个项目的作者是否为知名组织的布尔数组"""
+        texts = [project_owner(project).lower() for project in projects]
+        result = np.zeros(len(texts), dtype=bool)
+        if not texts:
+            return result
+
+        # 各项目文本在拼接字符串中的起始位置，分隔符保证匹配不会跨越两个项目
+        lengths = np.fromiter((len(text) + 1 for text in texts), dtype=np.int64, count=len(texts))
+        starts = np.cumsum(lengths) - lengths
+        positions = np.fromiter((match.start() for match in self.pattern.finditer("\0".join(texts))), dtype=np.int64)
+        result[np.searchsorted(starts, positions, side="right") - 1] = True
+        return result
+
+_matchers = {}
+
+def get_org_matcher(organizations=None):
+    """获取（并缓存）组织匹配器"""
+    organizations = tuple(organizations or config.MAJOR_ORGANIZATIONS)
+    matcher = _matchers.get(organizations)
+    if matcher is None:
+        matcher = _matchers[organizations] = OrgMatcher(organizations)
+    return matcher
+
+def _column(projects, field):
+    """把项目的数值字段提取为数组，无法解析的值按0处理"""
+    def value(project):
+        try:
+            return float(project.get(field) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+    return np.fromiter((value(project) for project in projects), dtype=np.float64, count=len(projects))
+
+def score_projects(projects, platform, formula=None):
+    """
+    按评分公式批量计算项目评分
+
+    formula: {"major_org_bonus": 加分, "terms": [(字段, 权重, 上限), ...]}
+    每一项的得分为 min(floor(字段值 * 权重), 上限)，默认使用config.RANKING_FORMULAS中对应平台的公式
+    返回: (评分数组, 是否知名组织数组)
+    """
+    formula = formula or config.RANKING_FORMULAS[platform]
+    is_major_org = get_org_matcher().match_many(projects)
+    scores = is_major_org * float(formula.get("major_org_bonus", 0))
+
+    for field, weight, cap in formula.get("terms", []):
+        term = np.floor(_column(projects, field) * weight)
+        if cap is not None:
+            term = np.minimum(term, cap)
+        scores = scores + term
+
+    return scores, is_major_org
+
+def top_k_indices(scores, k):
+    """选出评分最高的k个下标，评分相同时保持原有顺序"""
+    n = len(scores)
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    # 用部分排序找到第k高的评分，高于它的全部入选，等于它的按原有顺序补足k个
+    threshold = np.partition(scores, n - k)[n - k]
+    higher = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:k - len(higher)]
+    candidates = np.concatenate((higher, ties))
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+def rank_projects(projects, platform, k, formula=None):
+    """给项目打分并返回评分最高的k个，项目会被写入score和is_major_org字段"""
+    if not projects:
+        return []
+    scores, is_major_org = score_projects(projects, platform, formula)
+
+    ranked = []
+    for index in top_k_indices(scores, k):
+        project = projects[index]
+        project["score"] = int(scores[index])
+        project["is_major_org"] = bool(is_major_org[index])
+        ranked.append(project)
+    return ranked
@@ -0,0 +1,465 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import numpy as np
+import config
+
+# 内置的训练样本: (文本, 是否与AI相关)，修改后模型会自动重新训练
+SEED_EXAMPLES = [
+    ("Large language model inference engine with paged attention and continuous batching", 1),
+    ("Fine-tune LLaMA, Mistral and Qwen models with LoRA and QLoRA on a single GPU", 1),
+    ("Open-source ChatGPT alternative that runs locally", 1),
+    ("Autonomous AI agents framework with tool calling and memory", 1),
+    ("Retrieval augmented generation (RAG) pipeline with vector database and embeddings", 1),
+    ("Stable Diffusion web UI for text-to-image generation", 1),
+    ("State-of-the-art speech recognition and text-to-speech models", 1),
+    ("Object detection and image segmentation with YOLO", 1),
+    ("Deep learning framework with automatic differentiation and GPU acceleration", 1),
+    ("Transformers library for natural language processing", 1),
+    ("Prompt engineering guide and prompt templates for GPT-4", 1),
+    ("Multimodal vision-language model for visual question answering", 1),
+    ("Reinforcement learning from human feedback (RLHF) training toolkit", 1),
+    ("Quantized GGUF weights for llama.cpp", 1),
+    ("Machine learning experiment tracking and model registry", 1),
+    ("Neural network training recipes and pretrained checkpoints", 1),
+    ("OpenAI compatible API server for local LLMs", 1),
+    ("Code generation model and AI coding assistant", 1),
+    ("Embedding model for semantic search and reranking", 1),
+    ("Benchmark and evaluation harness for language models", 1),
+    ("Video generation diffusion transformer", 1),
+    ("Distributed training of large models with tensor and pipeline parallelism", 1),
+    ("AI workflow builder for LLM apps with agents and knowledge base", 1),
+    ("Instruction tuning dataset for chat models", 1),
+    ("Voice cloning and singing voice conversion", 1),
+    ("Computer vision library for face recognition", 1),
+    ("Mixture of experts model with long context", 1),
+    ("CUDA kernels for flash attention", 1),
+    ("大模型推理加速框架，支持量化和多卡部署", 1),
+    ("基于大语言模型的智能体开发平台", 1),
+    ("中文语音识别和语音合成模型", 1),
+    ("人工智能知识库问答系统，支持RAG检索增强", 1),
+    ("text-generation transformers llama safetensors", 1),
+    ("text-to-image diffusers lora", 1),
+    ("automatic-speech-recognition whisper audio", 1),
+    ("sentence-similarity feature-extraction embeddings", 1),
+    ("image-classification vision timm", 1),
+    ("Model Context Protocol server that lets AI assistants use your tools", 1),
+    ("Chatbot UI supporting Claude, Gemini and local models", 1),
+    ("Reasoning model distilled from DeepSeek-R1", 1),
+    ("Minimal autograd engine and neural net library for learning", 1),
+    ("Audio transcription and subtitles with Whisper", 1),
+    ("Train GPT from scratch on your own data", 1),
+    ("Fast BPE tokenizer for language model training", 1),
+    ("Self-hosted AI assistant web app with local LLM backend", 1),
+    ("Open source alternative to Copilot powered by code LLMs", 1),
+    ("Generative AI examples and notebooks with PyTorch", 1),
+    ("Text classification and sentiment analysis with BERT", 1),
+    ("Recommendation system with deep neural networks", 1),
+    ("Time series forecasting with machine learning models", 1),
+    ("OCR and document understanding with vision transformers", 1),
+    ("Robot learning and imitation learning policies", 1),
+    ("Graph neural networks library", 1),
+    ("AutoML hyperparameter optimization", 1),
+    ("Serving and deploying ML models on Kubernetes with GPU autoscaling", 1),
+    ("Vector search engine for AI applications", 1),
+    ("Synthetic data generation with LLMs", 1),
+    ("AI image upscaling and restoration", 1),
+    ("Browser automation agent driven by multimodal models", 1),
+    ("On-device inference for mobile with ONNX and TensorRT", 1),
+    ("Jupyter notebooks for a deep learning course", 1),
+    ("多模态大模型，支持图像理解和视频生成", 1),
+    ("开源的AI编程助手", 1),
+    ("深度学习模型训练与微调工具", 1),
+    ("Fast LLM inference written in Rust", 1),
+    ("TypeScript SDK for building AI agents", 1),
+    ("Production-ready RAG framework for enterprise search", 1),
+    ("Lightweight agent framework written in Go", 1),
+    ("Fast vector database written in Rust for embeddings", 1),
+    ("Tiny language model trained from scratch", 1),
+    ("Super fast speech recognition in C++", 1),
+    ("Evaluation library for LLM applications in production", 1),
+    ("Fine-tuning library for open models", 1),
+    ("Open platform for building AI apps", 1),
+    ("Diffusion model UI for ComfyUI workflows", 1),
+    ("Multimodal chatbot toolkit", 1),
+    ("RAG pipeline for document question answering", 1),
+    ("TypeScript RAG framework for chatbots over your documents", 1),
+    ("Open coder model for code generation and completion", 1),
+
+    ("A modern web framework for building APIs with Python", 0),
+    ("React component library with accessible UI primitives", 0),
+    ("Fast JavaScript bundler and dev server", 0),
+    ("Relational database with MVCC and write-ahead logging", 0),
+    ("ORM for TypeScript with type-safe data model and migrations", 0),
+    ("Terminal emulator written in Rust with GPU rendering", 0),
+    ("Dotfiles and shell configuration for zsh", 0),
+    ("A curated list of awesome self-hosted software", 0),
+    ("Kubernetes operator for managing PostgreSQL clusters", 0),
+    ("Static site generator for documentation", 0),
+    ("Cross-platform mobile app framework", 0),
+    ("Markdown note-taking app with backlinks", 0),
+    ("Open source game engine for 2D and 3D games", 0),
+    ("Ethereum smart contract development toolkit", 0),
+    ("HTTP client library with retries and connection pooling", 0),
+    ("Linux kernel module for file system encryption", 0),
+    ("Password manager with end-to-end encryption", 0),
+    ("CSS utility framework for rapid UI development", 0),
+    ("Command line tool to manage git repositories", 0),
+    ("Video player for Android with subtitle support", 0),
+    ("Home automation platform for smart devices", 0),
+    ("Cloud infrastructure as code with Terraform modules", 0),
+    ("Interview preparation notes for algorithms and system design", 0),
+    ("Free programming books in many languages", 0),
+    ("Email client for desktop built with Electron", 0),
+    ("Logging library with structured output", 0),
+    ("Compiler for a statically typed programming language", 0),
+    ("Network proxy and VPN tool", 0),
+    ("Browser extension that blocks ads and trackers", 0),
+    ("Image viewer and photo organizer", 0),
+    ("Video downloader for YouTube and other sites", 0),
+    ("Monitoring dashboard with metrics and alerting", 0),
+    ("Message queue with at-least-once delivery", 0),
+    ("Windows utilities and system tweaks", 0),
+    ("前端组件库，基于Vue3", 0),
+    ("后端管理系统脚手架，支持权限管理", 0),
+    ("面试题和学习笔记合集", 0),
+    ("网络代理工具和订阅转换", 0),
+    ("Collection of icons in SVG format", 0),
+    ("Task runner and build system for monorepos", 0),
+    ("Open source alternative to Notion for notes and wikis", 0),
+    ("Self-hosted web app for bookmarks and read-later", 0),
+    ("Docker images and CI templates", 0),
+    ("Personal finance and budget tracker", 0),
+    ("Chess engine written in Rust", 0),
+    ("REST API boilerplate with authentication and admin panel", 0),
+    ("Photo gallery with albums and sharing", 0),
+    ("Fast JSON parser in C++", 0),
+    ("Open source alternative to Slack for team chat", 0),
+    ("Web analytics without cookies", 0),
+    ("Desktop app for managing screenshots", 0),
+    ("Library for parsing and formatting dates", 0),
+    ("Keyboard firmware for mechanical keyboards", 0),
+    ("Music streaming server", 0),
+    ("Operating system written from scratch for learning", 0),
+    ("Backup tool with deduplication and encryption", 0),
+    ("E-commerce platform with payments and inventory", 0),
+    ("Design system and Figma plugin", 0),
+    ("Emulator for retro game consoles", 0),
+    ("在线商城系统，支持支付和订单管理", 0),
+    ("开源的即时通讯软件", 0),
+    ("Linux桌面美化主题", 0),
+    ("Production-ready Node.js framework for microservices", 0),
+    ("Open platform for building e-commerce apps", 0),
+    ("Tiny HTTP server written in Go", 0),
+    ("Super fast package manager written in Rust", 0),
+    ("TypeScript SDK for a payments API", 0),
+    ("Toolkit for building command line apps", 0),
+    ("Evaluation of JavaScript expressions in a sandbox", 0),
+    ("Fast image compression library", 0),
+    ("Build your own X: recreate your favorite technologies from scratch", 0),
+    ("Build your own Git, Redis and SQLite from scratch", 0),
+    ("Curated list of awesome lists", 0),
+    ("Master programming by building your own database", 0),
+    ("Free programming books", 0),
+    ("A complete computer science study plan", 0),
+]
+
+# 只有主题标签的训练样本: (GitHub主题或Hugging Face任务类型, 是否与AI相关)
+SEED_TOPICS = [
+    (["machine-learning", "deep-learning"], 1),
+    (["llm", "large-language-models"], 1),
+    (["artificial-intelligence", "ai"], 1),
+    (["nlp", "natural-language-processing"], 1),
+    (["computer-vision", "image-generation"], 1),
+    (["rag", "embeddings", "vector-search"], 1),
+    (["agents", "ai-agents", "openai"], 1),
+    (["pytorch", "transformers"], 1),
+    (["text-generation"], 1),
+    (["text-to-image", "diffusers"], 1),
+    (["automatic-speech-recognition"], 1),
+    (["react", "frontend"], 0),
+    (["javascript", "typescript", "nodejs"], 0),
+    (["devops", "kubernetes", "docker"], 0),
+    (["database", "sql"], 0),
+    (["awesome", "awesome-list"], 0),
+    (["education", "interview", "programming"], 0),
+    (["game", "gamedev"], 0),
+    (["css", "tailwindcss"], 0),
+    (["cli", "terminal", "shell"], 0),
+]
+
+# 不参与训练、只用于校准阈值的样本，阈值取这些样本上准确率最高（相同时最低）的值
+HOLDOUT_EXAMPLES = [
+    ("Kanban board for project management", 0),
+    ("LLM-powered code review bot", 1),
+    ("SQL query builder for Go", 0),
+    ("Agentic browser automation with vision models", 1),
+    ("Habit tracker mobile app", 0),
+    ("Tiny neural network in C", 1),
+    ("Speech-to-text on device", 1),
+    ("GraphQL server framework", 0),
+    ("多智能体协作框架", 1),
+    ("博客系统", 0),
+    ("Minimal neural radiance fields", 1),
+    ("Open source alternative to Trello", 0),
+    ("Fine-tuning recipes for Llama 3", 1),
+    ("Static analysis for JavaScript", 0),
+    ("Diffusion model for music generation", 1),
+    ("A fast static site generator written in Rust", 0),
+    ("Web scraping framework for Python", 0),
+    ("Pixel art editor", 0),
+    ("Text-to-SQL with large language models", 1),
+    ("Self-hosted photo gallery", 0),
+    ("Mixture-of-experts language model", 1),
+    ("Video game emulator", 0),
+    ("Prompt engineering guide", 1),
+    ("Password manager for teams", 0),
+]
+
+# 文本哈希使用的参数，所有运算都是对2**64取模的整数运算
+_HASH_BASE = np.uint64(1099511628211)
+_HASH_BASE_INVERSE = np.uint64(pow(1099511628211, -1, 2 ** 64))
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+_BIGRAM_SALT = np.uint64(0x51ED270B27C5E3A7)
+_NAME_SPLIT_RE = re.compile(r"[-_./\s]+")
+_MARKER_RE = re.compile(r"[^a-z0-9]")
+
+def _marker(prefix, value):
+    """整个标签作为一个特征词，避免"machine-learning"这样的主题只被拆成普通词"""
+    return prefix + _MARKER_RE.sub("", str(value).lower())
+
+def project_text(project):
+    """
+    用于判断相关性的项目文本: 名称（去掉作者）、描述、语言、标签和README摘要
+
+    GitHub主题（tags）和Hugging Face任务类型（pipeline_tag）同时以带前缀的完整词加入，作为单独的特征
+    """
+    name = (project.get("name") or "").rsplit("/", 1)[-1]
+    tags = [str(tag) for tag in project.get("tags") or []]
+    markers = [_marker("topic", tag) for tag in tags]
+    if project.get("pipeline_tag"):
+        markers.append(_marker("pipeline", project["pipeline_tag"]))
+    parts = [
+        _NAME_SPLIT_RE.sub(" ", name),
+        project.get("description") or "",
+        project.get("language") or "",
+        " ".join(tags),
+        " ".join(markers),
+        project.get("readme_summary") or "",
+    ]
+    return " ".join(part for part in parts if part).replace("\0", " ")
+
+def _powers(base, count):
+    """base的0到count-1次幂"""
+    powers = np.full(count, base, dtype=np.uint64)
+    powers[0] = 1
+    return np.cumprod(powers)
+
+def hashed_ngrams(texts, dims):
+    """
+    批量提取文本的哈希特征，不在Python中逐词循环
+
+    英文按字母数字切分为词并加入相邻词对，中文按相邻两个字切分。所有文本拼接为一个UTF-8字节数组，
+    用多项式前缀哈希一次算出所有词的哈希值。
+    返回: (行号, 特征下标)，同一行内的特征已去重
+    """
+    data = np.frombuffer(("\0".join(texts).lower() + "\0").encode("utf-8"), dtype=np.uint8)
+    size = len(data)
+    rows_of_byte = np.cumsum(data == 0) - (data == 0)
+
+    # prefix[i]为前i个字节的哈希，任意区间[start, end)的哈希为(prefix[end] - prefix[start]) / base**start
+    prefix = np.zeros(size + 1, dtype=np.uint64)
+    np.cumsum(data.astype(np.uint64) * _powers(_HASH_BASE, size), out=prefix[1:])
+    inverse_powers = _powers(_HASH_BASE_INVERSE, size)
+
+    def span_hash(starts, ends):
+        return (prefix[ends] - prefix[starts]) * inverse_powers[starts]
+
+    # 英文词: 连续的[a-z0-9+#]
+    is_word = ((data >= 97) & (data <= 122)) | ((data >= 48) & (data <= 57)) | (data == 43) | (data == 35)
+    previous = np.concatenate(([False], is_word[:-1]))
+    following = np.concatenate((is_word[1:], [False]))
+    starts = np.flatnonzero(is_word & ~previous)
+    ends = np.flatnonzero(is_word & ~following) + 1
+    word_hashes = span_hash(starts, ends)
+    word_rows = rows_of_byte[starts]
+
+    # 相邻词对，不跨越文本
+    same_row = word_rows[1:] == word_rows[:-1]
+    bigram_hashes = (word_hashes[:-1] * _HASH_BASE + word_hashes[1:] + _BIGRAM_SALT)[same_row]
+    bigram_rows = word_rows[1:][same_row]
+
+    # 中文相邻两个字: UTF-8中U+3400到U+9FFF的首字节为0xE3到0xE9，每个字3个字节
+    chars = np.flatnonzero((data >= 0xE3) & (data <= 0xE9))
+    pairs = chars[:-1][(chars[1:] == chars[:-1] + 3) & (rows_of_byte[chars[1:]] == rows_of_byte[chars[:-1]])]
+    cjk_hashes = span_hash(pairs, pairs + 6)
+    cjk_rows = rows_of_byte[pairs]
+
+    hashes = np.concatenate((word_hashes, bigram_hashes, cjk_hashes))
+    rows = np.concatenate((word_rows, bigram_rows, cjk_rows)).astype(np.int64)
+    cols = ((hashes * _HASH_MIX) >> np.uint64(32)).astype(np.int64) % dims
+    # 排序后去掉相邻的重复项，比np.unique快
+    keys = np.sort(rows * dims + cols)
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys // dims, keys % dims
+
+class RelevanceClassifier:
+    """
+    判断项目是否与AI相关的本地分类器
+
+    特征是词、相邻词对和中文相邻两个字哈希到固定维数的稀疏向量，模型是L2正则的逻辑回归，
+    只用numpy在CPU上训练和预测。训练后在HOLDOUT_EXAMPLES上校准阈值，权重和阈值保存在缓存目录中，
+    内置样本或参数变化时自动重新训练。
+    """
+
+    def __init__(self, dims=None, threshold=None, model_path=None, examples=None, holdout=None):
+        self.dims = dims or config.RELEVANCE_DIMS
+        # 指定阈值时不再校准
+        self.fixed_threshold = config.RELEVANCE_THRESHOLD if threshold is None else threshold
+        self.threshold = self.fixed_threshold
+        self.model_path = model_path or os.path.join(config.CACHE_DIR, config.RELEVANCE_MODEL_NAME)
+        self.examples = examples or SEED_EXAMPLES + [tuple(example) for example in config.RELEVANCE_EXTRA_EXAMPLES]
+        self.topic_examples = SEED_TOPICS if examples is None else []
+        self.holdout = HOLDOUT_EXAMPLES if holdout is None else holdout
+        self.weights = None
+        self.bias = 0.0
+
+    def features(self, texts):
+        """
+        把多段文本转换为稀疏特征
+
+        返回: (行号, 列号, 值)，每行的值已做L2归一化
+        """
+        rows, cols = hashed_ngrams(texts, self.dims)
+        counts = np.bincount(rows, minlength=len(texts))
+        values = 1.0 / np.sqrt(np.maximum(counts, 1))[rows]
+        return rows, cols, values
+
+    def _margins(self, rows, cols, values, count):
+        return np.bincount(rows, weights=self.weights[cols] * values, minlength=count) + self.bias
+
+    def fit(self, texts, labels, iterations=3000, learning_rate=10.0, l2=1e-4):
+        """用全量梯度下降训练逻辑回归，只在样本中出现过的特征上计算"""
+        rows, cols, values = self.features(texts)
+        used, columns = np.unique(cols, return_inverse=True)
+        labels = np.asarray(labels, dtype=np.float64)
+        count = len(texts)
+        weights = np.zeros(len(used))
+        bias = 0.0
+        for _ in range(iterations):
+            margins = np.bincount(rows, weights=weights[columns] * values, minlength=count) + bias
+            errors = (1.0 / (1.0 + np.exp(-margins)) - labels) / count
+            gradient = np.bincount(columns, weights=errors[rows] * values, minlength=len(used))
+            weights -= learning_rate * (gradient + l2 * weights)
+            bias -= learning_rate * errors.sum()
+        self.weights = np.zeros(self.dims, dtype=np.float32)
+        self.weights[used] = weights
+        self.bias = bias
+        return self
+
+    def calibrate(self, examples):
+        """
+        在留出样本上选择阈值: 取准确率最高的分数分界点，准确率相同时取较低的值，尽量少去掉相关项目
+
+        返回: 阈值，没有留出样本时返回0.5
+        """
+        if not examples:
+            return 0.5
+        texts, labels = zip(*examples)
+        scores = self.score([{"description": text} for text in texts])
+        labels = np.asarray(labels)
+        order = np.sort(scores)
+        # 候选阈值为相邻分数的中点，以及所有样本之下的值
+        candidates = np.concatenate(([order[0] - 1e-6], (order[:-1] + order[1:]) / 2))
+        accuracy = [np.mean((scores >= threshold) == labels) for threshold in candidates]
+        return float(candidates[int(np.argmax(accuracy))])
+
+    def _training_projects(self):
+        projects = [{"description": text} for text, _ in self.examples]
+        projects += [{"tags": tags} for tags, _ in self.topic_examples]
+        labels = [label for _, label in self.examples] + [label for _, label in self.topic_examples]
+        return projects, labels
+
+    def _signature(self):
+        """训练样本和参数的摘要，用于判断保存的权重是否仍然有效"""
+        data = json.dumps({"examples": self.examples, "topics": self.topic_examples, "holdout": self.holdout,
+                           "dims": self.dims}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def load_or_train(self):
+        """读取保存的权重，不存在或已过期时重新训练并保存"""
+        signature = self._signature()
+        try:
+            with np.load(self.model_path) as data:
+                if str(data["signature"]) == signature:
+                    self.weights = data["weights"]
+                    self.bias = float(data["bias"])
+                    calibrated = float(data["threshold"])
+                    self.threshold = calibrated if self.fixed_threshold is None else self.fixed_threshold
+                    return self
+        except (OSError, KeyError, ValueError):
+            pass
+
+        projects, labels = self._training_projects()
+        self.fit([project_text(project) for project in projects], labels)
+        calibrated = self.calibrate(self.holdout)
+        self.threshold = calibrated if self.fixed_threshold is None else self.fixed_threshold
+        try:
+            os.makedirs(os.path.dirname(self.model_path) or ".", exist_ok=True)
+            tmp_path = self.model_path + ".tmp.npz"
+            np.savez(tmp_path, weights=self.weights, bias=self.bias, threshold=calibrated, signature=signature)
+            os.replace(tmp_path, self.model_path)
+        except Exception as e:
+            print(f"保存相关性模型时出错: {e}")
+        return self
+
+    def score(self, projects):
+        """批量计算项目与AI相关的概率"""
+        if self.weights is None:
+            self.load_or_train()
+        if not projects:
+            return np.zeros(0)
+        rows, cols, values = self.features([project_text(project) for project in projects])
+        return 1.0 / (1.0 + np.exp(-self._margins(rows, cols, values, len(projects))))
+
+    def filter(self, projects):
+        """
+        去掉与AI无关的项目，保留的项目写入relevance字段
+
+        返回: (保留的项目, 去掉的项目)
+        """
+        kept, dropped = [], []
+        for project, probability in zip(projects, self.score(projects)):
+            project["relevance"] = round(float(probability), 3)
+            (kept if probability >= self.threshold else dropped).append(project)
+        return kept, dropped
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_relevance_classifier():
+    """获取进程内共享的相关性分类器"""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = RelevanceClassifier().load_or_train()
+        return _classifier
+
+def keep_relevant(projects, source_name=""):
+    """
+    在排名前去掉与AI无关的候选项目
+
+    未启用或分类器出错时原样返回
+    """
+    if not config.RELEVANCE_ENABLED or not projects:
+        return projects
+    try:
+        kept, dropped = get_relevance_classifier().filter(projects)
+    except Exception as e:
+        print(f"判断项目相关性时出错: {e}")
+        return projects
+    if dropped:
+        print(f"{source_name}去掉了{len(dropped)}个与AI无关的项目")
+    return kept
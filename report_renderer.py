@@ -0,0 +1,256 @@
+import re
+from collections import namedtuple
+from datetime import datetime
+from html import escape
+from string import Template
+
+# 报告的一个板块: 来源键、标题、简介模板（${count}为项目数）、无数据时的提示、元信息字段
+# meta_fields: [(显示名称, 项目字段, 默认值), ...]，列表类型的字段会以逗号连接
+ReportSection = namedtuple("ReportSection", ["key", "title", "intro", "empty_text", "meta_fields"])
+
+GITHUB_META_FIELDS = [("语言", "language", "未知"), ("星标", "stars", "0")]
+HUGGINGFACE_META_FIELDS = [("标签", "tags", "无"), ("点赞", "likes", "0"), ("下载", "downloads", "0")]
+
+REPORT_SECTIONS = [
+    ReportSection("github_trending", "GitHub热门项目", Template("以下是GitHub平台上当前最受欢迎的${count}个项目："),
+                  "无法获取GitHub热门项目数据。", GITHUB_META_FIELDS),
+    ReportSection("github_newest", "GitHub最新项目", Template("以下是GitHub平台上最近更新的${count}个项目："),
+                  "无法获取GitHub最新项目数据。", GITHUB_META_FIELDS),
+    ReportSection("huggingface_trending", "Hugging Face热门项目", Template("以下是Hugging Face平台上当前最受欢迎的${count}个项目："),
+                  "无法获取Hugging Face热门项目数据。", HUGGINGFACE_META_FIELDS),
+    ReportSection("huggingface_newest", "Hugging Face最新项目", Template("以下是Hugging Face平台上最新发布的${count}个项目："),
+                  "无法获取Hugging Face最新项目数据。", HUGGINGFACE_META_FIELDS),
+]
+
+STYLE = """
+    body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+    .container { max-width: 800px; margin: 0 auto; padding: 20px; }
+    h1 { color: #2c3e50; text-align: center; margin-bottom: 30px; }
+    h2 { color: #3498db; margin-top: 30px; border-bottom: 1px solid #eee; padding-bottom: 10px; }
+    h3 { color: #2c3e50; margin-top: 20px; }
+    h4, h5, h6 { color: #2c3e50; margin: 12px 0 6px; }
+    .project { margin-bottom: 30px; padding: 15px; background-color: #f9f9f9; border-radius: 5px; }
+    .project h3 { margin-top: 0; }
+    .project-link { color: #3498db; text-decoration: none; }
+    .project-link:hover { text-decoration: underline; }
+    .project-meta { color: #7f8c8d; font-size: 0.9em; margin-bottom: 10px; }
+    .section-description { color: #666; margin-bottom: 20px; }
+    .timestamp { color: #999; text-align: center; margin-top: 30px; font-size: 0.8em; }
+    pre { background-color: #f0f0f0; padding: 10px; border-radius: 3px; overflow-x: auto; }
+"""
+
+# 模板在模块加载时编译一次，渲染时只做替换
+PAGE_HEADER = Template("""<html>
+<head>
+<style>$style</style>
+</head>
+<body>
+<div class="container">
+<h1>AI开源项目日报</h1>
+<p class="section-description">这份报告汇总了GitHub和Hugging Face平台上最热门和最新的AI开源项目，希望能帮助您了解AI领域的最新动态。</p>
+""").substitute(style=STYLE)
+
+PAGE_FOOTER = Template("""<p class="timestamp">报告生成时间: $time</p>
+</div>
+</body>
+</html>
+""")
+
+SECTION_HEADER = Template("""<h2>$title</h2>
+<p class="section-description">$intro</p>
+""")
+
+PROJECT_TEMPLATE = Template("""<div class="project">
+<h3><a href="$url" class="project-link" target="_blank">$name</a></h3>
+<p class="project-meta">$meta</p>
+<p><strong>描述:</strong> $description</p>
+$related<p><strong>AI解析:</strong></p>
+<div>$analysis</div>
+</div>
+""")
+
+# Markdown解析使用的正则表达式
+_FENCE_RE = re.compile(r"^\s*```")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+_UNORDERED_RE = re.compile(r"^\s*[-*+]\s+(.*)$")
+_ORDERED_RE = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_HR_RE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_CODE_RE = re.compile(r"`([^`]+)`")
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"(?<!\*)\*(?![\s*])(.+?)(?<![\s*])\*(?!\*)")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\((https?://[^\s)\"]+)\)")
+
+def render_inline(text):
+    """渲染行内Markdown：先转义HTML，再处理代码、粗体、斜体和链接"""
+    text = escape(text, quote=False)
+    # 行内代码中的内容不再做其他格式处理，先用占位符保护起来
+    codes = []
+
+    def keep_code(match):
+        codes.append(f"<code>{match.group(1)}</code>")
+        return f"\x00{len(codes) - 1}\x00"
+
+    text = _CODE_RE.sub(keep_code, text)
+    text = _BOLD_RE.sub(r"<strong>\1</strong>", text)
+    text = _ITALIC_RE.sub(r"<em>\1</em>", text)
+    text = _LINK_RE.sub(r'<a href="\2" target="_blank">\1</a>', text)
+    for i, code in enumerate(codes):
+        text = text.replace(f"\x00{i}\x00", code)
+    return text
+
+def render_markdown(text):
+    """把分析结果中的Markdown渲染为安全的HTML"""
+    parts = []
+    paragraph = []
+    list_tag = None
+    code_lines = None
+
+    def flush_paragraph():
+        if paragraph:
+            parts.append("<p>" + "<br>".join(render_inline(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            parts.append(f"</{list_tag}>")
+            list_tag = None
+
+    for line in (text or "").splitlines():
+        # 代码块内容原样转义输出
+        if code_lines is not None:
+            if _FENCE_RE.match(line):
+                parts.append("<pre><code>" + escape("\n".join(code_lines), quote=False) + "</code></pre>")
+                code_lines = None
+            else:
+                code_lines.append(line)
+            continue
+
+        if _FENCE_RE.match(line):
+            flush_paragraph()
+            close_list()
+            code_lines = []
+            continue
+
+        if not line.strip():
+            flush_paragraph()
+            close_list()
+            continue
+
+        heading = _HEADING_RE.match(line)
+        if heading:
+            flush_paragraph()
+            close_list()
+            # 报告本身使用h1-h3，分析中的标题从h4开始
+            level = min(len(heading.group(1)) + 3, 6)
+            parts.append(f"<h{level}>{render_inline(heading.group(2))}</h{level}>")
+            continue
+
+        if _HR_RE.match(line):
+            flush_paragraph()
+            close_list()
+            parts.append("<hr>")
+            continue
+
+        item = _UNORDERED_RE.match(line)
+        tag = "ul"
+        if not item:
+            item = _ORDERED_RE.match(line)
+            tag = "ol"
+        if item:
+            flush_paragraph()
+            if list_tag != tag:
+                close_list()
+                parts.append(f"<{tag}>")
+                list_tag = tag
+            parts.append(f"<li>{render_inline(item.group(1))}</li>")
+            continue
+
+        close_list()
+        paragraph.append(line.strip())
+
+    if code_lines is not None:
+        parts.append("<pre><code>" + escape("\n".join(code_lines), quote=False) + "</code></pre>")
+    flush_paragraph()
+    close_list()
+    return "\n".join(parts)
+
+def _format_meta(project, meta_fields):
+    values = []
+    for label, field, default in meta_fields:
+        value = project.get(field)
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(str(v) for v in value)
+        if value in (None, "", []):
+            value = default
+        values.append(f"{label}: {escape(str(value))}")
+    return " | ".join(values)
+
+def _format_siblings(project):
+    """近似重复项目（量化版本、镜像等）的链接列表"""
+    siblings = project.get("siblings") or []
+    if not siblings:
+        return ""
+    links = ", ".join(
+        f'<a href="{escape(sibling.get("url") or "#")}" class="project-link" target="_blank">{escape(sibling.get("name", "未知项目"))}</a>'
+        for sibling in siblings
+    )
+    return f'<p class="project-meta"><strong>相似项目:</strong> {links}</p>\n'
+
+def _format_topics(project):
+    """本次报告中同主题的项目和主题相似的往期项目"""
+    parts = []
+    peers = project.get("topic_peers") or []
+    if peers:
+        links = ", ".join(
+            f'<a href="{escape(peer.get("url") or "#")}" class="project-link" target="_blank">{escape(peer.get("name", "未知项目"))}</a>'
+            for peer in peers
+        )
+        parts.append(f'<p class="project-meta"><strong>同主题项目:</strong> {links}</p>\n')
+    covered = project.get("covered_by")
+    if covered:
+        parts.append(
+            f'<p class="project-meta"><strong>往期相似项目:</strong> '
+            f'<a href="{escape(covered.get("url") or "#")}" class="project-link" target="_blank">{escape(covered.get("name", "未知项目"))}</a>'
+            f'（{escape(covered.get("date", ""))}，相似度{covered.get("similarity", 0):.2f}）</p>\n'
+        )
+    return "".join(parts)
+
+def render_project(item, section):
+    """渲染单个项目"""
+    project = item.get("project", {})
+    return PROJECT_TEMPLATE.substitute(
+        url=escape(project.get("url", "#") or "#"),
+        name=escape(project.get("name", "未知项目")),
+        meta=_format_meta(project, section.meta_fields),
+        description=escape(project.get("description", "无描述") or "无描述"),
+        related=_format_siblings(project) + _format_topics(project),
+        analysis=render_markdown(item.get("analysis", "无分析结果"))
+    )
+
+def iter_report_html(analyses, sections=REPORT_SECTIONS):
+    """
+    逐段生成报告HTML
+
+    analyses: {来源键: [analysis, ...]}
+    sections: 报告板块描述，新增来源只需增加一个ReportSection
+    """
+    yield PAGE_HEADER
+    for section in sections:
+        items = analyses.get(section.key) or []
+        if not items:
+            yield SECTION_HEADER.substitute(title=section.title, intro=section.empty_text)
+            continue
+
+        intro = section.intro.substitute(count=len(items))
+        yield SECTION_HEADER.substitute(title=section.title, intro=intro)
+        for item in items:
+            try:
+                yield render_project(item, section)
+            except Exception as e:
+                print(f"处理{section.title}时出错: {e}")
+    yield PAGE_FOOTER.substitute(time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+def render_report(analyses, sections=REPORT_SECTIONS):
+    """生成完整的报告HTML"""
+    return "".join(iter_report_html(analyses, sections))
@@ -0,0 +1,113 @@
+import os
+import json
+import threading
+import time
+from datetime import datetime
+import config
+
+# 报告中各来源的键和名称，按报告中的顺序排列
+REPORT_SOURCES = [
+    ("github_trending", "GitHub热门"),
+    ("github_newest", "GitHub最新"),
+    ("huggingface_trending", "Hugging Face热门"),
+    ("huggingface_newest", "Hugging Face最新"),
+]
+
+def _report_path(name=None, report_time=None):
+    """生成报告文件路径，name用于同时生成多份报告时区分文件，report_time默认为当前时间"""
+    report_time = report_time or datetime.now().strftime('%Y%m%d_%H%M%S')
+    suffix = f"_{name}" if name else ""
+    return os.path.join(config.CACHE_DIR, f"report_{report_time}{suffix}.json")
+
+def _write_json(path, data):
+    """先写临时文件再替换，避免读到写了一半的报告"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def placeholder_analysis(project, text):
+    """未能完成分析的项目使用的占位记录"""
+    return {
+        "project": project,
+        "analysis": text,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def save_report(analyses, name=None, **extra):
+    """
+    保存本次报告到缓存目录
+
+    analyses: {来源键: [analysis, ...]}
+    name: 报告名称，同时生成多份报告时用于区分文件
+    extra: 需要一并保存的其他字段，如抓取耗时
+    返回: 报告文件路径
+    """
+    report_file = _report_path(name)
+    
+    report = {key: analyses.get(key, []) for key, _ in REPORT_SOURCES}
+    report.update(extra)
+    report["timestamp"] = datetime.now().isoformat()
+    
+    _write_json(report_file, report)
+    
+    return report_file
+
+class ReportBuilder:
+    """
+    增量构建报告：分析过程中定期把已完成的结果写入报告文件，尚未完成的项目以占位内容保存
+
+    每次写入都要重新生成整个报告，逐个项目写入时总I/O与项目数的平方成正比，
+    因此两次写入至少间隔REPORT_WRITE_INTERVAL秒，最终报告在finalize中写入。
+    """
+    
+    PENDING_TEXT = "分析进行中..."
+    
+    def __init__(self, sources, name=None, report_time=None):
+        """
+        sources: {来源键: [project, ...]}
+        report_time: 报告文件名中的时间，继续中断的运行时使用原来的时间以覆盖同一个文件
+        """
+        self.report_file = _report_path(name, report_time)
+        self.projects = {key: list(sources.get(key) or []) for key, _ in REPORT_SOURCES}
+        self.sections = {key: [None] * len(projects) for key, projects in self.projects.items()}
+        self.completed = 0
+        self.total = sum(len(projects) for projects in self.projects.values())
+        self.write_interval = config.REPORT_WRITE_INTERVAL
+        self._lock = threading.Lock()
+        self._last_write = 0
+        self._write("in_progress")
+    
+    def add(self, key, index, analysis):
+        """记录一个项目的分析结果，距上次写入超过写入间隔时写入报告文件"""
+        with self._lock:
+            if self.sections[key][index] is None:
+                self.completed += 1
+            self.sections[key][index] = analysis
+            if time.monotonic() - self._last_write >= self.write_interval:
+                self._write("in_progress")
+    
+    def analyses(self):
+        """当前的分析结果，未完成的项目使用占位记录"""
+        return {
+            key: [
+                analysis or placeholder_analysis(project, self.PENDING_TEXT)
+                for project, analysis in zip(self.projects[key], self.sections[key])
+            ]
+            for key in self.sections
+        }
+    
+    def finalize(self, **extra):
+        """写入最终报告，返回报告文件路径"""
+        with self._lock:
+            self._write("complete", **extra)
+        return self.report_file
+    
+    def _write(self, status, **extra):
+        report = self.analyses()
+        report.update(extra)
+        report["status"] = status
+        report["progress"] = f"{self.completed}/{self.total}"
+        report["timestamp"] = datetime.now().isoformat()
+        _write_json(self.report_file, report)
+        self._last_write = time.monotonic()
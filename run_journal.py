@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+from datetime import datetime
+import config
+
+class RunJournal:
+    """
+    报告生成过程的运行记录
+
+    每完成一个阶段或一个项目的分析就向cache/run_<运行编号>.jsonl追加一行并立即写入磁盘。
+    进程中断后按运行编号读取记录，跳过已完成的阶段和项目继续生成同一份报告；
+    邮件发送前后各记录一次，已发送或无法确定是否已发送的收件人不会再次收到同一份报告。
+    """
+
+    def __init__(self, run_id=None, cache_dir=None):
+        self.cache_dir = cache_dir or config.CACHE_DIR
+        self.resumed = run_id is not None
+        self.run_id = run_id or self._new_run_id()
+        self.path = os.path.join(self.cache_dir, f"run_{self.run_id}.jsonl")
+
+        self._lock = threading.Lock()
+        # 阶段名称 -> 阶段结果
+        self.stages = {}
+        # (来源键, 位置) -> 分析结果
+        self.analyses = {}
+        # 已收到邮件的收件人，以及开始发送后没有记录结果的收件人
+        self.sent_recipients = set()
+        self.unconfirmed_recipients = set()
+        self.report_file = None
+        self.completed = False
+        # 上次写入最后一行时被中断，下一条记录需要另起一行
+        self._torn = False
+
+        if self.resumed:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"找不到运行记录: {self.path}")
+            self._load()
+        else:
+            if not os.path.exists(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            self._append({"event": "start"})
+
+    def _new_run_id(self):
+        """运行编号使用开始时间，与报告文件名中的时间一致，同一秒内开始多次时加序号"""
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        candidate, number = run_id, 1
+        while os.path.exists(os.path.join(self.cache_dir, f"run_{candidate}.jsonl")):
+            number += 1
+            candidate = f"{run_id}_{number}"
+        return candidate
+
+    def _append(self, record):
+        """追加一行记录并写入磁盘，进程随后被终止也不会丢失"""
+        record["time"] = datetime.now().isoformat()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._torn:
+                line = "\n" + line
+                self._torn = False
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _load(self):
+        line = ""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 写入中断导致的不完整行
+                    continue
+                event = record.get("event")
+                if event == "stage":
+                    self.stages[record["stage"]] = record.get("data") or {}
+                elif event == "analysis":
+                    self.analyses[(record["key"], record["index"])] = record["analysis"]
+                elif event == "email_started":
+                    self.unconfirmed_recipients.update(record.get("recipients") or [])
+                elif event == "email_finished":
+                    self.sent_recipients.update(record.get("sent") or [])
+                    self.unconfirmed_recipients.clear()
+                elif event == "complete":
+                    self.completed = True
+                    self.report_file = record.get("report_file")
+        self._torn = bool(line) and not line.endswith("\n")
+
+    def stage(self, name):
+        """已完成阶段的结果，未完成时返回None"""
+        return self.stages.get(name)
+
+    def checkpoint(self, name, **data):
+        """记录一个阶段已完成及其结果"""
+        self.stages[name] = data
+        self._append({"event": "stage", "stage": name, "data": data})
+
+    def completed_analyses(self):
+        """
+        中断前已成功完成的分析: {(来源键, 位置): analysis}
+
+        出错、超时或未完成的项目没有缓存指纹，继续运行时重新分析
+        """
+        return {position: analysis for position, analysis in self.analyses.items() if analysis.get("fingerprint")}
+
+    def record_analysis(self, key, index, analysis):
+        """记录一个项目的分析结果，参数与AnalysisEngine的on_result一致"""
+        if self.analyses.get((key, index)) is analysis:
+            return
+        self.analyses[(key, index)] = analysis
+        self._append({"event": "analysis", "key": key, "index": index, "analysis": analysis})
+
+    def pending_recipients(self, recipients):
+        """
+        还需要发送邮件的收件人
+
+        上次在发送过程中中断时无法确定邮件是否已送达，这些收件人也不再发送，避免收到重复的报告
+        """
+        done = self.sent_recipients | self.unconfirmed_recipients
+        return [recipient for recipient in recipients if recipient not in done]
+
+    def email_started(self, recipients):
+        self.unconfirmed_recipients.update(recipients)
+        self._append({"event": "email_started", "recipients": list(recipients)})
+
+    def email_finished(self, sent):
+        """记录实际收到邮件的收件人，其余收件人在继续运行时重新发送"""
+        self.sent_recipients.update(sent)
+        self.unconfirmed_recipients.clear()
+        self._append({"event": "email_finished", "sent": list(sent)})
+
+    def complete(self, report_file):
+        self.completed = True
+        self.report_file = report_file
+        self._append({"event": "complete", "report_file": report_file})
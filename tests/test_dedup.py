@@ -0,0 +1,24 @@
+import numpy as np
+from dedup import Deduplicator
+
+def test_bucket_members_compared_pairwise(monkeypatch):
+    dedup = Deduplicator(num_perm=4, bands=2, threshold=0.75)
+    # 三个项目在第一段落入同一个桶；b和c相似，但都与桶中第一个项目a不相似
+    signatures = np.array([[1, 2, 10, 11], [1, 2, 20, 21], [1, 2, 20, 22]], dtype=np.uint64)
+    monkeypatch.setattr(dedup, "signatures", lambda projects: signatures)
+    assert dedup.cluster([{}, {}, {}]) == [[1, 2]]
+
+def test_cluster_representative_per_site():
+    description = "Fast inference engine for large language models with paged attention"
+    github = {"name": "acme/fast-llm", "url": "https://github.com/acme/fast-llm", "description": description}
+    hf = {"name": "acme/fast-llm", "url": "https://huggingface.co/acme/fast-llm", "description": description}
+    hf_quant = {"name": "someone/fast-llm-GGUF", "url": "https://huggingface.co/someone/fast-llm-GGUF",
+                "description": description}
+    collapsed, removed = Deduplicator().collapse_sources({
+        "github_trending": [github],
+        "huggingface_trending": [hf, hf_quant],
+    })
+    assert removed == 1
+    assert collapsed["github_trending"][0]["cluster"] == github["url"]
+    assert collapsed["huggingface_trending"] == [hf]
+    assert hf["cluster"] == hf["url"]
@@ -0,0 +1,63 @@
+import json
+from unittest import mock
+import pytest
+from deepseek_analyzer import DeepSeekAnalyzer
+
+class DictCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, namespace, key, max_age=None):
+        return self.entries.get((namespace, key))
+
+    def put(self, namespace, key, value, created_at=None):
+        self.entries[(namespace, key)] = value
+
+@pytest.fixture
+def analyzer():
+    with mock.patch("deepseek_analyzer.get_cache_store", return_value=DictCache()):
+        analyzer = DeepSeekAnalyzer()
+    analyzer.ledger = mock.Mock()
+    analyzer.ledger.mode_for.return_value = "full"
+    return analyzer
+
+def _projects(count):
+    return [{"name": f"acme/project{i}", "url": f"https://github.com/acme/project{i}", "description": f"Project {i}"}
+            for i in range(count)]
+
+def _batch_reply(*analyses):
+    return json.dumps({"results": [{"id": i, "analysis": text} for i, text in analyses]}, ensure_ascii=False)
+
+def test_split_batch_response(analyzer):
+    assert analyzer._split_batch_response(_batch_reply((1, "一"), (2, "二")), 2) == {0: "一", 1: "二"}
+    # 代码块标记、纯数组、越界序号、空分析和非对象条目
+    content = "```json\n" + json.dumps([{"id": "2", "analysis": " 二 "}, {"id": 5, "analysis": "越界"},
+                                       {"id": 1, "analysis": ""}, "文本", {"analysis": "缺少序号"}]) + "\n```"
+    assert analyzer._split_batch_response(content, 2) == {1: "二"}
+    with pytest.raises(ValueError):
+        analyzer._split_batch_response("{\"results\": [{\"id\": 1, \"analy", 2)
+
+def test_batch_with_well_formed_reply_uses_one_request(analyzer):
+    projects = _projects(3)
+    with mock.patch.object(analyzer, "_complete", return_value=_batch_reply((1, "一"), (2, "二"), (3, "三"))) as complete, \
+            mock.patch.object(analyzer, "analyze_project") as analyze_project:
+        results = analyzer.analyze_batch(projects)
+    assert [result["analysis"] for result in results] == ["一", "二", "三"]
+    assert complete.call_count == 1 and not analyze_project.called
+    # 结果已写入缓存，再次分析时不发送请求
+    assert analyzer.get_cached_analysis(projects[1])["analysis"] == "二"
+
+def test_batch_with_partial_reply_analyzes_missing_projects_individually(analyzer):
+    projects = _projects(3)
+    with mock.patch.object(analyzer, "_complete", return_value=_batch_reply((1, "一"), (3, "三"))), \
+            mock.patch.object(analyzer, "analyze_project", side_effect=lambda project: {"analysis": "单独"}) as analyze_project:
+        results = analyzer.analyze_batch(projects)
+    assert [result["analysis"] for result in results] == ["一", "单独", "三"]
+    analyze_project.assert_called_once_with(projects[1])
+
+def test_batch_with_garbled_reply_falls_back_to_single_analysis(analyzer):
+    projects = _projects(2)
+    with mock.patch.object(analyzer, "_complete", return_value="抱歉，我无法以JSON格式回答"), \
+            mock.patch.object(analyzer, "analyze_project", side_effect=lambda project: {"analysis": project["name"]}):
+        results = analyzer.analyze_batch(projects)
+    assert [result["analysis"] for result in results] == ["acme/project0", "acme/project1"]
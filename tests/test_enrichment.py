@@ -0,0 +1,47 @@
+from unittest import mock
+import pytest
+from deepseek_analyzer import DeepSeekAnalyzer
+from enrichment import Enricher
+
+class DictCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, namespace, key, max_age=None):
+        return self.entries.get((namespace, key))
+
+    def put(self, namespace, key, value, created_at=None):
+        self.entries[(namespace, key)] = value
+
+@pytest.fixture
+def cache():
+    cache = DictCache()
+    with mock.patch("deepseek_analyzer.get_cache_store", return_value=cache), \
+            mock.patch("enrichment.get_cache_store", return_value=cache):
+        yield cache
+
+def _project():
+    return {"name": "acme/agent", "url": "https://github.com/acme/agent", "description": "Agent framework",
+            "pushed_at": "2026-10-01T00:00:00Z"}
+
+def test_failed_readme_fetch_marks_project(cache):
+    enricher = Enricher()
+    with mock.patch.object(enricher, "_fetch", side_effect=ConnectionError("timeout")):
+        project, = enricher.iter_enriched([_project()])
+    assert project["readme_failed"] and "readme_summary" not in project
+
+def test_failed_readme_fetch_reuses_last_analysis(cache):
+    analyzer = DeepSeekAnalyzer()
+    analyzed = dict(_project(), readme_summary="Build agents with tools and memory")
+    saved = analyzer._save_analysis(analyzed, "分析")
+
+    failed = dict(_project(), readme_failed=True)
+    cached = analyzer.get_cached_analysis(failed)
+    assert cached["analysis"] == "分析" and cached["fingerprint"] == saved["fingerprint"]
+    # README确实为空时内容已变化，需要重新分析
+    assert analyzer.get_cached_analysis(_project()) is None
+
+    # 获取失败时的分析不覆盖上次获取成功时的记录
+    analyzer._save_analysis(failed, "新分析")
+    alias = cache.get("analysis_alias", analyzer._fingerprint(failed, with_readme=False))
+    assert alias["fingerprint"] == saved["fingerprint"]
@@ -0,0 +1,38 @@
+from history_store import HistoryStore
+
+def _project(name, stars):
+    return {"name": name, "url": f"https://github.com/{name}", "stars_value": stars}
+
+def test_corrupt_index_line_keeps_later_projects_and_ids(tmp_path):
+    path, index_path = str(tmp_path / "history.bin"), str(tmp_path / "history.tsv")
+    store = HistoryStore(path, index_path)
+    store.record([_project("a/one", 10), _project("b/two", 20), _project("c/three", 30)], ts=1000)
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    lines[1] = lines[1][:5] + "\n"
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+
+    store = HistoryStore(path, index_path)
+    assert store.series("https://github.com/c/three") == [(1000, 30)]
+    store.record([_project("c/three", 45), _project("d/four", 50)], ts=2000 + 2 * 86400)
+    # 新项目不能使用损坏行原来的编号，否则会继承b/two的历史记录
+    assert store.series("https://github.com/d/four") == [(2000 + 2 * 86400, 50)]
+
+    growth = store.top_growth(days=1, now=2000 + 2 * 86400)
+    assert [(item["name"], item["growth"]) for item in growth] == [("c/three", 15)]
+
+def test_growth_ignores_projects_without_the_metric(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.bin"), str(tmp_path / "history.tsv"))
+    github = [_project(f"org/repo{i}", 100) for i in range(5)]
+    hf = [{"name": f"hf/model{i}", "url": f"https://huggingface.co/hf/model{i}", "likes": 10, "downloads": 1000}
+          for i in range(2)]
+    store.record(github + hf, ts=1000)
+    hf[0]["likes"], hf[0]["downloads"] = 30, 1500
+    store.record(github + hf, ts=1000 + 86400)
+
+    # GitHub项目没有likes和downloads，增长为0，不能占据前k名
+    for metric, expected in (("likes", 20), ("downloads", 500)):
+        growth = store.top_growth(days=2, metric=metric, k=3, now=1000 + 86400)
+        assert [(item["name"], item["growth"]) for item in growth] == [("hf/model0", expected)]
@@ -0,0 +1,45 @@
+from unittest import mock
+import pytest
+import requests
+from http_client import HttpClient, is_connect_error
+
+@pytest.fixture
+def client():
+    client = HttpClient()
+    client.session = mock.Mock()
+    with mock.patch("http_client.time.sleep"):
+        yield client
+
+def ok_response():
+    response = mock.Mock(status_code=200, headers={})
+    return response
+
+def test_post_is_not_retried_after_read_timeout(client):
+    client.session.request.side_effect = requests.ReadTimeout("read timed out")
+    with pytest.raises(requests.ReadTimeout):
+        client.post("https://api.example.com/chat", max_retries=3)
+    assert client.session.request.call_count == 1
+
+    # GET和显式声明幂等的POST照常重试
+    client.session.request.side_effect = [requests.ReadTimeout("read timed out"), ok_response()]
+    assert client.get("https://api.example.com/items", max_retries=3).status_code == 200
+    client.session.request.side_effect = [requests.ReadTimeout("read timed out"), ok_response()]
+    assert client.post("https://api.example.com/graphql", max_retries=3, retry_on_timeout=True).status_code == 200
+
+def test_post_is_retried_after_connect_error_and_calls_before_retry(client):
+    before_retry = mock.Mock()
+    client.session.request.side_effect = [requests.ConnectTimeout("connect timed out"), ok_response()]
+    assert client.post("https://api.example.com/chat", max_retries=3, before_retry=before_retry).status_code == 200
+    assert client.session.request.call_count == 2
+    before_retry.assert_called_once()
+
+    # before_retry抛出异常时不再重试
+    client.session.request.side_effect = [requests.ConnectTimeout("connect timed out"), ok_response()]
+    before_retry = mock.Mock(side_effect=RuntimeError("budget"))
+    with pytest.raises(RuntimeError):
+        client.post("https://api.example.com/chat", max_retries=3, before_retry=before_retry)
+
+def test_is_connect_error():
+    assert is_connect_error(requests.ConnectTimeout())
+    assert not is_connect_error(requests.ReadTimeout())
+    assert not is_connect_error(requests.ConnectionError("connection reset by peer"))
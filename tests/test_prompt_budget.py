@@ -0,0 +1,40 @@
+import threading
+from unittest import mock
+import pytest
+from prompt_budget import BudgetExceededError, TokenLedger
+
+@pytest.fixture
+def ledger():
+    with mock.patch("prompt_budget.get_cache_store") as get_cache_store:
+        get_cache_store.return_value.get.return_value = None
+        ledger = TokenLedger()
+    ledger.token_ceiling = 1000
+    ledger.cost_ceiling = 0
+    return ledger
+
+def test_concurrent_reservations_never_exceed_ceiling(ledger):
+    barrier = threading.Barrier(20)
+    reservations, refused = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            reservations.append(ledger.reserve(50, 50))
+        except BudgetExceededError:
+            refused.append(True)
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(reservations) == 10 and len(refused) == 10
+    assert ledger.fraction_used() == pytest.approx(1.0)
+
+    # 实际用量替换预留额度，失败的请求释放额度
+    ledger.record(30, 20, reservations.pop())
+    for reservation in reservations:
+        ledger.release(reservation)
+    assert ledger.usage()["completion_tokens"] == 20
+    assert ledger.fraction_used() == pytest.approx(0.05)
+    assert ledger.mode_for({"rank": 100}) == "full"
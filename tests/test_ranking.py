@@ -0,0 +1,25 @@
+from ranking import OrgMatcher, score_projects
+
+def test_org_must_be_a_whole_word_of_the_owner():
+    matcher = OrgMatcher(["meta", "mit", "openai", "google-research"])
+    projects = [
+        {"name": "commit-tools/changelog"},
+        {"name": "submit/forms"},
+        {"name": "metadata-org/parser"},
+        {"name": "someone/meta-viewer"},
+        {"name": "meta-llama/Llama-3-8B", "author": "meta-llama"},
+        {"name": "openai/whisper"},
+        {"name": "mit-han-lab/streaming-llm"},
+        {"name": "google-research/bert"},
+    ]
+    assert matcher.match_many(projects).tolist() == [False, False, False, False, True, True, True, True]
+    assert not matcher.match("commit")
+    assert matcher.match("MIT")
+
+def test_major_org_bonus_only_for_real_orgs():
+    projects = [
+        {"name": "commit/agent", "stars_value": 1000},
+        {"name": "microsoft/agent", "stars_value": 1000},
+    ]
+    _, is_major_org = score_projects(projects, "github")
+    assert is_major_org.tolist() == [False, True]
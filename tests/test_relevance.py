@@ -0,0 +1,40 @@
+import pytest
+import config
+from relevance import HOLDOUT_EXAMPLES, SEED_EXAMPLES, RelevanceClassifier
+
+# 不在训练样本和留出样本中的已知项目
+AI_PROJECTS = [
+    {"name": "someone/pdf-chat", "description": "Chat with your PDFs using local LLMs"},
+    {"name": "lab/voice", "description": "Open-source speech synthesis toolkit with voice cloning"},
+    {"name": "org/swarm", "description": "Multi-agent orchestration", "tags": ["llm", "agents"]},
+    {"name": "org/trainer", "description": "", "tags": ["machine-learning", "pytorch"]},
+    {"name": "nlp-lab/fast-coder-14", "description": "Rag pipeline built for production workloads", "language": "TypeScript"},
+]
+NON_AI_PROJECTS = [
+    {"name": "codecrafters-io/build-your-own-x", "description": "Build your own X"},
+    {"name": "someone/dotfiles", "description": "A beautiful terminal theme and dotfiles"},
+    {"name": "org/ui", "description": "Component library", "tags": ["react", "frontend"]},
+    {"name": "someone/budget", "description": "Personal finance tracker"},
+]
+
+@pytest.fixture
+def classifier(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "RELEVANCE_THRESHOLD", None)
+    return RelevanceClassifier().load_or_train()
+
+def test_known_projects_on_the_right_side(classifier):
+    kept, dropped = classifier.filter([dict(project) for project in AI_PROJECTS + NON_AI_PROJECTS])
+    assert sorted(project["name"] for project in kept) == sorted(project["name"] for project in AI_PROJECTS)
+    assert sorted(project["name"] for project in dropped) == sorted(project["name"] for project in NON_AI_PROJECTS)
+
+def test_threshold_calibrated_on_holdout(classifier):
+    texts = {text for text, _ in SEED_EXAMPLES}
+    assert not texts & {text for text, _ in HOLDOUT_EXAMPLES}
+    scores = classifier.score([{"description": text} for text, _ in HOLDOUT_EXAMPLES])
+    correct = sum((score >= classifier.threshold) == bool(label) for score, (_, label) in zip(scores, HOLDOUT_EXAMPLES))
+    assert correct / len(HOLDOUT_EXAMPLES) >= 0.9
+
+def test_saved_weights_keep_calibrated_threshold(classifier):
+    reloaded = RelevanceClassifier().load_or_train()
+    assert reloaded.threshold == pytest.approx(classifier.threshold)
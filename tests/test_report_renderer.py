@@ -0,0 +1,29 @@
+from report_renderer import REPORT_SECTIONS, render_markdown, render_report
+
+def test_markdown_is_rendered_and_html_is_escaped():
+    html = render_markdown("## 简介\n**安全**的`<b>`代码\n- [文档](https://example.com/docs)\n- <img src=x onerror=alert(1)>\n"
+                           "```\n<script>alert(1)</script>\n```\n[点我](javascript:alert(1))")
+    # 分析中的标题从h4开始
+    assert "<h5>简介</h5>" in html
+    assert "<strong>安全</strong>的<code>&lt;b&gt;</code>代码" in html
+    assert '<a href="https://example.com/docs" target="_blank">文档</a>' in html
+    assert "&lt;img src=x onerror=alert(1)&gt;" in html
+    assert "<pre><code>&lt;script&gt;alert(1)&lt;/script&gt;</code></pre>" in html
+    # 只有http(s)链接会变成<a>标签
+    assert "<p>[点我](javascript:alert(1))</p>" in html
+    assert "<script" not in html and "<img" not in html
+
+def test_project_fields_are_escaped_in_report():
+    project = {
+        "name": 'evil/<script>alert("name")</script>',
+        "url": 'https://github.com/evil/repo" onclick="alert(1)',
+        "description": "**不是粗体** <script>alert('description')</script>",
+        "stars": "<b>1k</b>",
+    }
+    analysis = {"project": project, "analysis": "**重点** <script>alert('analysis')</script>"}
+    html = render_report({REPORT_SECTIONS[0].key: [analysis]})
+    assert "<script" not in html
+    assert "&lt;script&gt;" in html
+    assert 'href="https://github.com/evil/repo&quot; onclick=&quot;alert(1)"' in html
+    # 描述不渲染Markdown，分析结果渲染Markdown
+    assert "**不是粗体**" in html and "<strong>重点</strong>" in html
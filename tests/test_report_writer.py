@@ -0,0 +1,26 @@
+import json
+import config
+import report_writer
+from report_writer import ReportBuilder
+
+def _analysis(name):
+    return {"project": {"name": name}, "analysis": f"{name}的分析", "timestamp": ""}
+
+def test_add_throttles_writes_and_finalize_writes_everything(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "REPORT_WRITE_INTERVAL", 60)
+    writes = []
+    write_json = report_writer._write_json
+    monkeypatch.setattr(report_writer, "_write_json", lambda path, data: (writes.append(data["status"]), write_json(path, data)))
+
+    projects = [{"name": f"p{i}"} for i in range(50)]
+    report = ReportBuilder({"github_trending": projects}, report_time="test")
+    for index, project in enumerate(projects):
+        report.add("github_trending", index, _analysis(project["name"]))
+    assert writes == ["in_progress"]
+
+    with open(report.finalize(), "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert writes == ["in_progress", "complete"]
+    assert saved["progress"] == "50/50"
+    assert [item["analysis"] for item in saved["github_trending"]] == [f"p{i}的分析" for i in range(50)]
@@ -0,0 +1,36 @@
+from run_journal import RunJournal
+
+def _analysis(name):
+    return {"project": {"name": name}, "analysis": "分析", "fingerprint": f"fp-{name}"}
+
+def test_pending_recipients_skips_sent_and_unconfirmed(tmp_path):
+    journal = RunJournal(cache_dir=str(tmp_path))
+    recipients = ["a@example.com", "b@example.com", "c@example.com"]
+    journal.email_started(recipients)
+    journal.email_finished(["a@example.com"])
+    assert journal.pending_recipients(recipients) == ["b@example.com", "c@example.com"]
+
+    resumed = RunJournal(journal.run_id, cache_dir=str(tmp_path))
+    assert resumed.pending_recipients(recipients) == ["b@example.com", "c@example.com"]
+
+    # 发送过程中中断时，无法确定是否已送达的收件人也不再发送
+    resumed.email_started(["b@example.com"])
+    resumed = RunJournal(journal.run_id, cache_dir=str(tmp_path))
+    assert resumed.pending_recipients(recipients) == ["c@example.com"]
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = RunJournal(cache_dir=str(tmp_path))
+    journal.checkpoint("crawl", crawled={"github_trending": []})
+    journal.record_analysis("github_trending", 0, _analysis("one"))
+    # 模拟写入最后一行时进程被终止
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"event": "analysis", "key": "github_trending", "index": 1, "analysis": {"proj')
+
+    resumed = RunJournal(journal.run_id, cache_dir=str(tmp_path))
+    assert resumed.stage("crawl") == {"crawled": {"github_trending": []}}
+    assert list(resumed.completed_analyses()) == [("github_trending", 0)]
+
+    # 继续运行后追加的记录不能与不完整的行连在一起
+    resumed.record_analysis("github_trending", 1, _analysis("two"))
+    resumed = RunJournal(journal.run_id, cache_dir=str(tmp_path))
+    assert sorted(resumed.completed_analyses()) == [("github_trending", 0), ("github_trending", 1)]
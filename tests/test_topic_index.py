@@ -0,0 +1,44 @@
+from unittest import mock
+import config
+from deepseek_analyzer import DeepSeekAnalyzer
+from topic_index import TopicIndex
+
+# 微调版本通常直接沿用原模型的说明，只看主题向量时与原模型的相似度超过TOPIC_REUSE_SIMILARITY
+DESCRIPTION = ("Qwen2.5-7B-Instruct is the latest Qwen large language model release, instruction tuned with improved "
+               "coding, mathematics, long context and structured output generation across many languages")
+
+def _project(name):
+    return {"name": name, "url": f"https://huggingface.co/{name}", "description": DESCRIPTION,
+            "tags": ["text-generation", "qwen2"]}
+
+def _index(tmp_path):
+    return TopicIndex(str(tmp_path / "topic.f32"), str(tmp_path / "topic.tsv"))
+
+def test_near_identical_requires_same_name(tmp_path):
+    index = _index(tmp_path)
+    index.add([{"project": _project("Qwen/Qwen2.5-7B-Instruct"), "fingerprint": "f1"}], ts=1000)
+
+    other_model = _project("someone/Qwen2.5-7B-Instruct-zh")
+    reupload = _project("someone/Qwen2.5-7B-Instruct-GGUF")
+    index.annotate([other_model, reupload], now=2000)
+    assert "near_identical" not in other_model
+    assert reupload["near_identical"]["fingerprint"] == "f1"
+
+def test_reused_analysis_not_persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", str(tmp_path))
+    with mock.patch("deepseek_analyzer.get_cache_store") as get_cache_store:
+        cache = get_cache_store.return_value
+        analyzer = DeepSeekAnalyzer()
+    source = _project("Qwen/Qwen2.5-7B-Instruct")
+    cached = {"project": source, "analysis": "分析", "mode": "full", "metrics": {}}
+    cache.get.side_effect = lambda namespace, key, **kwargs: cached if key == "f1" else None
+
+    reupload = _project("someone/Qwen2.5-7B-Instruct-GGUF")
+    reupload["near_identical"] = {"name": source["name"], "url": source["url"], "fingerprint": "f1", "similarity": 0.99}
+    result = analyzer.get_cached_analysis(reupload)
+    assert result["analysis"] == "分析" and result["project"] is reupload
+    assert result["reused_from"]["url"] == source["url"]
+    cache.put.assert_not_called()
+
+    index = _index(tmp_path)
+    assert index.add([result]) == 0
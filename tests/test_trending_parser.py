@@ -0,0 +1,56 @@
+import os
+import pytest
+from trending_parser import extract_articles, extract_articles_bs4, parse_star_count
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures",
+                       "github_trending.html")
+
+@pytest.fixture
+def html():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return f.read()
+
+def test_extract_articles_from_fixture(html):
+    records = extract_articles(html)
+    assert len(records) == 25
+    assert records[0] == {
+        "repo_path": "ggerganov/super-vision-0",
+        "description": "Rag pipeline built for production workloads (0)",
+        "language": "TypeScript",
+        "stars_text": "37,646",
+        "stars_gained_text": "21 stars today",
+    }
+    assert [record["repo_path"] for record in records[1:3]] == ["karpathy/deep-coder-1", "vllm-project/tiny-rag-2"]
+    assert [parse_star_count(record["stars_text"]) for record in records[:3]] == [37646, 34228, 87687]
+    # 与BeautifulSoup版本的结果一致，limit只截取前几个项目
+    assert records == extract_articles_bs4(html)
+    assert extract_articles(html, limit=2) == records[:2]
+
+def test_extract_articles_with_nested_markup_and_missing_fields():
+    html = """<html><body><div>页面其余部分 <article>不是项目</article></div>
+<article class="Box-row">
+  <h2 class="h3 lh-condensed"><a href="/acme/agent">acme / <span>agent</span></a></h2>
+  <p class="col-9">An <g-emoji>🤖</g-emoji> agent &amp; <b>tools</b></p>
+  <a class="Link--muted d-inline-block mr-3" href="/acme/agent/stargazers"> 1.2k </a>
+</article>
+<article class="Box-row"><h2><a href="/acme/empty">acme / empty</a></h2></article>
+</body></html>"""
+    assert extract_articles(html) == [
+        {"repo_path": "acme/agent", "description": "An 🤖 agent & tools", "language": "",
+         "stars_text": "1.2k", "stars_gained_text": ""},
+        {"repo_path": "acme/empty", "description": "", "language": "", "stars_text": "", "stars_gained_text": ""},
+    ]
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.2k", 1200),
+    ("1,234", 1234),
+    ("12,345,678", 12345678),
+    (" 987 ", 987),
+    ("1,2k", 1200),
+    ("2M", 2000000),
+    ("", None),
+    (None, None),
+    ("stars", None),
+])
+def test_parse_star_count(text, expected):
+    assert parse_star_count(text) == expected
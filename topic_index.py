@@ -0,0 +1,288 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import config
+from dedup import GENERIC_TAG_PREFIXES, VARIANT_TOKENS, name_stem_tokens
+from relevance import hashed_ngrams
+
+# 不能说明项目主题的常见英文词，计算向量前去掉
+_STOPWORD_RE = re.compile(
+    r"\b(a|an|the|and|or|for|of|to|in|on|with|by|from|is|are|be|as|at|it|its|this|that|your|you|via|using|based|built)\b",
+    re.IGNORECASE,
+)
+
+def topic_text(project):
+    """用于计算主题向量的文本: 名称词干、描述和标签（去掉量化后缀），不包含README摘要，分析前后计算的向量一致"""
+    tags = [str(tag) for tag in project.get("tags") or []
+            if str(tag).lower() not in VARIANT_TOKENS and not str(tag).startswith(GENERIC_TAG_PREFIXES)]
+    parts = [" ".join(name_stem_tokens(project.get("name") or "")), project.get("description") or "", " ".join(tags)]
+    return _STOPWORD_RE.sub(" ", " ".join(parts)).replace("\0", " ")
+
+def embed_projects(projects, dims=None):
+    """
+    在CPU上批量计算项目的主题向量
+
+    词、相邻词对和中文相邻两个字按哈希值映射到dims维中的一维，并按哈希值的最低位取正负号，
+    冲突的特征大多相互抵消；结果做L2归一化，向量点积即为余弦相似度。
+    返回: float32矩阵，每行对应一个项目
+    """
+    dims = dims or config.TOPIC_EMBED_DIMS
+    vectors = np.zeros((len(projects), dims), dtype=np.float32)
+    if not projects:
+        return vectors
+    rows, cols = hashed_ngrams([topic_text(project) for project in projects], dims * 2)
+    signs = 1.0 - 2.0 * (cols & 1)
+    vectors += np.bincount(rows * dims + (cols >> 1), weights=signs, minlength=len(projects) * dims).reshape(vectors.shape)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class TopicIndex:
+    """
+    分析过的项目的主题向量索引
+
+    向量以float32定长行追加到同一个文件，查询时用内存映射按块读取，与当前报告的项目向量做矩阵乘法求最近邻，
+    不需要把整个索引载入内存。每行对应的项目URL、名称、分析缓存指纹和分析时间保存在单独的索引文件中，
+    同一个项目重新分析后使用新的一行，旧行不再参与查询。
+    """
+
+    def __init__(self, path=None, meta_path=None, dims=None):
+        self.path = path or os.path.join(config.CACHE_DIR, config.TOPIC_INDEX_FILE_NAME)
+        self.meta_path = meta_path or os.path.join(config.CACHE_DIR, config.TOPIC_INDEX_META_NAME)
+        self.dims = dims or config.TOPIC_EMBED_DIMS
+        self.row_bytes = self.dims * np.dtype(np.float32).itemsize
+        self.chunk_rows = config.TOPIC_SEARCH_CHUNK_ROWS
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        # URL -> (行号, 分析时间, 缓存指纹, 名称)
+        self._entries = {}
+        # 每行的分析时间和URL，不再使用的行时间为-1
+        self._row_ts = np.empty(0, dtype=np.int64)
+        self._row_urls = []
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _row_count(self):
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) // self.row_bytes
+
+    def _load(self):
+        count = self._row_count()
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    # 忽略写入中断导致的不完整行和没有对应向量的行
+                    if len(parts) != 5 or not parts[0].isdigit() or not parts[1].isdigit() or int(parts[0]) >= count:
+                        continue
+                    self._entries[parts[3]] = (int(parts[0]), int(parts[1]), parts[2], parts[4])
+        self._rebuild_rows(count)
+
+    def _rebuild_rows(self, count):
+        self._row_ts = np.full(count, -1, dtype=np.int64)
+        self._row_urls = [None] * count
+        for url, (row, ts, _, _) in self._entries.items():
+            self._row_ts[row] = ts
+            self._row_urls[row] = url
+
+    def _matrix(self, count):
+        if count == 0:
+            return None
+        return np.memmap(self.path, dtype=np.float32, mode="r", shape=(count, self.dims))
+
+    def nearest(self, vectors, urls=None, since=0, k=None):
+        """
+        查询每个向量在索引中最相似的k个项目
+
+        urls: 查询项目的URL，索引中同一个项目不作为结果
+        since: 只返回分析时间不早于该时间戳的项目
+        返回: 每个查询一个列表 [(相似度, URL), ...]，按相似度从高到低排序
+        """
+        k = k or config.TOPIC_NEIGHBOURS
+        with self._lock:
+            count = len(self._row_ts)
+            row_ts = self._row_ts
+            row_urls = list(self._row_urls)
+            own_rows = [self._entries[url][0] if url in self._entries else -1 for url in urls or [None] * len(vectors)]
+        matrix = self._matrix(count)
+        queries = len(vectors)
+        best_sims = np.full((queries, 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((queries, 0), dtype=np.int64)
+        if matrix is None or queries == 0:
+            return [[] for _ in range(queries)]
+
+        own_rows = np.array(own_rows, dtype=np.int64)
+        for start in range(0, count, self.chunk_rows):
+            end = min(start + self.chunk_rows, count)
+            sims = vectors @ np.asarray(matrix[start:end]).T
+            sims[:, row_ts[start:end] < max(since, 0)] = -np.inf
+            inside = (own_rows >= start) & (own_rows < end)
+            sims[np.flatnonzero(inside), own_rows[inside] - start] = -np.inf
+
+            # 与之前各块的候选合并后保留前k个
+            take = min(k, end - start)
+            top = np.argpartition(-sims, take - 1, axis=1)[:, :take]
+            best_sims = np.concatenate((best_sims, np.take_along_axis(sims, top, axis=1)), axis=1)
+            best_rows = np.concatenate((best_rows, top + start), axis=1)
+            if best_sims.shape[1] > k:
+                keep = np.argpartition(-best_sims, k - 1, axis=1)[:, :k]
+                best_sims = np.take_along_axis(best_sims, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+        del matrix
+
+        results = []
+        for sims, rows in zip(best_sims, best_rows):
+            order = np.argsort(-sims, kind="stable")
+            results.append([(float(sims[i]), row_urls[rows[i]]) for i in order if np.isfinite(sims[i])])
+        return results
+
+    def entry(self, url):
+        """索引中项目的信息: {"name", "url", "fingerprint", "analyzed_at", "date"}，不存在时返回None"""
+        with self._lock:
+            item = self._entries.get(url)
+        if item is None:
+            return None
+        _, ts, fingerprint, name = item
+        return {"name": name, "url": url, "fingerprint": fingerprint, "analyzed_at": ts,
+                "date": datetime.fromtimestamp(ts).strftime("%Y-%m-%d")}
+
+    def annotate(self, projects, now=None):
+        """
+        与往期分析过的项目比较，标注已覆盖过的主题和近期分析过的近似相同项目
+
+        最相似的往期项目达到TOPIC_COVERED_SIMILARITY时写入"covered_by"；近TOPIC_REUSE_DAYS天内分析过、
+        达到TOPIC_REUSE_SIMILARITY且去掉作者和量化后缀后名称相同时写入"near_identical"，分析时复用它的结果。
+        只看相似度时"Qwen2.5-7B-Instruct"和"Qwen2.5-7B-Instruct-zh"这样的不同模型也会达到阈值。
+        返回: 标注了covered_by的项目数
+        """
+        if not projects or not len(self):
+            return 0
+        now = int(now if now is not None else time.time())
+        covered_since = now - config.TOPIC_COVERED_DAYS * 86400
+        reuse_since = now - config.TOPIC_REUSE_DAYS * 86400
+        neighbours = self.nearest(embed_projects(projects, self.dims), [project.get("url") for project in projects],
+                                  since=min(covered_since, reuse_since))
+
+        covered = 0
+        for project, candidates in zip(projects, neighbours):
+            stem = name_stem_tokens(project.get("name") or "")
+            for similarity, url in candidates:
+                entry = self.entry(url)
+                if entry is None or similarity < config.TOPIC_COVERED_SIMILARITY:
+                    break
+                if "covered_by" not in project and entry["analyzed_at"] >= covered_since:
+                    project["covered_by"] = {"name": entry["name"], "url": url, "date": entry["date"],
+                                             "similarity": round(similarity, 3)}
+                    covered += 1
+                if (similarity >= config.TOPIC_REUSE_SIMILARITY and entry["analyzed_at"] >= reuse_since
+                        and "near_identical" not in project and stem and name_stem_tokens(entry["name"]) == stem):
+                    project["near_identical"] = {"name": entry["name"], "url": url,
+                                                 "fingerprint": entry["fingerprint"], "similarity": round(similarity, 3)}
+        return covered
+
+    def group(self, projects):
+        """
+        把当前报告中主题相近的项目分组，相似度达到TOPIC_GROUP_SIMILARITY的项目属于同一组
+
+        同组的其他项目写入"topic_peers"
+        返回: 多于一个项目的分组列表，每组为项目名称列表
+        """
+        if len(projects) < 2:
+            return []
+        vectors = embed_projects(projects, self.dims)
+        similar = np.triu(vectors @ vectors.T >= config.TOPIC_GROUP_SIMILARITY, k=1)
+
+        parent = list(range(len(projects)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in zip(*np.nonzero(similar)):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups = {}
+        for i in range(len(projects)):
+            groups.setdefault(find(i), []).append(i)
+        result = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            for i in members:
+                projects[i]["topic_peers"] = [{"name": projects[j].get("name", "未知项目"), "url": projects[j].get("url", "")}
+                                              for j in members if j != i]
+            result.append([projects[i].get("name", "未知项目") for i in members])
+        return result
+
+    def add(self, analyses, ts=None):
+        """
+        把分析完成的项目加入索引，分析出错或未完成的项目没有缓存指纹，不加入；
+        复用其他项目分析结果的项目也不加入，避免复用结果被当作新的分析一再延续
+
+        analyses: [analysis, ...]，同一个项目出现多次只加入一次
+        返回: 新写入的向量数
+        """
+        ts = int(ts if ts is not None else time.time())
+        items = {}
+        for analysis in analyses:
+            project = analysis.get("project") or {}
+            url = project.get("url")
+            if analysis.get("reused_from"):
+                continue
+            if analysis.get("fingerprint") and url and "\t" not in url and "\n" not in url:
+                items.setdefault(url, (project, analysis["fingerprint"]))
+        if not items:
+            return 0
+        vectors = embed_projects([project for project, _ in items.values()], self.dims)
+
+        with self._lock:
+            count = self._row_count()
+            new_vectors = []
+            lines = []
+            for (url, (project, fingerprint)), vector in zip(items.items(), vectors):
+                existing = self._entries.get(url)
+                if existing is not None and existing[2] == fingerprint and existing[0] < count:
+                    # 分析内容未变化，只更新分析时间
+                    row = existing[0]
+                else:
+                    row = count + len(new_vectors)
+                    new_vectors.append(vector)
+                name = str(project.get("name", "")).replace("\t", " ").replace("\n", " ")
+                self._entries[url] = (row, ts, fingerprint, name)
+                lines.append(f"{row}\t{ts}\t{fingerprint}\t{url}\t{name}\n")
+
+            # 先写向量再写索引，保证索引引用的行都已写入
+            if new_vectors:
+                with open(self.path, "ab") as f:
+                    size = f.seek(0, os.SEEK_END)
+                    if size % self.row_bytes:
+                        f.truncate(size - size % self.row_bytes)
+                    f.write(np.asarray(new_vectors, dtype=np.float32).tobytes())
+            with open(self.meta_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            self._rebuild_rows(count + len(new_vectors))
+        return len(new_vectors)
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_topic_index():
+    """获取进程内共享的主题索引"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TopicIndex()
+        return _index
@@ -0,0 +1,155 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+import config
+from http_client import get_http_client
+from cache_store import get_cache_store
+from metrics import get_metrics
+from ranking import rank_projects
+from relevance import keep_relevant
+from trending_parser import PARSERS, extract_articles
+
+# 每个时间范围对应的天数，用于把新增星标数换算为每天的数量
+PERIOD_DAYS = {"daily": 1, "weekly": 7, "monthly": 30}
+
+def _keyword_pattern(keywords):
+    """英文关键词按整词匹配（允许复数形式），中文关键词按子串匹配"""
+    parts = [rf"\b{re.escape(keyword)}s?\b" if keyword.isascii() else re.escape(keyword) for keyword in keywords]
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+class RequestBudget:
+    """
+    多个线程共享的请求额度
+
+    总请求数不超过max_requests，相邻两次请求的开始时间至少间隔delay秒，
+    等待期间不占用锁，已发出的请求可以同时进行。
+    """
+
+    def __init__(self, max_requests, delay):
+        self.max_requests = max_requests
+        self.delay = delay
+        self.used = 0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """占用一次请求额度并等待到允许发出请求的时间，额度用尽时返回False"""
+        with self._lock:
+            if self.max_requests and self.used >= self.max_requests:
+                return False
+            self.used += 1
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+        return True
+
+class TrendingFanout:
+    """
+    并发抓取多个编程语言和时间范围的GitHub热门页面
+
+    每个页面单独缓存，某个页面失败时使用它上次的缓存（即使已过期），不影响其他页面；
+    所有页面的结果按仓库合并去重后统一评分排名。
+    """
+
+    def __init__(self, crawler, languages=None, periods=None):
+        self.crawler = crawler
+        self.languages = config.TRENDING_LANGUAGES if languages is None else languages
+        self.periods = periods or config.TRENDING_PERIODS
+        self.max_workers = config.TRENDING_MAX_WORKERS
+        self.page_max_age = config.TRENDING_PAGE_CACHE_HOURS * 3600
+        self.budget = RequestBudget(config.TRENDING_MAX_REQUESTS, config.TRENDING_REQUEST_DELAY)
+        self.http = get_http_client()
+        self.cache = get_cache_store()
+
+    def _page_url(self, language, period):
+        base = self.crawler.TRENDING_URL.rstrip("/")
+        path = f"{base}/{quote(language, safe='')}" if language else base
+        return f"{path}?since={period}"
+
+    def _page_key(self, language, period):
+        return f"github_trending_page:{language or 'all'}:{period}"
+
+    def _fetch_page(self, language, period):
+        """
+        获取单个页面的项目，优先使用未过期的缓存
+
+        返回: (项目列表, 结果)，结果为cached/fetched/stale/skipped/failed之一
+        """
+        key = self._page_key(language, period)
+        projects = self.cache.get("crawl", key, max_age=self.page_max_age)
+        if projects is not None:
+            return projects, "cached"
+
+        label = f"{language or '全部语言'}/{period}"
+        if not self.budget.acquire():
+            return self._fallback(key, f"GitHub热门页面{label}超出请求额度", "skipped")
+        try:
+            html, _ = self.http.conditional_get(self._page_url(language, period))
+            projects = self._parse_page(html, language, period)
+        except Exception as e:
+            return self._fallback(key, f"获取GitHub热门页面{label}失败: {e}", "failed")
+        self.cache.put("crawl", key, projects)
+        return projects, "fetched"
+
+    def _fallback(self, key, message, outcome):
+        """页面无法获取时使用上次的缓存（即使已过期），没有缓存时返回空列表"""
+        stale = self.cache.get("crawl", key)
+        if stale is not None:
+            print(f"{message}，使用上次的缓存")
+            return stale, "stale"
+        print(f"{message}，跳过该页面")
+        return [], outcome
+
+    def _parse_page(self, html, language, period):
+        extract = PARSERS.get(config.GITHUB_TRENDING_PARSER, extract_articles)
+        projects = []
+        for record in extract(html):
+            project = self.crawler._record_to_project(record)
+            if project:
+                project["trending_pages"] = [f"{language or 'all'}:{period}"]
+                project["stars_per_day"] = project["stars_gained"] / PERIOD_DAYS.get(period, 1)
+                projects.append(project)
+        return projects
+
+    def _merge(self, pages):
+        """按仓库合并多个页面的结果，保留最高的星标数和每日新增星标数"""
+        merged = {}
+        for projects in pages:
+            for project in projects:
+                existing = merged.get(project["url"])
+                if existing is None:
+                    merged[project["url"]] = dict(project, trending_pages=list(project["trending_pages"]))
+                    continue
+                existing["trending_pages"].extend(project["trending_pages"])
+                if project["stars_value"] > existing["stars_value"]:
+                    existing["stars"] = project["stars"]
+                    existing["stars_value"] = project["stars_value"]
+                existing["stars_per_day"] = max(existing["stars_per_day"], project["stars_per_day"])
+                existing["stars_gained"] = max(existing["stars_gained"], project["stars_gained"])
+
+        ai_pattern = _keyword_pattern(config.TRENDING_AI_KEYWORDS)
+        for project in merged.values():
+            project["trending_page_count"] = len(project["trending_pages"])
+            project["ai_related"] = int(bool(ai_pattern.search(f"{project['name']} {project['description']}")))
+        return list(merged.values())
+
+    def crawl(self, limit):
+        """抓取所有页面，返回合并、评分后的前limit个项目"""
+        pages = [(language, period) for language in self.languages for period in self.periods]
+        metrics = get_metrics()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda page: self._fetch_page(*page), pages))
+
+        counts = {}
+        for _, outcome in results:
+            counts[outcome] = counts.get(outcome, 0) + 1
+            metrics.inc("trending_pages_total", result=outcome)
+        print(f"GitHub热门页面: 共{len(pages)}个，" + "，".join(f"{outcome} {count}个" for outcome, count in sorted(counts.items())))
+
+        merged = keep_relevant(self._merge([projects for projects, _ in results]), "GitHub热门")
+        return rank_projects(merged, "github_trending", limit)
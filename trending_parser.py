@@ -0,0 +1,146 @@
+import re
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+
+# 星标数，例如"37,646"、"1.2k"、"1,2k"或"3M"
+_STAR_RE = re.compile(r"(\d+(?:[.,]\d+)*)\s*([kKmM])?")
+_THOUSANDS_RE = re.compile(r"\d{1,3}(?:[.,]\d{3})+")
+_SUFFIX_MULTIPLIERS = {"k": 1000, "m": 1000000}
+_ARTICLE_OPEN_RE = re.compile(r"<article\b[^>]*>", re.IGNORECASE)
+
+def parse_star_count(text):
+    """
+    把页面上的星标数文本转换为整数
+
+    支持千分位分隔符（"1,234"）和k/M后缀（"1.2k"），带后缀时逗号视为小数点（部分语言环境的写法）。
+    无法解析时返回None
+    """
+    if not text:
+        return None
+    match = _STAR_RE.search(text.strip())
+    if not match:
+        return None
+    number, suffix = match.groups()
+    if suffix:
+        value = float(number.replace(",", "."))
+        return int(round(value * _SUFFIX_MULTIPLIERS[suffix.lower()]))
+    if _THOUSANDS_RE.fullmatch(number):
+        return int(number.replace(",", "").replace(".", ""))
+    return int(float(number.replace(",", ".")))
+
+def _has_class(attrs, name):
+    return name in (attrs.get("class") or "").split()
+
+def iter_article_html(html):
+    """依次返回页面中每个article.Box-row元素的HTML，跳过页面其余部分"""
+    position = 0
+    while True:
+        match = _ARTICLE_OPEN_RE.search(html, position)
+        if not match:
+            return
+        end = html.find("</article>", match.end())
+        if end == -1:
+            return
+        end += len("</article>")
+        position = end
+        if "Box-row" in match.group(0):
+            yield html[match.start():end]
+
+class _ArticleParser(HTMLParser):
+    """从单个article元素中提取项目链接、描述、语言和星标数的流式解析器"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.reset_article()
+
+    def reset_article(self):
+        self.record = {"repo_path": "", "description": "", "language": "", "stars_text": "", "stars_gained_text": ""}
+        # 当前正在收集文本的字段及其所在标签
+        self._field = None
+        self._field_tag = None
+        self._depth = 0
+        self._in_h2 = False
+        self._seen_p = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._field:
+            if tag == self._field_tag:
+                self._depth += 1
+            return
+        if tag == "h2":
+            self._in_h2 = True
+        elif tag == "a" and self._in_h2 and not self.record["repo_path"]:
+            self.record["repo_path"] = (attrs.get("href") or "").strip("/")
+        elif tag == "p" and not self._seen_p:
+            self._seen_p = True
+            self._start("description", tag)
+        elif tag == "span" and attrs.get("itemprop") == "programmingLanguage":
+            self._start("language", tag)
+        elif tag == "a" and _has_class(attrs, "Link--muted") and (attrs.get("href") or "").endswith("/stargazers"):
+            self._start("stars_text", tag)
+        elif tag == "span" and _has_class(attrs, "float-sm-right"):
+            self._start("stars_gained_text", tag)
+
+    def handle_endtag(self, tag):
+        if self._field and tag == self._field_tag:
+            if self._depth:
+                self._depth -= 1
+            else:
+                self.record[self._field] = " ".join(self.record[self._field].split())
+                self._field = None
+        elif tag == "h2":
+            self._in_h2 = False
+
+    def handle_data(self, data):
+        if self._field:
+            self.record[self._field] += data
+
+    def _start(self, field, tag):
+        self._field = field
+        self._field_tag = tag
+        self._depth = 0
+
+def extract_articles(html, limit=None):
+    """
+    用标准库HTMLParser提取热门页面中的项目
+
+    只把article.Box-row片段交给解析器，不构建整页的DOM树。
+    返回: [{"repo_path", "description", "language", "stars_text", "stars_gained_text"}, ...]
+    """
+    parser = _ArticleParser()
+    records = []
+    for article in iter_article_html(html):
+        if limit is not None and len(records) >= limit:
+            break
+        parser.reset_article()
+        parser.feed(article)
+        parser.close()
+        parser.reset()
+        records.append(parser.record)
+    return records
+
+def extract_articles_bs4(html, limit=None):
+    """用BeautifulSoup提取热门页面中的项目，返回格式与extract_articles相同"""
+    soup = BeautifulSoup(html, "html.parser")
+    records = []
+    for article in soup.select("article.Box-row")[:limit]:
+        repo_element = article.select_one("h2 a")
+        description_element = article.select_one("p")
+        language_element = article.select_one('span[itemprop="programmingLanguage"]')
+        stars_element = article.select_one('a.Link--muted[href$="/stargazers"]')
+        gained_element = article.select_one("span.float-sm-right")
+        records.append({
+            "repo_path": repo_element.get("href", "").strip("/") if repo_element else "",
+            "description": " ".join(description_element.text.split()) if description_element else "",
+            "language": " ".join(language_element.text.split()) if language_element else "",
+            "stars_text": " ".join(stars_element.text.split()) if stars_element else "",
+            "stars_gained_text": " ".join(gained_element.text.split()) if gained_element else "",
+        })
+    return records
+
+# 可选的解析后端，由config.GITHUB_TRENDING_PARSER选择
+PARSERS = {
+    "htmlparser": extract_articles,
+    "bs4": extract_articles_bs4,
+}